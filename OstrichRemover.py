@@ -5,23 +5,34 @@
 import os
 import sys
 import argparse
+import functools
 import time
 import datetime
-import re
 # Project imports
-from src.models.folderInfo import FolderInfo
-from src.scan.albumTester import AlbumTester
-from src.fill.albumFiller import AlbumFiller
-from src.clean.albumCleaner import AlbumCleaner
+from src.scan.albumSampler import AlbumSampler
+from src.scan.albumTester import AlbumTester, testAlbum
+from src.scan.scanCache import ScanCache, dumpAlbumResults, loadAlbumResults
+from src.scan.checkRegistry import CheckSelection, checkCategories, parseErrorCodes
+from src.fill.albumFiller import fillAlbum
+from src.clean.albumCleaner import cleanAlbum
 from src.analyze.metaAnalyzer import MetaAnalyzer
-from src.stat.statMaker import StatMaker
+from src.stat.statMaker import StatAggregate, makeAlbumStats
+from src.gen.libraryAggregator import LibraryAggregator
 from src.utils.tools import computePurity
+from src.utils.albumManifest import AlbumManifest
+from src.utils.albumPool import AlbumPool
+from src.utils.libraryWalker import LibraryWalker
+from src.utils.profiler import profiler
+from src.utils.progressReporter import ProgressReporter
+from src.utils.runJournal import RunJournal, InterruptGuard
+from src.utils.tagPlanApplier import TagPlanApplier
 from src.utils.reportBuilder import *
 from src.utils.uiBuilder import *
 from src.utils.tools import *
 # Globals
 global scriptVersion
 scriptVersion = '1.6.1'
+manifestPath = 'cache/album-manifest.db'  # The albums processed by the fill and clean modes
 
 
 # Script main frame
@@ -43,15 +54,49 @@ def main():
     ap.add_argument('-e', '--errors', help='Log errors only during run', action='store_true')
     ap.add_argument('-v', '--verbose', help='Log detailed progress when running', action='store_true')
     ap.add_argument('-p', '--path', help='The output path to store the dumped JSON', type=os.path.abspath)
+    ap.add_argument('-j', '--jobs', help='Number of worker processes used to test albums (scan, stat, fill and clean modes)', type=int, default=1)
+    ap.add_argument('--cache', help='Reuse the unchanged albums results stored in the given scan cache file (scan mode)',
+                    nargs='?', const='cache/scan-cache.db', default=None)
+    ap.add_argument('--clear-cache', help='Remove the folder albums from the scan cache (see --cache for a custom file)', action='store_true')
+    ap.add_argument('--only', help='Comma separated error codes to test, others are skipped (scan mode)', type=parseErrorCodes)
+    ap.add_argument('--skip', help='Comma separated error codes not to test (scan mode)', type=parseErrorCodes)
+    ap.add_argument('--profile', help='Measure the time spent in each scan phase, see the timings in the JSON report (scan mode)', action='store_true')
+    sample = ap.add_mutually_exclusive_group()
+    sample.add_argument('--sample', help='Only scan the given percentage of albums, to estimate the library purity (scan mode)', type=float, metavar='P')
+    sample.add_argument('--sample-albums', help='Only scan about N albums, to estimate the library purity (scan mode)', type=int, metavar='N')
+    ap.add_argument('--sample-seed', help='The random seed of the sampled albums, to scan the same sample again', type=int)
+    ap.add_argument('--dry-run', help='Save the tags to write in a NDJSON plan instead of writing them (fill and clean modes)', action='store_true')
+    ap.add_argument('--resume', help='Skip the albums already processed by an interrupted run (scan, fill and gen modes)', action='store_true')
+    ap.add_argument('--force', help='Also process the albums unchanged since the last run (fill and clean modes)', action='store_true')
+    ap.add_argument('--progress', help='Also write the progress as NDJSON events on stderr (scan, stat, gen, fill and clean modes)',
+                    choices=['text', 'ndjson'], default='text')
+    ap.add_argument('--progress-interval', help='Seconds between two NDJSON progress events', type=float, default=2)
+    ap.add_argument('--apply-plan', help='Write the tags of a plan saved by a fill or clean dry run, in the given folder', metavar='PLAN')
     args = vars(ap.parse_args())
     # Preventing path from missing its trailing slash (or backslash for win compatibility)
     if not args['folder'].endswith('\\') and not args['folder'].endswith('/'):
         printInvalidPath(args['folder'])
         sys.exit(-1)
+    # A plan is applied on its own, without any mode
+    if args['apply_plan'] is not None and any(args[mode] for mode in ('scan', 'fill', 'analyze', 'stat', 'gen', 'clean')):
+        printInvalidApplyPlan()
+        sys.exit(-1)
+    # A sampled scan is neither dumped, cached, journaled nor profiled
+    if args['sample'] is not None or args['sample_albums'] is not None:
+        sampleOptions = [option for option, key in (('--dump', 'dump'), ('--cache', 'cache'), ('--resume', 'resume'),
+                                                    ('--profile', 'profile')) if args[key] not in (None, False)]
+        if len(sampleOptions) > 0:
+            printInvalidSampleOptions(sampleOptions)
+            sys.exit(-1)
     # Exec script
     printCredentials(scriptVersion)
+    # Invalidate the cached albums of the given folder
+    if args['clear_cache']:
+        clearScanCache(args)
     # Perform a scan for the given folder against the naming convention
-    if args['scan']:
+    if args['scan'] and (args['sample'] is not None or args['sample_albums'] is not None):
+        sampleFolder(args)
+    elif args['scan']:
         scanFolder(args)
     # Pre-fill folder's track tags with information held in folder name and file name
     elif args['fill']:
@@ -67,124 +112,260 @@ def main():
         generateJSON(args)
     # Clean all previously set tags (to prepare a track to be properly filled)
     elif args['clean']:
-        if queryYesNo('> Warning, this command will erase any previously existing tags on audio files in this path. Just do it?', 'yes'):
+        if args['dry_run'] or queryYesNo('> Warning, this command will erase any previously existing tags on audio files in this path. Just do it?', 'yes'):
             printLineBreak()
             cleanTags(args)
+    # Write the tags of a previous fill or clean dry run
+    elif args['apply_plan'] is not None:
+        applyTagPlan(args)
     # Otherwise print an error message (missing arguments)
-    else:
+    elif not args['clear_cache']:
         printMissingArguments()
-    # Clean the tmp.jpg image that could resides from fill or scan
-    if os.path.exists('tmp.jpg'):
-        os.remove('tmp.jpg') # GC
 
 
 # Will crawl the folder path given in argument, and all its sub-directories
 def scanFolder(args):
-    # Retrieve folder global information
-    printRetrieveFolderInfo()
-    folderInfo = FolderInfo(args['folder'])
-    printRootFolderInfo(folderInfo)
+    # The selected checks define which inputs are loaded : audio files are not opened for filename only checks
+    checks = CheckSelection(args['only'], args['skip'])
+    if len(checks.invalidCodes) > 0 or len(checks.errors) == 0:
+        printInvalidErrorCodes(checks.invalidCodes)
+        sys.exit(-1)
+    # Folder global information are retrieved while the library is crawled
+    libraryWalker = LibraryWalker(args['folder'])
+    folderInfo = libraryWalker.folderInfo
     # Scan internals
-    totalTracks = folderInfo.flacCounter + folderInfo.mp3Counter
-    rootPathLength = len(args['folder'].split(os.sep))
     scannedTracks = 0
+    scannedAlbums = 0
     errorCounter = 0
-    albumTesters = []
+    albumTesters = []  # Only kept for the verbose report, as the JSON report is written while scanning
+    distinctCovers = 0
+    mixedCoversAlbums = 0
     # Scan progression utils
     step = 10
     percentage = step
     previousLetter = '1' # Ordered folder/file parsing begins with numbers
+    # The scan cache, if any, provides the unchanged albums results and an estimation of the tracks to test
+    scanCache = None
+    estimatedTracks = 0
+    if args['cache'] is not None:
+        scanCache = ScanCache(args['cache'], scriptVersion, checks)
+        estimatedTracks = scanCache.estimateTracks(args['folder'])
+    # Completed albums are journaled, so an interrupted scan can be resumed
+    runJournal = RunJournal('scan', args['folder'], scriptVersion, {'checks': checks.codes()}, args['resume'])
+    # The scan phases are measured in this process, and in each worker for the albums it tests
+    profiler.enabled = args['profile']
+    worker = functools.partial(testAlbum, profile=args['profile'], checks=checks)
     # Start scan
-    printScanStart(args['folder'], totalTracks, len(ErrorEnum))
+    if checks.isPartial is True:
+        printScanChecks(checks.codes(), checks.heaviestInput(), checks.relativeCost())
+    printScanStart(args['folder'], len(checks.errors), estimatedTracks)
+    reportWriter = None
+    if args['dump']:
+        reportWriter = ReportWriter(scriptVersion, 'Errors', args['minify'], args['path'], checks.readCover)
     startTime = time.time()
-    # Sort directories so they are handled in the alphabetical order
-    for root, directories, files in sorted(os.walk(args['folder'])):
-        files = [f for f in files if not f[0] == '.'] # Ignore hidden files
-        directories[:] = [d for d in directories if not d[0] == '.'] # ignore hidden directories
-        # Split root into an array of folders
-        path = root.split(os.sep)
-        # Mutagen needs a preserved path when using ID3() or FLAC()
-        preservedPath = list(path)
-        # Poping all path element that are not the root folder, the artist sub folder or the album sub sub folder
-        for x in range(rootPathLength - 1):
-            path.pop(0)
-        # Current path is for an album directory : perform tests
-        if len(path) == 2 and path[1] != '':
-            albumTester = AlbumTester(files, preservedPath)
+    progressReporter = ProgressReporter('scan', args['progress'] == 'ndjson', args['progress_interval'], len(checks.errors))
+    # Albums completed by the resumed run are taken from the journal, then unchanged ones from the scan cache
+    def lookup(folderListing):
+        results = runJournal.get(os.path.abspath(folderListing.path))
+        if results is not None:
+            return loadAlbumResults(folderListing, results)
+        return scanCache.get(folderListing) if scanCache is not None else None
+    # Albums are tested on the jobs pool as soon as they are crawled, and merged back in the alphabetical order
+    with InterruptGuard() as interruptGuard, AlbumPool(args['jobs']) as pool:
+        for albumTester, tracksErrors in pool.map(worker, progressReporter.watch(libraryWalker.albums()), lookup):
             scannedTracks += albumTester.album.totalTrack
-            errorCounter += albumTester.tracksErrorCounter()
+            scannedAlbums += 1
+            errorCounter += tracksErrors
             errorCounter += albumTester.errorCounter
-            albumTesters.append(albumTester)
-            # Display a progress every step %
-            scannedPercentage = (scannedTracks * 100) / totalTracks
-            if totalTracks > 10 and scannedPercentage >= step and scannedTracks < totalTracks:
-                if (scannedTracks * 100) / totalTracks > percentage and percentage < 100:
-                    printScanProgress(percentage, previousLetter, path[0][0], errorCounter, scannedTracks,
-                                      computePurity(errorCounter, scannedTracks))
-                    percentage += step
-                    previousLetter = path[0][0]  # path[0] is the Artists name
+            if albumTester.timings is not None:
+                profiler.merge(albumTester.timings)
+            if reportWriter is not None:
+                with profiler.phase('report'):
+                    reportWriter.addAlbum(albumTester)
+            if args['verbose']:
+                albumTesters.append(albumTester)
+            distinctCovers += len(albumTester.album.covers)
+            if len(albumTester.album.covers) > 1:
+                mixedCoversAlbums += 1
+            if albumTester.fromCache is False:
+                runJournal.add(os.path.abspath(albumTester.folderListing.path), dumpAlbumResults(albumTester, tracksErrors))
+                if scanCache is not None:
+                    scanCache.put(albumTester, tracksErrors)
+            # Display a progress every step % of the estimated tracks, or of the crawled library
+            if estimatedTracks > 0:
+                progress = scannedTracks * 100 / estimatedTracks
+            else:
+                progress = albumTester.folderListing.progress
+            progressReporter.addAlbum(albumTester.album.totalTrack, progress, tracksErrors + albumTester.errorCounter, albumTester.fromCache)
+            if progress >= percentage and percentage < 100:
+                artistName = albumTester.preservedPath[len(albumTester.preservedPath) - 2]
+                printScanProgress(percentage, previousLetter, artistName[0], errorCounter, scannedTracks,
+                                  computePurity(errorCounter, scannedTracks, len(checks.errors)))
+                percentage += step
+                previousLetter = artistName[0]
+            # On Ctrl-C, the scan stops once the current album is reported, the report only holds the scanned albums
+            if interruptGuard.interrupted is True:
+                folderInfo.computeTotals()
+                break
+    runJournal.close(interruptGuard.interrupted is False)
+    progressReporter.close(interruptGuard.interrupted)
     # In this case, ui has display a percentage progression. No need to add a line break if no progression is to be displayed
-    if totalTracks > 10 and percentage != 10:
+    if percentage != step:
         printLineBreak()
     duration = round(time.time() - startTime, 2)
-    printScanEnd(duration, errorCounter, totalTracks, computePurity(errorCounter, scannedTracks))
-    # Compute and save JSON report
-    if args['dump']:
-        saveReportFile(computeFillReport(scriptVersion, duration, folderInfo, albumTesters, errorCounter,
-                                     computePurity(errorCounter, scannedTracks)), 'Errors', args['minify'], args['path'])
+    if runJournal.resumedAlbums > 0:
+        printRunResumed(runJournal.resumedAlbums)
+    printRootFolderInfo(folderInfo)
+    printScanEnd(duration, errorCounter, folderInfo.tracksCounter, computePurity(errorCounter, scannedTracks, len(checks.errors)))
+    if checks.readCover is True:  # Embedded covers are not read, so not counted, without the cover size check
+        printScanCovers(distinctCovers, scannedAlbums, mixedCoversAlbums)
+    if scanCache is not None:
+        scanCache.close()
+        printScanCacheStatus(scanCache.hits, scanCache.misses)
+    # Complete the JSON report with the library information and the scan results
+    timings = None
+    if reportWriter is not None:
+        with profiler.phase('report'):
+            if args['profile']:
+                timings = profiler.summary()  # Taken before the report is closed, unlike the console timings
+            reportWriter.close(duration, folderInfo, errorCounter, computePurity(errorCounter, scannedTracks, len(checks.errors)),
+                               timings, checks, interruptGuard.interrupted)
+    if args['profile']:
+        printScanTimings(profiler.summary(), duration, args['jobs'])
     # Verbose report
     if args['verbose']:
         printErroredTracksReport(albumTesters)
+    if interruptGuard.interrupted is True:
+        printRunInterrupted(scannedAlbums, runJournal.path)
+        sys.exit(130)
+
+
+# Will scan a stratified random sample of the folder albums, and estimate the library purity from it
+def sampleFolder(args):
+    checks = CheckSelection(args['only'], args['skip'])
+    if len(checks.invalidCodes) > 0 or len(checks.errors) == 0:
+        printInvalidErrorCodes(checks.invalidCodes)
+        sys.exit(-1)
+    if (args['sample'] is not None and not 0 < args['sample'] <= 100) or (args['sample_albums'] is not None and args['sample_albums'] < 1):
+        printInvalidSample()
+        sys.exit(-1)
+    # Only the artists folders are listed to pick the sampled albums, the other albums are never read
+    albumSampler = AlbumSampler(args['folder'], args['sample'], args['sample_albums'], args['sample_seed'], checks)
+    # Sample internals
+    sampledTracks = 0
+    errorCounter = 0
+    # Scan progression utils
+    step = 10
+    percentage = step
+    previousLetter = '1' # Ordered folder/file parsing begins with numbers
+    worker = functools.partial(testAlbum, checks=checks)
+    # Start scan
+    if checks.isPartial is True:
+        printScanChecks(checks.codes(), checks.heaviestInput(), checks.relativeCost())
+    printSampleStart(args['folder'], len(albumSampler.sampledAlbums), albumSampler.totalAlbums, len(albumSampler.strata),
+                     albumSampler.seed, len(checks.errors))
+    startTime = time.time()
+    progressReporter = ProgressReporter('sample', args['progress'] == 'ndjson', args['progress_interval'], len(checks.errors))
+    # Sampled albums are tested on the jobs pool, as in a full scan
+    with AlbumPool(args['jobs']) as pool:
+        for albumTester, tracksErrors in pool.map(worker, progressReporter.watch(albumSampler.albums())):
+            albumSampler.addAlbum(albumTester, tracksErrors)
+            sampledTracks += albumTester.album.totalTrack
+            errorCounter += tracksErrors + albumTester.errorCounter
+            progressReporter.addAlbum(albumTester.album.totalTrack, albumTester.folderListing.progress, tracksErrors + albumTester.errorCounter)
+            # Display a progress every step % of the sampled albums
+            if albumTester.folderListing.progress >= percentage and percentage < 100:
+                artistName = albumTester.preservedPath[len(albumTester.preservedPath) - 2]
+                printScanProgress(percentage, previousLetter, artistName[0], errorCounter, sampledTracks,
+                                  computePurity(errorCounter, sampledTracks, len(checks.errors)))
+                percentage += step
+                previousLetter = artistName[0]
+    progressReporter.close()
+    # In this case, ui has display a percentage progression. No need to add a line break if no progression is to be displayed
+    if percentage != step:
+        printLineBreak()
+    duration = round(time.time() - startTime, 2)
+    printSampleEnd(duration, errorCounter, sampledTracks, albumSampler.estimate(), checkCategories)
+
+
+# Will remove the given folder albums from the scan cache, so they are all tested again on the next scan
+def clearScanCache(args):
+    cachePath = args['cache'] if args['cache'] is not None else 'cache/scan-cache.db'
+    scanCache = ScanCache(cachePath, scriptVersion)
+    printScanCacheCleared(cachePath, scanCache.clear(args['folder']))
+    scanCache.close()
 
 
 # Will pre-fill the tags for tracks in the given folder
 def fillTags(args):
-    # Retrieve folder global information
-    printRetrieveFolderInfo()
-    folderInfo = FolderInfo(args['folder'])
-    printRootFolderInfo(folderInfo)
+    # Folder global information are retrieved while the library is crawled
+    libraryWalker = LibraryWalker(args['folder'])
+    folderInfo = libraryWalker.folderInfo
     # Fill internals
     filledTracks = 0
-    totalTracks = folderInfo.flacCounter + folderInfo.mp3Counter
+    unchangedTracks = 0  # Tracks already holding their filled tags, that were not written
     # Start Fill
-    printFillStart(args['folder'], totalTracks)
-    rootPathLength = len(args['folder'].split(os.sep))
-    albumFillers = []
+    printFillStart(args['folder'])
     # Fill progression utils
     step = 10
     percentage = step
     startTime = time.time()
-    # Sort directories so they are handled in the alphabetical order
-    for root, directories, files in sorted(os.walk(args['folder'])):
-        files = [f for f in files if not f[0] == '.'] # Ignore hidden files
-        directories[:] = [d for d in directories if not d[0] == '.'] # ignore hidden directories
-        # Split root into an array of folders
-        path = root.split(os.sep)
-        # Mutagen needs a preserved path when using ID3() or FLAC()
-        preservedPath = list(path)
-        # Poping all path element that are not the root folder, the artist sub folder or the album sub sub folder
-        for x in range(rootPathLength - 1):
-            path.pop(0)
-        # Current path is for an album directory : perform tests
-        if len(path) == 2 and path[1] != '':
-            albumFiller = AlbumFiller(files, preservedPath, args['verbose'], args['errors'])
-            albumFillers.append(albumFiller)
-            if albumFiller.hasErrors is False:
-                filledTracks += albumFiller.album.totalTrack
-        # Display a progress every step %
-        fillPercentage = (filledTracks * 100) / totalTracks
-        if totalTracks > 10 and fillPercentage >= step and filledTracks < totalTracks:
-            if (filledTracks * 100) / totalTracks > percentage and percentage < 100:
-                printFillProgress(percentage, filledTracks)
+    # Albums are crawled in the alphabetical order, and filled on the jobs pool (each album files are independent)
+    albumWorker = functools.partial(fillAlbum, verbose=args['verbose'], logErrors=args['errors'], dryRun=args['dry_run'])
+    # In dry run, files are not written and their tags changes are saved as a plan
+    tagPlanWriter = TagPlanWriter(scriptVersion, 'fill', args['folder'], args['path']) if args['dry_run'] else None
+    # Filled albums are journaled with their outcome, so an interrupted fill can be resumed
+    runJournal = RunJournal('fill', args['folder'], scriptVersion, {'dryRun': args['dry_run']}, args['resume'])
+    filledAlbums = 0
+    # Albums unchanged since they were last filled are skipped, unless forced
+    albumManifest = AlbumManifest(manifestPath, 'fill', scriptVersion, args['force'])
+    progressReporter = ProgressReporter('fill', args['progress'] == 'ndjson', args['progress_interval'])
+    # Albums filled by the resumed run are not filled again
+    def lookup(folderListing):
+        result = runJournal.get(os.path.abspath(folderListing.path))
+        return (folderListing.path, folderListing.progress, *result) if result is not None else None
+    with InterruptGuard() as interruptGuard, AlbumPool(args['jobs']) as pool:
+        for result in pool.map(albumWorker, progressReporter.watch(albumManifest.filter(libraryWalker.albums())), lookup):
+            albumPath, progress, totalTrack, hasErrors, albumUnchangedTracks, plannedChanges = result
+            runJournal.add(os.path.abspath(albumPath), result[2:])  # Serialized before the plan entries paths are shortened
+            if args['dry_run'] is False and hasErrors is False:  # Badly named albums are filled again, to report them
+                albumManifest.record(albumPath)
+            filledAlbums += 1
+            unchangedTracks += albumUnchangedTracks
+            if tagPlanWriter is not None:
+                tagPlanWriter.addEntries(plannedChanges)
+            if hasErrors is False:
+                filledTracks += totalTrack
+            progressReporter.addAlbum(totalTrack, progress, reused=runJournal.isResumed(os.path.abspath(albumPath)))
+            # Display a progress every step % of the crawled library
+            if progress >= percentage and percentage < 100:
+                printFillProgress(percentage, filledTracks, args['dry_run'])
                 percentage += step
-    # Couldn't fill all track because of naming error
-    if totalTracks is not filledTracks:
-        printInvalidFolderStructure(filledTracks, totalTracks, 'fill')
+            # On Ctrl-C, the fill stops once the current album is filled
+            if interruptGuard.interrupted is True:
+                folderInfo.computeTotals()
+                break
+    runJournal.close(interruptGuard.interrupted is False)
+    albumManifest.close(interruptGuard.interrupted is False)
+    progressReporter.close(interruptGuard.interrupted)
     # In this case, ui has display a percentage progression. No need to add a line break if no progression is to be displayed
-    if totalTracks > 10 and percentage != 10: # If more than 10 tracks and percentage have been displayed (if % = 10, it is its init value)
+    if percentage != step: # If percentage have been displayed (if % = 10, it is its init value)
         printLineBreak()
+    if runJournal.resumedAlbums > 0:
+        printRunResumed(runJournal.resumedAlbums)
+    printRootFolderInfo(folderInfo)
+    # Couldn't fill all track because of naming error
+    if folderInfo.tracksCounter != filledTracks + albumManifest.skippedTracks and interruptGuard.interrupted is False:
+        printInvalidFolderStructure(filledTracks + albumManifest.skippedTracks, folderInfo.tracksCounter, 'fill')
     duration = round(time.time() - startTime, 2)
-    printFillEnd(duration, filledTracks)
+    printFillEnd(duration, filledTracks, unchangedTracks, args['dry_run'])
+    printManifestStatus(filledAlbums, albumManifest.skippedAlbums, albumManifest.skippedTracks, 'filled' if args['dry_run'] is False else 'planned')
+    if tagPlanWriter is not None:
+        tagPlanWriter.close()
+        printTagPlanSaved(tagPlanWriter.path, tagPlanWriter.filesCounter)
+    if interruptGuard.interrupted is True:
+        printRunInterrupted(filledAlbums, runJournal.path)
+        sys.exit(130)
 
 
 # Will make a JSON file with compiled results from input path that contains JSON dumps (from --dump)
@@ -206,51 +387,36 @@ def metaAnalysis(args):
 
 # This method will crawl an audio library and save all its main information (labels, artists, genres)
 def extractStats(args):
-    # Retrieve folder global information
-    printRetrieveFolderInfo()
-    folderInfo = FolderInfo(args['folder'])
-    printRootFolderInfo(folderInfo)
-    # Stat internals
-    artists = []
-    genres = []
-    labels = []
-    analyzedTracks = 0
-    totalTracks = folderInfo.flacCounter + folderInfo.mp3Counter
+    # Folder global information are retrieved while the library is crawled
+    libraryWalker = LibraryWalker(args['folder'])
+    folderInfo = libraryWalker.folderInfo
+    # Stat internals, the library aggregate is made of each album one
+    libraryStats = StatAggregate()
     # Analyze progression utils
-    printStatStart(args['folder'], totalTracks)
+    printStatStart(args['folder'])
     step = 10
     percentage = step
     startTime = time.time()
-    # Sort directories so they are handled in the alphabetical order
-    for root, directories, files in sorted(os.walk(args['folder'])):
-        files = [f for f in files if not f[0] == '.'] # Ignore hidden files
-        directories[:] = [d for d in directories if not d[0] == '.'] # ignore hidden directories
-        # Split root into an array of folders
-        path = root.split(os.sep)
-        # Mutagen needs a preserved path when using ID3() or FLAC()
-        preservedPath = list(path)
-        rootPathLength = len(args['folder'].split(os.sep))
-        # Poping all path element that are not the root folder, the artist sub folder or the album sub sub folder
-        for x in range(rootPathLength - 1):
-            path.pop(0)
-        # Current path is for an album directory : perform tests
-        if len(path) == 2 and path[1] != '':
-            albumStats = StatMaker(files, preservedPath)
-            artists = insertArtistInListIfNotExisting(artists, albumStats.artistsDetails)
-            genres = insertInListIfNotExisting(genres, albumStats.genres)
-            labels = insertInListIfNotExisting(labels, albumStats.labels)
-            analyzedTracks += len(albumStats.tracks)
-        # Display a progress every step %
-        fillPercentage = (analyzedTracks * 100) / totalTracks
-        if totalTracks > 10 and fillPercentage >= step and analyzedTracks < totalTracks:
-            if (analyzedTracks * 100) / totalTracks > percentage and percentage < 100:
-                printStatProgress(percentage, analyzedTracks)
+    progressReporter = ProgressReporter('stat', args['progress'] == 'ndjson', args['progress_interval'])
+    # Albums are analyzed on the jobs pool, and their aggregates merged in the alphabetical order
+    with AlbumPool(args['jobs']) as pool:
+        for progress, albumStats in pool.map(makeAlbumStats, progressReporter.watch(libraryWalker.albums())):
+            libraryStats.merge(albumStats)
+            progressReporter.addAlbum(albumStats.tracksCounter, progress)
+            # Display a progress every step % of the crawled library
+            if progress >= percentage and percentage < 100:
+                printStatProgress(percentage, libraryStats.tracksCounter)
                 percentage += step
+    progressReporter.close()
+    artists = libraryStats.artistsDetails()
+    genres = list(libraryStats.genres)
+    labels = list(libraryStats.labels)
     # In this case, ui has display a percentage progression. No need to add a line break if no progression is to be displayed
-    if totalTracks > 10 and percentage != 10:
+    if percentage != step:
         printLineBreak()
     duration = round(time.time() - startTime, 2)
-    printStatEnd(duration, analyzedTracks)
+    printRootFolderInfo(folderInfo)
+    printStatEnd(duration, libraryStats.tracksCounter)
     # Compute and save JSON report
     if args['dump']:
         saveReportFile(computeStatReport(scriptVersion, duration, artists, genres, labels, folderInfo.folder), 'Stats', args['minify'], args['path'])
@@ -262,158 +428,69 @@ def extractStats(args):
 
 # Thuis method will crawl the audio library and generate for each unique artist and genre a JSON file for ManaZeak assets
 def generateJSON(args):
-    # Retrieve folder global information
-    printRetrieveFolderInfo()
-    folderInfo = FolderInfo(args['folder'])
-    printRootFolderInfo(folderInfo)
+    # Folder global information are retrieved while the library is crawled
+    libraryWalker = LibraryWalker(args['folder'])
+    folderInfo = libraryWalker.folderInfo
     # Scan internals
-    totalTracks = folderInfo.flacCounter + folderInfo.mp3Counter
-    rootPathLength = len(args['folder'].split(os.sep))
     parsedTracks = 0
     errorCounter = 0
     albumTesters = []
-
-    artists = []
-    artistsAlbums = {}
-    genres = []
-    genresAlbums = {}
-    labels = []
-    labelsAlbums = {}
+    # Artists, genres and labels to albums mappings
+    libraryAggregator = LibraryAggregator()
     # Scan progression utils
     step = 10
     percentage = step
     previousLetter = '1' # Ordered folder/file parsing begins with numbers
     # Start scan
-    printGenerationStart(totalTracks, args['path'])
+    printGenerationStart(args['path'])
     startTime = time.time()
-    # Sort directories so they are handled in the alphabetical order
-    for root, directories, files in sorted(os.walk(args['folder'])):
-        files = [f for f in files if not f[0] == '.'] # Ignore hidden files
-        directories[:] = [d for d in directories if not d[0] == '.'] # ignore hidden directories
-        # Split root into an array of folders
-        path = root.split(os.sep)
-        # Mutagen needs a preserved path when using ID3() or FLAC()
-        preservedPath = list(path)
-        # Poping all path element that are not the root folder, the artist sub folder or the album sub sub folder
-        for x in range(rootPathLength - 1):
-            path.pop(0)
-        # Current path is for an album directory : perform tests
-        if len(path) == 2 and path[1] != '':
-            albumTester = AlbumTester(files, preservedPath)
-            parsedTracks += albumTester.album.totalTrack
-            # Artists section
-            # Append release artist if not already added
-            if not albumTester.album.albumArtist in artists:
-                artists.append(removeSpecialCharFromString(albumTester.album.albumArtist))
-            if not albumTester.album.albumArtist in artistsAlbums:
-                artistsAlbums[removeSpecialCharFromString(albumTester.album.albumArtist)] = {
-                    'albumArtist': [albumTester.album],
-                    'artist': [],
-                    'performer': [],
-                    'producer': [],
-                    'composer': []
-                }
-            else:
-                artistsAlbums[removeSpecialCharFromString(albumTester.album.albumArtist)]['albumArtist'].append(albumTester.album)
-            # Label filling
-            if not albumTester.album.label in labels:
-                labels.append(removeSpecialCharFromString(albumTester.album.label))
-            if not albumTester.album.label in labelsAlbums:
-                labelsAlbums[removeSpecialCharFromString(albumTester.album.label)] = [albumTester.album]
+    # Tested albums are journaled, so an interrupted generation can be resumed
+    runJournal = RunJournal('gen', args['folder'], scriptVersion, None, args['resume'])
+    parsedAlbums = 0
+    progressReporter = ProgressReporter('gen', args['progress'] == 'ndjson', args['progress_interval'])
+    # Albums were crawled in the alphabetical order
+    with InterruptGuard() as interruptGuard:
+        for albumFolder in progressReporter.watch(libraryWalker.albums()):
+            albumPath = os.path.abspath(albumFolder.path)
+            results = runJournal.get(albumPath)
+            if results is not None:  # Tested by the resumed run
+                albumTester = loadAlbumResults(albumFolder, results)[0]
             else:
-                labelsAlbums[removeSpecialCharFromString(albumTester.album.label)].append(albumTester.album)
-            # Iterate over tracks now
-            for track in albumTester.tracks:
-                for artist in track.track.artists:
-                    if not artist in artists:
-                        artists.append(removeSpecialCharFromString(artist))
-                    if not artist in artistsAlbums:
-                        artistsAlbums[removeSpecialCharFromString(artist)] = {
-                            'albumArtist': [],
-                            'artist': [albumTester.album],
-                            'performer': [],
-                            'producer': [],
-                            'composer': []
-                        }
-                    else:
-                        artistsAlbums[removeSpecialCharFromString(artist)]['artist'].append(albumTester.album)
-                for performer in track.track.performers:
-                    if not performer in artists:
-                        artists.append(removeSpecialCharFromString(performer))
-                    if not performer in artistsAlbums:
-                        artistsAlbums[removeSpecialCharFromString(performer)] = {
-                            'albumArtist': [],
-                            'artist': [],
-                            'performer': [albumTester.album],
-                            'producer': [],
-                            'composer': []
-                        }
-                    else:
-                        artistsAlbums[removeSpecialCharFromString(performer)]['performer'].append(albumTester.album)
-                for producer in track.track.producers:
-                    if not producer in artists:
-                        artists.append(removeSpecialCharFromString(producer))
-                    if not producer in artistsAlbums:
-                        artistsAlbums[removeSpecialCharFromString(producer)] = {
-                            'albumArtist': [],
-                            'artist': [],
-                            'performer': [],
-                            'producer': [albumTester.album],
-                            'composer': []
-                        }
-                    else:
-                        artistsAlbums[removeSpecialCharFromString(producer)]['producer'].append(albumTester.album)
-                for composer in track.track.composers:
-                    c = re.sub(r' \([^()]*\)', '', composer)
-                    realName = re.search(r'\((.*?)\)', composer)
-                    if not c in artists:
-                        artists.append(removeSpecialCharFromString(c))
-                    if not c in artistsAlbums:
-                        artistsAlbums[removeSpecialCharFromString(c)] = {
-                            'albumArtist': [],
-                            'artist': [],
-                            'performer': [],
-                            'producer': [],
-                            'composer': [albumTester.album]
-                        }
-                    else:
-                        artistsAlbums[removeSpecialCharFromString(c)]['composer'].append(albumTester.album)
-                    if realName != None and realName.group(1).find(',') == -1:
-                        artistsAlbums[removeSpecialCharFromString(c)]['realName'] = removeSpecialCharFromString(realName.group(1))
-                # Updating genre
-                for genre in track.track.genres:
-                    if not genre in genres:
-                        genres.append(genre)
-                    if not genre in genresAlbums:
-                        genresAlbums[genre] = [albumTester.album]
-                    else:
-                        genresAlbums[genre].append(albumTester.album)
-            # Display a progress every step %
-            scannedPercentage = (parsedTracks * 100) / totalTracks
-            if totalTracks > 10 and scannedPercentage >= step and parsedTracks < totalTracks:
-                if (parsedTracks * 100) / totalTracks > percentage and percentage < 100:
-                    printGenerationProgress(percentage, parsedTracks)
-                    percentage += step
+                albumTester = AlbumTester(albumFolder)
+                runJournal.add(albumPath, dumpAlbumResults(albumTester, 0))
+            parsedAlbums += 1
+            parsedTracks += albumTester.album.totalTrack
+            libraryAggregator.addAlbum(albumTester)
+            progressReporter.addAlbum(albumTester.album.totalTrack, albumFolder.progress, reused=albumTester.fromCache)
+            # Display a progress every step % of the crawled library
+            if albumFolder.progress >= percentage and percentage < 100:
+                printGenerationProgress(percentage, parsedTracks)
+                percentage += step
+            # On Ctrl-C, the generation stops once the current album is aggregated, and no file is written
+            if interruptGuard.interrupted is True:
+                folderInfo.computeTotals()
+                break
+    runJournal.close(interruptGuard.interrupted is False)
+    progressReporter.close(interruptGuard.interrupted)
     # In this case, ui has display a percentage progression. No need to add a line break if no progression is to be displayed
-    if totalTracks > 10 and percentage != 10:
+    if percentage != step:
         printLineBreak()
     duration = round(time.time() - startTime, 2)
+    if runJournal.resumedAlbums > 0:
+        printRunResumed(runJournal.resumedAlbums)
+    printRootFolderInfo(folderInfo)
+    artists = libraryAggregator.artists
+    genres = libraryAggregator.genres
+    labels = libraryAggregator.labels
     printGenerationEnd(duration, len(artists), len(genres), len(labels))
-    # Compute and save JSON report
+    if interruptGuard.interrupted is True:  # A partial library would remove the files of the albums left to test
+        printRunInterrupted(parsedAlbums, runJournal.path)
+        sys.exit(130)
+    # Compute and save JSON files, only the changed ones are written and the ones not in the library anymore are removed
     if args['path']:
-        saveGeneratedJSONFile(artists, artistsAlbums, 'artists', args['path'])
-        saveGeneratedJSONFile(genres, genresAlbums, 'genres', args['path'])
-        saveGeneratedJSONFile(labels, labelsAlbums, 'labels', args['path'])
-    # Perform cleaning on files (remove all not in lists)
-    for filename in os.listdir(args['path'] + '/artists/txt'):
-        if filename[:-5] not in artists:
-            os.remove(args['path'] + '/artists/txt/' + filename)
-    for filename in os.listdir(args['path'] + '/genres/txt'):
-        if filename[:-5] not in genres:
-            os.remove(args['path'] + '/genres/txt/' + filename)
-    for filename in os.listdir(args['path'] + '/labels/txt'):
-        if filename[:-5] not in labels:
-            os.remove(args['path'] + '/labels/txt/' + filename)
+        printGenerationFiles('artists', saveGeneratedJSONFiles(artists.keys(), artists, 'artists', args['path']))
+        printGenerationFiles('genres', saveGeneratedJSONFiles(genres.keys(), genres, 'genres', args['path']))
+        printGenerationFiles('labels', saveGeneratedJSONFiles(labels.keys(), labels, 'labels', args['path']))
     # Verbose report
     if args['verbose']:
         printErroredTracksReport(albumTesters)
@@ -421,48 +498,75 @@ def generateJSON(args):
 
 # This method will clear ever tags in audio files for the scanned folder
 def cleanTags(args):
-    # Retrieve folder global information
-    printRetrieveFolderInfo()
-    folderInfo = FolderInfo(args['folder'])
-    printRootFolderInfo(folderInfo)
-    # Fill internals
+    # Folder global information are retrieved while the library is crawled
+    libraryWalker = LibraryWalker(args['folder'])
+    folderInfo = libraryWalker.folderInfo
+    # Clean internals
     cleanedTracks = 0
-    totalTracks = folderInfo.flacCounter + folderInfo.mp3Counter
-    # Start Fill
-    printCleanStart(args['folder'], totalTracks)
-    rootPathLength = len(args['folder'].split(os.sep))
-    albumCleaners = []
-    # Fill progression utils
+    unchangedTracks = 0  # Tracks already cleaned, that were not written
+    # Start Clean
+    printCleanStart(args['folder'])
+    # Clean progression utils
     step = 10
     percentage = step
     startTime = time.time()
-    # Sort directories so they are handled in the alphabetical order
-    for root, directories, files in sorted(os.walk(args['folder'])):
-        files = [f for f in files if not f[0] == '.'] # Ignore hidden files
-        directories[:] = [d for d in directories if not d[0] == '.'] # ignore hidden directories
-        # Split root into an array of folders
-        path = root.split(os.sep)
-        # Mutagen needs a preserved path when using ID3() or FLAC()
-        preservedPath = list(path)
-        # Poping all path element that are not the root folder, the artist sub folder or the album sub sub folder
-        for x in range(rootPathLength - 1):
-            path.pop(0)
-        # Current path is for an album directory : perform tests
-        if len(path) == 2 and path[1] != '':
-            albumCleaner = AlbumCleaner(files, preservedPath)
-            albumCleaners.append(albumCleaner)
-            cleanedTracks += albumCleaner.album.totalTrack
-        # Display a progress every step %
-        cleanPercentage = (cleanedTracks * 100) / totalTracks
-        if totalTracks > 10 and cleanPercentage >= step:
-            if (cleanedTracks * 100) / totalTracks > percentage and percentage < 100:
-                printCleanProgress(percentage, cleanedTracks)
+    # In dry run, files are not written and their tags changes are saved as a plan
+    tagPlanWriter = TagPlanWriter(scriptVersion, 'clean', args['folder'], args['path']) if args['dry_run'] else None
+    # Albums unchanged since they were last cleaned are skipped, unless forced
+    albumManifest = AlbumManifest(manifestPath, 'clean', scriptVersion, args['force'])
+    cleanedAlbums = 0
+    progressReporter = ProgressReporter('clean', args['progress'] == 'ndjson', args['progress_interval'])
+    # Albums were crawled in the alphabetical order, and are cleaned on the jobs pool
+    albumWorker = functools.partial(cleanAlbum, dryRun=args['dry_run'])
+    with InterruptGuard() as interruptGuard, AlbumPool(args['jobs']) as pool:
+        for albumPath, progress, totalTrack, albumUnchangedTracks, plannedChanges in pool.map(albumWorker, progressReporter.watch(albumManifest.filter(libraryWalker.albums()))):
+            if args['dry_run'] is False:
+                albumManifest.record(albumPath)
+            cleanedAlbums += 1
+            cleanedTracks += totalTrack
+            unchangedTracks += albumUnchangedTracks
+            progressReporter.addAlbum(totalTrack, progress)
+            if tagPlanWriter is not None:
+                tagPlanWriter.addEntries(plannedChanges)
+            # Display a progress every step % of the crawled library
+            if progress >= percentage and percentage < 100:
+                printCleanProgress(percentage, cleanedTracks, args['dry_run'])
                 percentage += step
+            # On Ctrl-C, the clean stops once the current album is cleaned, the cleaned albums are kept in the manifest
+            if interruptGuard.interrupted is True:
+                folderInfo.computeTotals()
+                break
+    progressReporter.close(interruptGuard.interrupted)
     # In this case, ui has display a percentage progression. No need to add a line break if no progression is to be displayed
-    if totalTracks > 10:
+    if percentage != step:
         printLineBreak()
     duration = round(time.time() - startTime, 2)
-    printCleanEnd(duration, cleanedTracks)
+    printRootFolderInfo(folderInfo)
+    albumManifest.close()
+    printCleanEnd(duration, cleanedTracks, unchangedTracks, args['dry_run'])
+    printManifestStatus(cleanedAlbums, albumManifest.skippedAlbums, albumManifest.skippedTracks, 'cleaned' if args['dry_run'] is False else 'planned')
+    if tagPlanWriter is not None:
+        tagPlanWriter.close()
+        printTagPlanSaved(tagPlanWriter.path, tagPlanWriter.filesCounter)
+    if interruptGuard.interrupted is True:
+        printCleanInterrupted(cleanedAlbums, args['dry_run'])
+        sys.exit(130)
+
+
+# Write the tags planned by a fill or clean dry run, the plan file paths being relative to the given folder
+def applyTagPlan(args):
+    tagPlanApplier = TagPlanApplier(args['apply_plan'], args['folder'])
+    if tagPlanApplier.header is None:
+        printInvalidTagPlan(args['apply_plan'])
+        sys.exit(-1)
+    mode = tagPlanApplier.header['plan']
+    if mode == 'clean' and not queryYesNo('> Warning, this plan will erase any previously existing tags on audio files in this path. Just do it?', 'yes'):
+        return
+    printTagPlanStart(args['apply_plan'], mode, args['folder'])
+    startTime = time.time()
+    tagPlanApplier.apply()
+    duration = round(time.time() - startTime, 2)
+    printTagPlanEnd(duration, tagPlanApplier.appliedFiles, tagPlanApplier.staleFiles, tagPlanApplier.missingFiles)
 
 
 # Script start point
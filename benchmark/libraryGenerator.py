@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+
+
+# Python imports
+import io
+import os
+import sys
+import random
+import struct
+import argparse
+from PIL import Image
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import ID3, TIT2, TPE1, TPE2, TALB, TDRC, TPUB, TCOP, TCOM, TOPE, TLAN, TRCK, TPOS, TCMP, TDOR, TBPM, APIC
+# Project imports, the generator being run from the repository root or from this folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.references.refGenre import RefGenre
+from src.utils.collation import sortStrings
+
+
+# Names pools used to build artists, albums and titles
+artistNames = ['Daft Punk', 'Björk', 'Étienne de Crécy', 'Sigur Rós', 'Air', 'Justice', 'Röyksopp', 'Boards of Canada',
+               'Françoise Hardy', 'Mr. Oizo', 'Sébastien Tellier', 'Tiësto', 'Yann Tiersen', 'Queen', 'Radiohead',
+               'Massive Attack', 'Bérurier Noir', 'Mötley Crüe', 'Portishead', 'Aphex Twin', 'Cassius', 'Zazie']
+titleWords = ['Love', 'Night', 'Electric', 'Dream', 'Ocean', 'Fire', 'Paris', 'Lights', 'Heart', 'Blue', 'Echo',
+              'Silence', 'Gold', 'Rain', 'Motion', 'Velvet', 'Horizon', 'Ghost', 'Summer', 'Machine']
+labels = ['Warp Records', 'Ed Banger Records', 'Because Music', 'XL Recordings', 'Ninja Tune']
+countries = ['FRA', 'GBR', 'USA', 'ISL', 'NOR', 'DEU']
+# Errors that can be injected in a track, see --error-rate
+injectableErrors = ['yearTag', 'missingTitle', 'missingCover', 'pngCover', 'smallCover', 'coverDescription',
+                    'unknownGenre', 'lowerCaseLanguage', 'unsortedPerformers', 'trackTotal']
+
+
+# Generates a library following the ManaZeak naming convention, returns its track and error counts
+class LibraryGenerator(object):
+    def __init__(self, root, artists, seed=1, errorRate=0.0, mp3Ratio=0.3, albums=(1, 3), tracks=(4, 12)):
+        self.root = root
+        self.artists = artists
+        self.errorRate = errorRate
+        self.mp3Ratio = mp3Ratio
+        self.albums = albums
+        self.tracks = tracks
+        self.random = random.Random(seed)
+        self.genres = sorted(RefGenre.genres)
+        self.tracksCounter = 0
+        self.albumsCounter = 0
+        self.injectedErrors = 0
+        # Covers are encoded once, each album picks its own color
+        self.covers = [self._buildImage(1000, color, 'JPEG') for color in [(200, 30, 30), (30, 200, 30), (30, 30, 200)]]
+        self.smallCover = self._buildImage(500, (120, 120, 120), 'JPEG')
+        self.pngCover = self._buildImage(1000, (10, 10, 10), 'PNG')
+
+
+    # Build the whole library
+    def generate(self):
+        for artistIndex in range(self.artists):
+            artist = artistNames[artistIndex % len(artistNames)]
+            if artistIndex >= len(artistNames):  # Keep artists unique once the pool is exhausted
+                artist = '{} {}'.format(artist, artistIndex // len(artistNames) + 1)
+            for albumIndex in range(self.random.randint(*self.albums)):
+                self._generateAlbum(artist, albumIndex)
+        return {
+            'artists': self.artists,
+            'albums': self.albumsCounter,
+            'tracks': self.tracksCounter,
+            'injectedErrors': self.injectedErrors
+        }
+
+
+    # Build an album folder, its cover file and its tracks
+    def _generateAlbum(self, artist, albumIndex):
+        year = self.random.randint(1970, 2020)
+        date = '{}-{:02d}-{:02d}'.format(year, self.random.randint(1, 12), self.random.randint(1, 28))
+        title = '{} {}'.format(self.random.choice(titleWords), albumIndex + 1)
+        folder = os.path.join(self.root, artist, '{} - {}'.format(date, title))
+        os.makedirs(folder, exist_ok=True)
+        album = {
+            'artist': artist,
+            'year': str(year),
+            'date': date,
+            'title': title,
+            'label': self.random.choice(labels),
+            'language': self.random.choice(countries),
+            'genres': self.random.sample(self.genres, 2),
+            'cover': self.random.choice(self.covers),
+            'coverName': '{} - {} - {} - Front.jpg'.format(artist, year, title),
+            'totalTrack': self.random.randint(*self.tracks)
+        }
+        with open(os.path.join(folder, album['coverName']), 'wb') as coverFile:
+            coverFile.write(album['cover'])
+        for trackIndex in range(album['totalTrack']):
+            self._generateTrack(folder, album, trackIndex + 1)
+        self.albumsCounter += 1
+
+
+    # Build a track file, with its tags set according to the convention unless an error is injected
+    def _generateTrack(self, folder, album, trackNumber):
+        artists = [album['artist']]
+        featurings = []
+        if self.random.random() < 0.2:
+            featurings = [self.random.choice([name for name in artistNames if name != album['artist']])]
+        title = '{} {}'.format(self.random.choice(titleWords), self.random.choice(titleWords))
+        if len(featurings) > 0:
+            title = '{} (feat. {})'.format(title, ', '.join(featurings))
+        tags = {
+            'title': title,
+            'artists': artists,
+            'performers': sortStrings(artists + featurings),
+            'year': album['year'],
+            'totalTrack': str(album['totalTrack']),
+            'genres': album['genres'],
+            'language': album['language'],
+            'cover': album['cover'],
+            'coverType': 'image/jpeg',
+            'coverDescription': album['coverName']
+        }
+        if self.random.random() < self.errorRate:
+            self._injectError(tags)
+        isMP3 = self.random.random() < self.mp3Ratio
+        fileName = '{} - {} - {} - 1{:02d} - {} - {}.{}'.format(album['artist'], album['year'], album['title'], trackNumber,
+                                                                ', '.join(artists), title, 'mp3' if isMP3 else 'flac')
+        path = os.path.join(folder, fileName)
+        if isMP3:
+            self._writeMP3(path, album, tags, trackNumber)
+        else:
+            self._writeFLAC(path, album, tags, trackNumber)
+        self.tracksCounter += 1
+
+
+    # Alter the track tags with a random convention error
+    def _injectError(self, tags):
+        error = self.random.choice(injectableErrors)
+        if error == 'yearTag':
+            tags['year'] = str(int(tags['year']) + 1)
+        elif error == 'missingTitle':
+            tags['title'] = ''
+        elif error == 'missingCover':
+            tags['cover'] = None
+        elif error == 'pngCover':
+            tags['cover'] = self.pngCover
+            tags['coverType'] = 'image/png'
+        elif error == 'smallCover':
+            tags['cover'] = self.smallCover
+        elif error == 'coverDescription':
+            tags['coverDescription'] = 'cover.jpg'
+        elif error == 'unknownGenre':
+            tags['genres'] = ['Unknown Genre']
+        elif error == 'lowerCaseLanguage':
+            tags['language'] = tags['language'].lower()
+        elif error == 'unsortedPerformers':
+            tags['performers'] = tags['performers'] + ['Aaa']
+        elif error == 'trackTotal':
+            tags['totalTrack'] = str(int(tags['totalTrack']) + 1)
+        self.injectedErrors += 1
+
+
+    # Write a FLAC file made of a STREAMINFO block only, then its Vorbis comments and picture
+    def _writeFLAC(self, path, album, tags, trackNumber):
+        with open(path, 'wb') as audioFile:
+            audioFile.write(self._buildFLACStream())
+        audioTag = FLAC(path)
+        audioTag['TITLE'] = tags['title']
+        audioTag['ARTIST'] = '; '.join(tags['artists'])
+        audioTag['ALBUMARTIST'] = album['artist']
+        audioTag['ALBUM'] = album['title']
+        audioTag['DATE'] = tags['year']
+        audioTag['RELEASEDATE'] = album['date']
+        audioTag['TRACKNUMBER'] = str(trackNumber)
+        audioTag['TRACKTOTAL'] = tags['totalTrack']
+        audioTag['DISCNUMBER'] = '1'
+        audioTag['DISCTOTAL'] = '1'
+        audioTag['PERFORMER'] = '; '.join(tags['performers'])
+        audioTag['COMPOSER'] = album['artist']
+        audioTag['PRODUCER'] = album['artist']
+        audioTag['LABEL'] = album['label']
+        audioTag['GENRE'] = '; '.join(tags['genres'])
+        audioTag['LANGUAGE'] = tags['language']
+        audioTag['COMPILATION'] = '0'
+        audioTag['BPM'] = str(self.random.randint(80, 160))
+        if tags['cover'] is not None:
+            picture = Picture()
+            picture.type = 3  # COVER_FRONT
+            picture.mime = tags['coverType']
+            picture.desc = tags['coverDescription']
+            picture.width = 1000
+            picture.height = 1000
+            picture.depth = 24
+            picture.data = tags['cover']
+            audioTag.add_picture(picture)
+        audioTag.save()
+
+
+    # Write a MP3 file made of a few silent MPEG frames, then its ID3 tags
+    def _writeMP3(self, path, album, tags, trackNumber):
+        with open(path, 'wb') as audioFile:
+            audioFile.write((b'\xff\xfb\x90\x64' + b'\x00' * 413) * 4)
+        audioTag = ID3()
+        audioTag.add(TIT2(text=tags['title']))
+        audioTag.add(TPE1(text='; '.join(tags['artists'])))
+        audioTag.add(TPE2(text=album['artist']))
+        audioTag.add(TALB(text=album['title']))
+        audioTag.add(TDRC(text=tags['year']))
+        audioTag.add(TDOR(text=album['date']))
+        audioTag.add(TRCK(text='{}/{}'.format(trackNumber, tags['totalTrack'])))
+        audioTag.add(TPOS(text='1/1'))
+        audioTag.add(TOPE(text='; '.join(tags['performers'])))
+        audioTag.add(TCOM(text=album['artist']))
+        audioTag.add(TPUB(text=album['artist']))
+        audioTag.add(TCOP(text=album['label']))
+        audioTag.add(TLAN(text=tags['language']))
+        audioTag.add(TCMP(text='0'))
+        audioTag.add(TBPM(text=str(self.random.randint(80, 160))))
+        if tags['cover'] is not None:
+            audioTag.add(APIC(3, tags['coverType'], 3, tags['coverDescription'], tags['cover']))
+        audioTag.save(path, v2_version=3)
+
+
+    # The smallest valid FLAC stream : the magic number and a last STREAMINFO block (44.1 kHz, stereo, 16 bits)
+    @staticmethod
+    def _buildFLACStream():
+        streamInfo = struct.pack('>HH', 4096, 4096) + b'\x00' * 6
+        streamInfo += struct.pack('>Q', (44100 << 44) | (1 << 41) | (15 << 36)) + b'\x00' * 16
+        return b'fLaC' + bytes([0x80]) + len(streamInfo).to_bytes(3, 'big') + streamInfo
+
+
+    # Encode a plain color image
+    @staticmethod
+    def _buildImage(size, color, imageFormat):
+        output = io.BytesIO()
+        Image.new('RGB', (size, size), color).save(output, imageFormat)
+        return output.getvalue()
+
+
+# Generator entry point
+def main():
+    ap = argparse.ArgumentParser(description='Generate a synthetic library following the ManaZeak naming convention')
+    ap.add_argument('folder', help='The output folder of the library')
+    ap.add_argument('-a', '--artists', help='Number of artists to generate', type=int, default=20)
+    ap.add_argument('-s', '--seed', help='Random seed, the same seed always generates the same library', type=int, default=1)
+    ap.add_argument('-e', '--error-rate', help='Probability for a track to hold a convention error (0 to 1)', type=float, default=0.1)
+    ap.add_argument('-m', '--mp3-ratio', help='Probability for a track to be a MP3 file instead of a FLAC one', type=float, default=0.3)
+    args = vars(ap.parse_args())
+    stats = LibraryGenerator(args['folder'], args['artists'], args['seed'], args['error_rate'], args['mp3_ratio']).generate()
+    print('> Generated {} artist(s), {} album(s) and {} track(s) with {} injected error(s) in \'{}\''.format(
+        stats['artists'], stats['albums'], stats['tracks'], stats['injectedErrors'], args['folder']))
+
+
+if __name__ == '__main__':
+    main()
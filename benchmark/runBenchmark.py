@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+
+# Python imports
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+# Project imports, the benchmark being run from the repository root or from this folder
+repositoryPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, repositoryPath)
+from libraryGenerator import LibraryGenerator
+
+
+# Modes arguments, fill and clean modify the audio files so they are run on a copy of the library
+modesArguments = {
+    'scan': ['--scan', '--dump'],
+    'stat': ['--stat', '--dump'],
+    'gen': ['--gen'],
+    'fill': ['--fill'],
+    'clean': ['--clean']
+}
+modifyingModes = ['fill', 'clean']
+pooledModes = ['scan', 'stat', 'fill', 'clean']  # Modes accepting --jobs
+
+
+# Run OstrichRemover in a child process, returns its duration and the peak RSS of its largest process (in kB)
+def runMode(mode, library, outputPath, jobs):
+    command = [sys.executable, os.path.join(repositoryPath, 'OstrichRemover.py'), *modesArguments[mode],
+               '--path', outputPath, os.path.join(library, '')]
+    if mode in pooledModes and jobs > 1:
+        command[2:2] = ['--jobs', str(jobs)]
+    startTime = time.perf_counter()
+    process = subprocess.Popen(command, cwd=outputPath, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE)
+    process.stdin.write(b'yes\n')  # Answer the clean mode confirmation
+    process.stdin.close()
+    stderr = process.stderr.read()
+    # os.wait4() gives the resource usage of this child only, unlike resource.getrusage(RUSAGE_CHILDREN)
+    pid, status, usage = os.wait4(process.pid, 0)
+    duration = time.perf_counter() - startTime
+    process.returncode = os.waitstatus_to_exitcode(status)
+    process.stderr.close()
+    maxRSS = usage.ru_maxrss if platform.system() != 'Darwin' else usage.ru_maxrss // 1024  # Bytes on macOS
+    error = None
+    if process.returncode != 0:
+        error = stderr.decode('utf-8', 'replace').strip().split('\n')[-1]
+    return duration, maxRSS, error
+
+
+# Run each mode on the library, and return the benchmark results
+def runBenchmark(library, stats, modes, jobs, runs):
+    results = {}
+    for mode in modes:
+        durations = []
+        maxRSS = 0
+        error = None
+        for run in range(runs):
+            with tempfile.TemporaryDirectory(prefix='ostrich-benchmark-') as workPath:
+                target = library
+                if mode in modifyingModes:
+                    target = os.path.join(workPath, 'library')
+                    shutil.copytree(library, target)
+                outputPath = os.path.join(workPath, 'output')
+                os.makedirs(outputPath)
+                duration, runMaxRSS, error = runMode(mode, target, outputPath, jobs)
+            durations.append(duration)
+            maxRSS = max(maxRSS, runMaxRSS)
+            if error is not None:
+                break
+        best = min(durations)
+        results[mode] = {
+            'seconds': round(best, 3),
+            'tracksPerSecond': round(stats['tracks'] / best, 1),
+            'maxRSSKiloBytes': maxRSS,
+            'error': error
+        }
+        printModeResult(mode, results[mode])
+    return results
+
+
+# Prints a mode result line
+def printModeResult(mode, result):
+    if result['error'] is not None:
+        print('> {:5s} : failed ({})'.format(mode, result['error']))
+    else:
+        print('> {:5s} : {:8.3f} s, {:9.1f} tracks/s, {:7.1f} MB peak RSS'.format(mode, result['seconds'], result['tracksPerSecond'],
+                                                                              result['maxRSSKiloBytes'] / 1024))
+
+
+# Prints the evolution of each mode against a previously saved baseline
+def printComparison(results, baseline):
+    print('\n  Comparison with the baseline from {}'.format(baseline['date']))
+    for mode, result in results.items():
+        if mode not in baseline['results'] or result['error'] is not None or baseline['results'][mode]['error'] is not None:
+            continue
+        reference = baseline['results'][mode]
+        print('> {:5s} : speed x{:.2f}, peak RSS x{:.2f}'.format(mode, result['tracksPerSecond'] / reference['tracksPerSecond'],
+                                                              result['maxRSSKiloBytes'] / reference['maxRSSKiloBytes']))
+
+
+# Benchmark entry point
+def main():
+    ap = argparse.ArgumentParser(description='Time OstrichRemover modes on a synthetic library')
+    ap.add_argument('-a', '--artists', help='Number of artists in the generated library', type=int, default=50)
+    ap.add_argument('-s', '--seed', help='Library generation seed', type=int, default=1)
+    ap.add_argument('-e', '--error-rate', help='Probability for a track to hold a convention error', type=float, default=0.1)
+    ap.add_argument('-l', '--library', help='Benchmark an existing library instead of generating one')
+    ap.add_argument('-m', '--modes', help='Comma separated modes to run', default='scan,stat,gen,fill,clean')
+    ap.add_argument('-j', '--jobs', help='Worker processes for the scan, stat, fill and clean modes', type=int, default=1)
+    ap.add_argument('-r', '--runs', help='Runs per mode, the best one is kept', type=int, default=1)
+    ap.add_argument('-o', '--output', help='Save the results as a JSON baseline file')
+    ap.add_argument('-b', '--baseline', help='Compare the results with a JSON baseline file')
+    args = vars(ap.parse_args())
+    modes = args['modes'].split(',')
+    with tempfile.TemporaryDirectory(prefix='ostrich-library-') as libraryPath:
+        if args['library'] is not None:
+            library = os.path.abspath(args['library'])
+            tracks = sum(1 for root, dirs, files in os.walk(library) for f in files if f.lower().endswith(('.flac', '.mp3')))
+            stats = {'tracks': tracks}
+        else:
+            library = libraryPath
+            stats = LibraryGenerator(library, args['artists'], args['seed'], args['error_rate']).generate()
+        print('  Benchmark on {} track(s), {} run(s) per mode'.format(stats['tracks'], args['runs']))
+        results = runBenchmark(library, stats, modes, args['jobs'], args['runs'])
+    output = {
+        'date': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'library': stats if args['library'] is None else {'path': library, **stats},
+        'jobs': args['jobs'],
+        'seed': args['seed'],
+        'results': results
+    }
+    if args['baseline'] is not None:
+        with open(args['baseline']) as baselineFile:
+            printComparison(results, json.load(baselineFile))
+    if args['output'] is not None:
+        with open(args['output'], 'w') as outputFile:
+            json.dump(output, outputFile, indent=2)
+
+
+if __name__ == '__main__':
+    main()
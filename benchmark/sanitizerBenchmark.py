@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+
+# Python imports
+import os
+import sys
+import random
+import timeit
+# Project imports, the benchmark being run from the repository root or from this folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.references.refCountry import RefCountry
+from src.references.refForbiddenChar import RefForbiddenChar
+from src.references.refGenre import RefGenre
+from src.utils.tools import removeSpecialCharFromString, removeSpecialCharFromArray
+
+
+# Realistic artist names : accents, featurings, and the forbidden char that are found in actual tags
+namesParts = ['Daft Punk', 'Étienne de Crécy', 'AC/DC', 'Mötley Crüe', 'N*E*R*D', 'Sigur Rós', 'Björk', 'Guns N\' Roses',
+              'Why?', 'Ñengo Flow', 'M|O|O|N', 'Florence + The Machine', 'Bérurier Noir', '2Pac', 'Françoise Hardy',
+              'Panic! At The Disco', 'Tiësto', 'Boards of Canada', 'Röyksopp', 'DJ Shadow', 'Mr. Oizo', 'Sébastien Tellier']
+
+
+# The sanitizers as they were written before the translation tables, kept as the benchmark reference
+def legacyRemoveSpecialCharFromString(str):
+    string = ''
+    for x in range(0, len(str)):
+        if str[x] in RefForbiddenChar.fsForbiddenChars:
+            string += '-'
+        else:
+            string += str[x]
+    return string
+
+
+def legacyRemoveSpecialCharFromArray(array):
+    output = []
+    for item in array:
+        string = ''
+        for x in range(0, len(item)):
+            if item[x] in RefForbiddenChar.forbiddenChars:
+                string += '-'
+            else:
+                string += item[x]
+        output.append(string)
+    return output
+
+
+# Build a sample of artists lists, as found in tracks tags
+def buildArtistsLists(count, seed):
+    random.seed(seed)
+    artistsLists = []
+    for i in range(count):
+        artists = random.sample(namesParts, random.randint(1, 4))
+        artistsLists.append(['{} {}'.format(name, random.randint(1, 99)) if random.random() < 0.3 else name for name in artists])
+    return artistsLists
+
+
+# Time a callable on the given number of runs, returns the best time in seconds
+def bestTime(function, runs):
+    return min(timeit.repeat(function, number=1, repeat=runs))
+
+
+# Benchmark entry point
+def main():
+    artistsLists = buildArtistsLists(20000, 42)
+    names = [name for artists in artistsLists for name in artists]
+    genres = list(RefGenre.genres)
+    countries = list(RefCountry.countryList)
+    probes = [random.choice(genres + countries + ['Unknown Genre', 'XXX']) for i in range(len(names))]
+    # Both implementations must agree before being compared
+    assert [legacyRemoveSpecialCharFromString(name) for name in names] == [removeSpecialCharFromString(name) for name in names]
+    assert [legacyRemoveSpecialCharFromArray(a) for a in artistsLists] == [removeSpecialCharFromArray(a) for a in artistsLists]
+    results = [
+        ('removeSpecialCharFromString',
+         lambda: [legacyRemoveSpecialCharFromString(name) for name in names],
+         lambda: [removeSpecialCharFromString(name) for name in names]),
+        ('removeSpecialCharFromArray',
+         lambda: [legacyRemoveSpecialCharFromArray(artists) for artists in artistsLists],
+         lambda: [removeSpecialCharFromArray(artists) for artists in artistsLists]),
+        ('genre/country lookup',
+         lambda: [probe in genres or probe in countries for probe in probes],
+         lambda: [probe in RefGenre.genres or probe in RefCountry.countryList for probe in probes])
+    ]
+    print('  Sanitizers and reference tables benchmark ({} names in {} artists lists)'.format(len(names), len(artistsLists)))
+    for name, legacy, current in results:
+        legacyTime = bestTime(legacy, 5)
+        currentTime = bestTime(current, 5)
+        print('> {:28s} : {:8.2f} ms -> {:8.2f} ms (x{:.1f})'.format(name, legacyTime * 1000, currentTime * 1000,
+                                                                       legacyTime / currentTime))
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,7 @@ class MetaAnalyzer:
                 dump['version'] = jsonText['version']
                 dump['elapsedSeconds'] = jsonText.get('elapsedSeconds', '-1') # Since this key wasn't here in first version of script
                 dump['folderInfo'] = jsonText['folderInfo']
+                dump['timings'] = jsonText.get('timings', None) # Only in scans made with --profile
                 jsonFile.close()
             self.dumps.append(dump)
 
@@ -57,3 +58,24 @@ class MetaAnalyzer:
         self.metaAnalysis['errorsDelta'] = last['errorsCount'] - first['errorsCount']
         self.metaAnalysis['possibleErrorsDelta'] = last['possibleErrors'] - first['possibleErrors']
         self.metaAnalysis['purityDelta'] = last['purity'] - first['purity']
+        # Scan phases variation, between the first and the last profiled dumps
+        self._buildTimingsData()
+
+
+    # Compare the time spent in each scan phase, for the phases measured in both the first and last profiled dumps
+    def _buildTimingsData(self):
+        self.metaAnalysis['timingsDelta'] = {}
+        profiledDumps = [dump for dump in self.dumps if dump['timings'] is not None]
+        if len(profiledDumps) < 2:
+            return
+        first = profiledDumps[0]['timings']
+        last = profiledDumps[len(profiledDumps) - 1]['timings']
+        self.metaAnalysis['timingsFrom'] = profiledDumps[0]['date']
+        self.metaAnalysis['timingsTo'] = profiledDumps[len(profiledDumps) - 1]['date']
+        for phase in last:
+            if phase in first:
+                self.metaAnalysis['timingsDelta'][phase] = {
+                    'secondsDelta': round(last[phase]['seconds'] - first[phase]['seconds'], 3),
+                    'callsDelta': last[phase]['calls'] - first[phase]['calls'],
+                    'bytesReadDelta': last[phase]['bytesRead'] - first[phase]['bytesRead']
+                }
@@ -1,13 +1,18 @@
 # Project imports
 from src.models.album import Album
-from src.models.track import Track
+from src.clean.trackCleaner import TrackCleaner
 
 
 class AlbumCleaner:
-    def __init__(self, files, preservedPath):
-        self.preservedPath = preservedPath
-        self.files = files
-        self.album = Album(files)
+    def __init__(self, folderListing, dryRun=False):
+        self.preservedPath = folderListing.preservedPath
+        self.files = folderListing.files
+        self.sizes = folderListing.sizes
+        self.mtimes = folderListing.mtimes
+        self.album = Album(self.files)
+        self.dryRun = dryRun
+        self.plannedChanges = []  # In dry run, the tags changes of the tracks to write, see TagPlanWriter
+        self.unchangedTracks = 0  # Tracks that were already cleaned, and were not written
         self._analyseAlbumInternals()
         self._analyseTracks()
 
@@ -37,11 +42,23 @@ class AlbumCleaner:
         for folder in pathList:  # Build the file path by concatenating folder in the file path
             audioTagPath += '{}/'.format(folder)
         audioTagPath += fileName  # Append the filename at the end of the newly created path
-        # Send the file path to the mutagen ID3 to get its tags and create the associated Track object
+        # Only the file tags are read, the file name is not parsed
         if fileName[-3:] == 'mp3' or fileName[-3:] == 'MP3':
-            track = Track('MP3', pathList, fileName, audioTagPath)
+            trackCleaner = TrackCleaner('MP3', audioTagPath)
         elif fileName[-4:] == 'flac' or fileName[-4:] == 'FLAC':
-            track = Track('FLAC', pathList, fileName, audioTagPath)
+            trackCleaner = TrackCleaner('FLAC', audioTagPath)
         else:
             return None
-        track.clearInternalTags(self.album)
+        if trackCleaner.clearTags(self.dryRun) is False:
+            self.unchangedTracks += 1
+        elif self.dryRun is True:
+            self.plannedChanges.append({'file': audioTagPath, 'format': trackCleaner.fileType, 'size': self.sizes[fileName],
+                                        'mtime': self.mtimes[fileName], **trackCleaner.tagsChanges})
+
+
+# Clean an album tags, used as the clean pool worker. Returns the album path and progress in the crawled library, its
+# track count, its unchanged tracks count and its planned changes in dry run
+def cleanAlbum(folderListing, dryRun=False):
+    albumCleaner = AlbumCleaner(folderListing, dryRun)
+    return folderListing.path, folderListing.progress, albumCleaner.album.totalTrack, albumCleaner.unchangedTracks, \
+           albumCleaner.plannedChanges
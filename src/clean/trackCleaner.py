@@ -0,0 +1,44 @@
+# Python imports
+from mutagen.id3 import ID3
+from mutagen.flac import FLAC
+# Project imports
+from src.utils.tagChanges import snapshotTags, tagsChanged, computeTagsChanges
+
+
+# The ID3 frames and Vorbis comments supported by the naming convention, cleared by the clean mode
+clearedFrames = ['TIT2', 'TPE1', 'TPE2', 'TALB', 'TDRC', 'TPUB', 'TCOP', 'TCOM', 'TOPE', 'TLAN', 'TRCK', 'TPOS', 'TBPM',
+                 'TCMP', 'TDOR']
+clearedComments = ['TITLE', 'DATE', 'ALBUM', 'ARTIST', 'ALBUMARTIST', 'PERFORMER', 'TRACKNUMBER', 'DISCNUMBER',
+                   'TRACKTOTAL', 'TOTALTRACK', 'TOTALTRACKS', 'DISCTOTAL', 'TOTALDISC', 'TOTALDISCS', 'COMPILATION',
+                   'RELEASEDATE']
+
+
+# TrackCleaner is the tag handle of the clean mode : unlike a Track, it only reads the file tags (no file name parsing
+# nor cover copy), and the file is only saved if clearing the convention tags changed them
+class TrackCleaner(object):
+    def __init__(self, fileType, audioTagPath):
+        self.fileType = fileType
+        self.audioTagPath = audioTagPath
+        self.audioTag = ID3(audioTagPath) if fileType == 'MP3' else FLAC(audioTagPath)
+        self.tagsChanges = None  # The tags a dry run would have written, see computeTagsChanges()
+
+
+    # Clear the convention tags (and the FLAC pictures), we could use audioTag.delete() but we just want to clear the tags
+    # supported by convention. Returns True if the file was (or, in dry run, would be) written
+    def clearTags(self, dryRun=False):
+        previousTags = snapshotTags(self.fileType, self.audioTag)
+        if self.fileType == 'MP3':
+            for frameId in clearedFrames:  # Empty text frames are not saved by mutagen, so they are removed
+                self.audioTag.delall(frameId)
+            self.audioTag.delall('APIC')  # Embedded covers, as the FLAC pictures
+        elif self.fileType == 'FLAC':
+            for key in clearedComments:
+                self.audioTag[key] = ''
+            self.audioTag.clear_pictures()
+        if tagsChanged(self.fileType, self.audioTag, previousTags) is False:
+            return False
+        if dryRun is True:
+            self.tagsChanges = computeTagsChanges(self.fileType, self.audioTag, previousTags, None)
+        else:
+            self.audioTag.save(self.audioTagPath)
+        return True
@@ -1,17 +1,31 @@
+# Python imports
+import io
+import mimetypes
+from PIL import Image
 # Project imports
 from src.models.album import Album
 from src.models.track import Track
 
 
+mimetypes.init()
+mode_to_bpp = {'1': 1, 'L': 8, 'P': 8, 'RGB': 24, 'RGBA': 32, 'CMYK': 32, 'YCbCr': 24, 'I': 32, 'F': 32}
+
+
 class AlbumFiller:
-    def __init__(self, files, preservedPath, verbose, logErrors):
-        self.preservedPath = preservedPath
-        self.files = files
-        self.album = Album(files)
+    def __init__(self, folderListing, verbose, logErrors, dryRun=False):
+        self.preservedPath = folderListing.preservedPath
+        self.files = folderListing.files
+        self.sizes = folderListing.sizes
+        self.mtimes = folderListing.mtimes
+        self.album = Album(self.files)
         self.verbose = verbose
         self.logErrors = logErrors
         self.hasErrors = False
+        self.unchangedTracks = 0  # Tracks that already held their filled tags, and were not written
+        self.dryRun = dryRun
+        self.plannedChanges = []  # In dry run, the tags changes of the tracks to write, see TagPlanWriter
         self._analyseAlbumInternals()
+        self._loadAlbumCover()
         self._analyseTracks()
 
 
@@ -60,6 +74,21 @@ class AlbumFiller:
                     self.album.year = 0
 
 
+    # Read the album cover file and probe its size and mode once, so all the album tracks embed the same picture data
+    def _loadAlbumCover(self):
+        if self.album.hasCover is False:
+            return
+        coverPath = ''
+        for folder in self.preservedPath:
+            coverPath += '{}/'.format(folder)
+        with open(coverPath + self.album.coverName, 'rb') as coverFile:
+            self.album.coverData = coverFile.read()
+        self.album.coverMime = mimetypes.guess_type(self.album.coverName)[0]
+        image = Image.open(io.BytesIO(self.album.coverData))  # Only the image header is decoded
+        self.album.coverWidth, self.album.coverHeight = image.size
+        self.album.coverDepth = mode_to_bpp[image.mode]
+
+
     # Analyse the album tracks
     def _analyseTracks(self):
         for fileName in self.files:
@@ -79,4 +108,17 @@ class AlbumFiller:
             track = Track('FLAC', pathList, fileName, audioTagPath)
         else:
             return None
-        track.setInternalTags(self.album)
+        if track.setInternalTags(self.album, self.dryRun) is False:
+            self.unchangedTracks += 1
+        elif self.dryRun is True:
+            self.plannedChanges.append({'file': audioTagPath, 'format': track.fileType, 'size': self.sizes[fileName],
+                                        'mtime': self.mtimes[fileName], **track.tagsChanges})
+
+
+# Fill an album tags, used as the fill pool worker. Returns the album path and progress in the crawled library, its track
+# count, whether its files are wrongly named, its unchanged tracks count and its planned changes in dry run, so the
+# album and its cover data are not sent back
+def fillAlbum(folderListing, verbose=False, logErrors=False, dryRun=False):
+    albumFiller = AlbumFiller(folderListing, verbose, logErrors, dryRun)
+    return folderListing.path, folderListing.progress, albumFiller.album.totalTrack, albumFiller.hasErrors, \
+           albumFiller.unchangedTracks, albumFiller.plannedChanges
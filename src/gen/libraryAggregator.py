@@ -0,0 +1,97 @@
+# Python imports
+import re
+# Project imports
+from src.utils.tools import removeSpecialCharFromString
+
+
+# LibraryAggregator indexes, in a single pass over the scanned albums, the albums each artist, genre and label appears
+# on. Artists and labels are indexed with their sanitized name, that is also the generated JSON file name. An artist
+# name holding forbidden char restarts its contributions at each occurrence, as the generated files always did
+class LibraryAggregator(object):
+    def __init__(self):
+        self.artists = {}  # { name: { 'albumArtist', 'artist', 'performer', 'producer', 'composer': [albums], 'realName' } }
+        self.genres = {}  # { genre: [albums] }
+        self.labels = {}  # { label: [albums] }
+        self._sanitizedNames = {}  # The same names are found on many tracks, they are only sanitized once
+        self._composers = {}  # Composer tag value : (name, sanitized name, sanitized real name or None)
+
+
+    # Index the album and its tracks contributors, genres and label. Dicts keep their keys in first appearance order
+    def addAlbum(self, albumTester):
+        album = albumTester.album
+        self._addArtist(album.albumArtist, 'albumArtist', album)
+        self._addToIndex(self.labels, self._sanitize(album.label), album)
+        for trackResult in albumTester.tracks:
+            for artist in trackResult.artists:
+                self._addArtist(artist, 'artist', album)
+            for performer in trackResult.performers:
+                self._addArtist(performer, 'performer', album)
+            for producer in trackResult.producers:
+                self._addArtist(producer, 'producer', album)
+            for composer in trackResult.composers:
+                name, sanitizedName, realName = self._parseComposer(composer)
+                contributions = self._addContribution(sanitizedName, 'composer', album, sanitizedName != name)
+                if realName is not None:
+                    contributions['realName'] = realName
+            for genre in trackResult.genres:
+                self._addToIndex(self.genres, genre, album)
+
+
+    # Add an artist contribution to an album, with the given role
+    def _addArtist(self, artist, role, album):
+        sanitizedName = self._sanitize(artist)
+        self._addContribution(sanitizedName, role, album, sanitizedName != artist)
+
+
+    # Returns the artist contributions, once the album is added to the given role. Previous contributions are
+    # dropped when restart is True
+    def _addContribution(self, name, role, album, restart):
+        contributions = self.artists.get(name)
+        if contributions is None or restart is True:
+            contributions = {
+                'albumArtist': [],
+                'artist': [],
+                'performer': [],
+                'producer': [],
+                'composer': []
+            }
+            self.artists[name] = contributions
+        albums = contributions[role]
+        if len(albums) == 0 or albums[-1] is not album:  # Albums are added track after track, only keep them once
+            albums.append(album)
+        return contributions
+
+
+    # Add an album to a genre or label index
+    @staticmethod
+    def _addToIndex(index, key, album):
+        albums = index.get(key)
+        if albums is None:
+            index[key] = [album]
+        elif albums[-1] is not album:
+            albums.append(album)
+
+
+    # Returns the name where filesystem forbidden char are replaced
+    def _sanitize(self, name):
+        sanitized = self._sanitizedNames.get(name)
+        if sanitized is None:
+            sanitized = removeSpecialCharFromString(name)
+            self._sanitizedNames[name] = sanitized
+        return sanitized
+
+
+    # Split a composer tag value, `Name (Real Name)`, into its name, sanitized name and sanitized real name. Real
+    # names made of several people (with a comma) are ignored
+    def _parseComposer(self, composer):
+        parsed = self._composers.get(composer)
+        if parsed is None:
+            realName = re.search(r'\((.*?)\)', composer)
+            if realName is not None and realName.group(1).find(',') == -1:
+                realName = self._sanitize(realName.group(1))
+            else:
+                realName = None
+            name = re.sub(r' \([^()]*\)', '', composer)
+            parsed = (name, self._sanitize(name), realName)
+            self._composers[composer] = parsed
+        return parsed
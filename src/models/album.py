@@ -14,3 +14,12 @@ class Album(object):
         self.lang = ''
         self.hasCover = False
         self.coverName = ''
+        # Album cover file, read and probed once when filling the album tracks
+        self.coverData = None
+        self.coverMime = None
+        self.coverWidth = 0
+        self.coverHeight = 0
+        self.coverDepth = 0
+        # Covers embedded in the album tracks, tested only once per distinct cover
+        self.covers = {}  # { cover hash: (width, height), or None if not probed }
+        self.coverDescriptions = {}  # { (coverDesc, albumArtist, year, albumTitle): matching folder name restrictions }
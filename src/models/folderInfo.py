@@ -1,11 +1,7 @@
-# Python imports
-import os
-
-
-# The target folder info class
+# The target folder info class, filled by the LibraryWalker with each crawled folder listing
 class FolderInfo(object):
     def __init__(self, folderPath):
-        self.folder = ''
+        self.folder = folderPath
         self.folderSize = 0
         self.filesCounter = 0
         self.foldersCounter = 0
@@ -21,41 +17,27 @@ class FolderInfo(object):
         self.pngPercentage = 0
         self.jpgCounter = 0
         self.jpgPercentage = 0
-        self._computeFolderInfo(folderPath)
 
 
-    # Reads the user given folder and store a few information about it
-    def _computeFolderInfo(self, folder):
-        self.folder = folder
-        rootPathLength = len(folder.split(os.sep))
-        # Counting file, folder etc, and computed folder info internals
-        for folder, dirnames, filenames in sorted(os.walk(folder)):
-            filenames = [f for f in filenames if not f[0] == '.']  # Ignore hidden files
-            dirnames[:] = [d for d in dirnames if not d[0] == '.']  # ignore hidden directories
-            self.filesCounter += len(filenames)  # Increment file counter
-            self.foldersCounter += len(dirnames)  # Increment folder counter
-            path = folder.split(os.sep)  # Split root into an array of folders
-            # Poping all path element that are not the root folder, the artist sub folder or the album sub sub folder
-            for x in range(rootPathLength - 1):
-                path.pop(0)
-            # Fill artists and albums counter
-            if len(path) == 1 and path[0] != '':
-                self.artistsCounter += 1
-            elif len(path) == 2:
-                self.albumsCounter += 1
-            # Analyse files in current folder
-            for f in filenames:
-                if f[-4:] == '.mp3' or f[-4:] == '.MP3':
-                    self.mp3Counter += 1
-                elif f[-5:] == '.flac' or f[-5:] == '.FLAC':
-                    self.flacCounter += 1
-                elif f[-4:] == '.jpg' or f[-4:] == '.JPG':
-                    self.jpgCounter += 1
-                elif f[-4:] == '.png' or f[-4:] == '.PNG':
-                    self.pngCounter += 1
-                filePath = os.path.join(folder, f)
-                self.folderSize += os.path.getsize(filePath)  # Increment folder size
-        # Compute totals
+    # Store a few information about a crawled folder (depth is 1 for artists folders and 2 for albums folders)
+    def addFolder(self, folderListing, depth, subFoldersCounter):
+        self.filesCounter += len(folderListing.files)  # Increment file counter
+        self.foldersCounter += subFoldersCounter  # Increment folder counter
+        # Fill artists and albums counter
+        if depth == 1:
+            self.artistsCounter += 1
+        elif depth == 2:
+            self.albumsCounter += 1
+        # Analyse files in current folder
+        self.mp3Counter += folderListing.mp3Counter
+        self.flacCounter += folderListing.flacCounter
+        self.jpgCounter += folderListing.jpgCounter
+        self.pngCounter += folderListing.pngCounter
+        self.folderSize += folderListing.size  # Increment folder size
+
+
+    # Compute totals and percentages, once all folders were added
+    def computeTotals(self):
         self.tracksCounter = self.flacCounter + self.mp3Counter
         self.coversCounter = self.jpgCounter + self.pngCounter
         # Compute files percentages
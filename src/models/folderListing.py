@@ -0,0 +1,35 @@
+# Python imports
+import os
+
+
+# The listing of a crawled folder : its files, their size and the audio/artwork counters (album folders are the ones at depth 2)
+class FolderListing(object):
+    def __init__(self, path, files, sizes, mtimes):
+        self.path = path
+        self.preservedPath = path.split(os.sep)  # Mutagen needs a preserved path when using ID3() or FLAC()
+        self.files = files
+        self.sizes = sizes  # { fileName: size in bytes }
+        self.mtimes = mtimes  # { fileName: modification time in nanoseconds }
+        self.size = 0
+        self.flacCounter = 0
+        self.mp3Counter = 0
+        self.pngCounter = 0
+        self.jpgCounter = 0
+        self.tracksCounter = 0
+        self.progress = 0  # Crawled percentage of the library when this folder was reached
+        self._computeCounters()
+
+
+    # Count files per extension and the folder size from the crawled listing
+    def _computeCounters(self):
+        for f in self.files:
+            if f[-4:] == '.mp3' or f[-4:] == '.MP3':
+                self.mp3Counter += 1
+            elif f[-5:] == '.flac' or f[-5:] == '.FLAC':
+                self.flacCounter += 1
+            elif f[-4:] == '.jpg' or f[-4:] == '.JPG':
+                self.jpgCounter += 1
+            elif f[-4:] == '.png' or f[-4:] == '.PNG':
+                self.pngCounter += 1
+            self.size += self.sizes[f]
+        self.tracksCounter = self.flacCounter + self.mp3Counter
@@ -1,20 +1,24 @@
 # Python imports
-import mimetypes
-import PIL
+import os
+import struct
 # Project imports
-from mutagen.id3 import ID3
-from mutagen.flac import FLAC, Picture
+from mutagen.id3 import ID3, Frames
+from mutagen.flac import FLAC, Picture, VCFLACDict
 from mutagen.id3._frames import TIT2, TDRC, TPE1, TPE2, TOPE, TRCK, TALB, TPUB, TCMP, TCOP, TLAN, TDOR, TCOM, TPOS, APIC
+from src.utils.tagChanges import snapshotTags, tagsChanged, computeTagsChanges
 
 
 # from utils.uiBuilder import printDetailledTrack # Uncomment for debug purpose only (printDetailledTrack() is very verbose)
-mimetypes.init()
-mode_to_bpp = {'1': 1, 'L': 8, 'P': 8, 'RGB': 24, 'RGBA': 32, 'CMYK': 32, 'YCbCr': 24, 'I': 32, 'F': 32}
+# In light mode, APIC frames are left unparsed by mutagen so their picture data is never copied
+lightFrames = {name: frame for name, frame in Frames.items() if name != 'APIC'}
+id3TextEncodings = ['latin-1', 'utf-16', 'utf-16-be', 'utf-8']
 
 
 # A Track container class with all useful attributes
 class Track(object):
-    def __init__(self, fileType, pathList, fileName, audioTagPath):
+    # In light mode, only the text tags and the cover metadata are read, the cover data is read with loadCover(). When
+    # readTags is False, the audio file is not opened and only the file and folder names are filled
+    def __init__(self, fileType, pathList, fileName, audioTagPath, lightMode=False, readTags=True):
         # ID3 tags
         self.title = ''
         self.artists = []
@@ -44,6 +48,10 @@ class Track(object):
         self.cover = {}
         self.coverType = ''
         self.coverDesc = ''
+        self.coverWidth = 0  # Declared in the FLAC picture block, not available for mp3 files
+        self.coverHeight = 0
+        self.coverLength = 0
+        self.coverOffset = -1  # Cover data position in a FLAC file loaded in light mode
         # Filesystem path and name as lists (separator is ` - `)
         self.pathList = pathList
         self.fileType = fileType
@@ -51,16 +59,108 @@ class Track(object):
         # %releaseArtists% - %year% - %albumTitle% - %discNumber%%trackNumber% - %artists% - %title%
         self.fileNameList = []
         self.folderNameList = []  # %year% - %albumTitle%
+        self.lightMode = lightMode
+        self.readTags = readTags
+        self.tagsChanges = None  # The tags a dry run would have written, see computeTagsChanges()
         # Self fill
-        if fileType == 'MP3':
-            self.audioTag = ID3(audioTagPath)
+        if readTags is False:
+            pass
+        elif fileType == 'MP3':
+            if lightMode is True:
+                self.audioTag = ID3(audioTagPath, known_frames=lightFrames)
+            if lightMode is False or self.audioTag.version < (2, 3, 0):  # ID3v2.2 frames have their own names
+                self.audioTag = ID3(audioTagPath)
+                self.lightMode = False
             self._fillFromMP3()
         elif fileType == 'FLAC':
-            self.audioTag = FLAC(audioTagPath)
+            if lightMode is True:
+                self._readFLACMetadataBlocks()
+            else:
+                self.audioTag = FLAC(audioTagPath)
             self._fillFromFLAC()
         self._computeInternals()
 
 
+    # Read the FLAC metadata blocks : the Vorbis comment is parsed, while only the first picture header is read
+    def _readFLACMetadataBlocks(self):
+        self.audioTag = None
+        with open(self.audioTagPath, 'rb') as audioFile:
+            header = audioFile.read(10)
+            if header[:3] == b'ID3':  # Skip a leading ID3v2 tag, its size is a syncsafe integer
+                size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+                audioFile.seek(10 + size)
+            else:
+                audioFile.seek(0)
+            if audioFile.read(4) != b'fLaC':  # Let mutagen raise its usual error on invalid files
+                self.audioTag = FLAC(self.audioTagPath)
+                self.lightMode = False
+                return
+            isLastBlock = False
+            while not isLastBlock:
+                blockHeader = audioFile.read(4)
+                if len(blockHeader) < 4:
+                    break
+                isLastBlock = (blockHeader[0] & 0x80) != 0
+                blockType = blockHeader[0] & 0x7F
+                blockLength = int.from_bytes(blockHeader[1:4], 'big')
+                blockStart = audioFile.tell()
+                if blockType == 4 and self.audioTag is None:  # VORBIS_COMMENT
+                    self.audioTag = VCFLACDict(audioFile.read(blockLength), framing=False)
+                elif blockType == 6 and self.coverOffset == -1:  # PICTURE
+                    self._readFLACPictureHeader(audioFile)
+                audioFile.seek(blockStart + blockLength)
+        if self.audioTag is None:
+            self.audioTag = VCFLACDict()
+
+
+    # Read a FLAC picture block up to its data, that is skipped but located for loadCover()
+    def _readFLACPictureHeader(self, audioFile):
+        audioFile.read(4)  # Picture type
+        mimeLength = struct.unpack('>I', audioFile.read(4))[0]
+        self.coverType = audioFile.read(mimeLength).decode('utf-8', 'replace')
+        descLength = struct.unpack('>I', audioFile.read(4))[0]
+        self.coverDesc = audioFile.read(descLength).decode('utf-8', 'replace')
+        self.coverWidth, self.coverHeight, depth, colors, self.coverLength = struct.unpack('>5I', audioFile.read(20))
+        self.coverOffset = audioFile.tell()
+
+
+    # Read a raw APIC frame header (encoding, mime and description), without decoding its picture data
+    def _readAPICHeader(self, rawFrame):
+        flags = struct.unpack('>H', rawFrame[8:10])[0]
+        if flags & 0xFF != 0:  # Compressed or unsynchronised frames are left to mutagen
+            mp3Cover = ID3(self.audioTagPath).getall('APIC')[0]
+            self.coverType = mp3Cover.mime
+            self.coverDesc = mp3Cover.desc
+            self.coverLength = len(mp3Cover.data)
+            return
+        frameData = memoryview(rawFrame)[10:]
+        encoding = frameData[0]
+        mimeEnd = rawFrame.index(b'\x00', 11) - 10
+        self.coverType = bytes(frameData[1:mimeEnd]).decode('latin-1')
+        descStart = mimeEnd + 2  # Skip the mime terminator and the picture type
+        if encoding == 1 or encoding == 2:  # UTF-16 descriptions end with two null bytes, on an even offset
+            descEnd = descStart
+            while descEnd < len(frameData) and bytes(frameData[descEnd:descEnd + 2]) != b'\x00\x00':
+                descEnd += 2
+            terminatorLength = 2
+        else:
+            descEnd = rawFrame.index(b'\x00', descStart + 10) - 10
+            terminatorLength = 1
+        self.coverDesc = bytes(frameData[descStart:descEnd]).decode(id3TextEncodings[encoding], 'replace')
+        self.coverLength = len(frameData) - descEnd - terminatorLength
+
+
+    # Return the embedded cover data, read from the file on demand when the track was loaded in light mode
+    def loadCover(self):
+        if self.lightMode is False or self.hasCover is False:
+            return self.cover
+        if self.fileType == 'FLAC':
+            with open(self.audioTagPath, 'rb') as audioFile:
+                audioFile.seek(self.coverOffset)
+                return audioFile.read(self.coverLength)
+        return ID3(self.audioTagPath).getall('APIC')[0].data
+
+
     # Read the mp3 track ID3 tags and extract all interresting values into a Track object
     def _fillFromMP3(self):
         if 'TIT2' in self.audioTag and self.audioTag['TIT2'].text[0] != '':
@@ -151,7 +251,8 @@ class Track(object):
         self._computeFolderNameList()
         self._computeFeaturing()
         self._computeRemixer()
-        self._containsCover()
+        if self.readTags is True:
+            self._containsCover()
 
 
     # Splits the filename into its components
@@ -200,6 +301,15 @@ class Track(object):
 
     # Test the cover existence in the file
     def _containsCover(self):
+        # In light mode, the cover metadata were read with the tags
+        if self.lightMode is True:
+            if self.fileType == 'MP3':
+                rawFrames = [frame for frame in self.audioTag.unknown_frames if frame[:4] == b'APIC']
+                if len(rawFrames) > 0:
+                    self._readAPICHeader(rawFrames[0])
+                self.audioTag.unknown_frames = []  # Release the raw picture data
+            self.hasCover = self.coverLength != 0
+            return
         # Extract image from file
         if self.fileType == 'MP3':
             if len(self.audioTag.getall('APIC')) > 0:
@@ -261,48 +371,10 @@ class Track(object):
         return True
 
 
-    # Clear all previously existing tags
-    def clearInternalTags(self, album):
-        # We could use audioTag.delete() but we just want to clear the tags supported by convention
-        if self.fileType == 'MP3':
-            self.audioTag.add(TIT2(text=''))
-            self.audioTag.add(TPE1(text=''))
-            self.audioTag.add(TPE2(text=''))
-            self.audioTag.add(TALB(text=''))
-            self.audioTag.add(TDRC(text=''))
-            self.audioTag.add(TPUB(text=''))
-            self.audioTag.add(TCOP(text=''))
-            self.audioTag.add(TCOM(text=''))
-            self.audioTag.add(TOPE(text=''))
-            self.audioTag.add(TLAN(text=''))
-            self.audioTag.add(TRCK(text=''))
-            self.audioTag.add(TPOS(text=''))
-            self.audioTag.add(TBPM(text=''))
-            self.audioTag.add(TCMP(text=''))
-            self.audioTag.add(TDOR(text=''))
-        elif self.fileType == 'FLAC':
-            self.audioTag['TITLE'] = ''
-            self.audioTag['DATE'] = ''
-            self.audioTag['ALBUM'] = ''
-            self.audioTag['ARTIST'] = ''
-            self.audioTag['ALBUMARTIST'] = ''
-            self.audioTag['PERFORMER'] = ''
-            self.audioTag['TRACKNUMBER'] = ''
-            self.audioTag['DISCNUMBER'] = ''
-            self.audioTag['TRACKTOTAL'] = ''
-            self.audioTag['TOTALTRACK'] = ''
-            self.audioTag['TOTALTRACKS'] = ''
-            self.audioTag['DISCTOTAL'] = ''
-            self.audioTag['TOTALDISC'] = ''
-            self.audioTag['TOTALDISCS'] = ''
-            self.audioTag['COMPILATION'] = ''
-            self.audioTag['RELEASEDATE'] = ''
-            self.audioTag.clear_pictures()
-        self.audioTag.save(self.audioTagPath)
-
-
-    # Compute all class internals that can not be extracted from ID3 tags
-    def setInternalTags(self, album):
+    # Compute all class internals that can not be extracted from ID3 tags. All the tags are set in memory, and the file is
+    # saved once, only if they differ from the file ones. Returns True if the file was (or, in dry run, would be) written
+    def setInternalTags(self, album, dryRun=False):
+        previousTags = snapshotTags(self.fileType, self.audioTag)
         # Compilation tag is '0' for regular release, '1' for various artist and '2' for mixes
         compilation = '0'
         default = '<fill me>'
@@ -401,8 +473,15 @@ class Track(object):
                 self.audioTag.add(TDOR(text=album.folderNameList[0]))
             else:
                 self.audioTag.add(TDOR(text='{}-01-01'.format(album.year)))
-        # Now save all the new tags into the audio file
-        self.audioTag.save(self.audioTagPath)
+        # Now save all the new tags into the audio file, unless it already holds them
+        if tagsChanged(self.fileType, self.audioTag, previousTags) is False:
+            return False
+        if dryRun is True:
+            coverPath = os.path.join(os.path.dirname(self.audioTagPath), album.coverName)
+            self.tagsChanges = computeTagsChanges(self.fileType, self.audioTag, previousTags, coverPath)
+        else:
+            self.audioTag.save(self.audioTagPath)
+        return True
 
 
     # Check if the tag is already filled before adding one
@@ -450,40 +529,29 @@ class Track(object):
         self.performers = outputList
 
 
-    # Append a cover to the track only if it is 1k by 1k and if there is not any cover
+    # Append a cover to the track only if it is 1k by 1k and if there is not any cover. The album cover file was read
+    # and probed once for all the album tracks, see AlbumFiller
     def _addCoverToFile(self, album):
-        # Build the file path by concatenating folder in the file path
-        path = ''
-        for folder in self.pathList:
-            path += '{}/'.format(folder)
-        path += album.coverName
+        if album.coverData is None:  # No cover file in the album folder
+            return
         if self.fileType == 'FLAC':
             if not self.hasCover or (
                     self.audioTag.pictures[0].height != 1000 and self.audioTag.pictures[0].width != 1000):
                 if self.hasCover:
                     self.audioTag.clear_pictures()
-                with open(path, 'rb') as img:
-                    data = img.read()
-                # Open physical image
-                im = PIL.Image.open(path)
-                width, height = im.size
                 # Create picture and set its internals
                 picture = Picture()
-                picture.data = data
+                picture.data = album.coverData
                 picture.type = 3 # COVER_FRONT
-                picture.desc = path.rsplit('/', 1)[-1] # Add picture name as a description
-                picture.mime = mimetypes.guess_type(path)[0]
-                picture.width = width
-                picture.height = height
-                picture.depth = mode_to_bpp[im.mode]
-                # Save into file's audio tag
+                picture.desc = album.coverName # Add picture name as a description
+                picture.mime = album.coverMime
+                picture.width = album.coverWidth
+                picture.height = album.coverHeight
+                picture.depth = album.coverDepth
+                # Added to the file audio tag, saved with the other filled tags
                 self.audioTag.add_picture(picture)
-                self.audioTag.save()
         else:
             # Remove any previous cover
             self.audioTag.delall('APIC')
-            # Read and save cover into file
-            imgData = open(path, 'rb').read()
-            mime = mimetypes.guess_type(path)[0]
-            self.audioTag.add(APIC(3,  mime, 3, album.coverName, imgData))
-            self.audioTag.save(v2_version=3)
+            # Add album cover, saved with the other filled tags
+            self.audioTag.add(APIC(3, album.coverMime, 3, album.coverName, album.coverData))
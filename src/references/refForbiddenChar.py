@@ -1,4 +1,4 @@
 class RefForbiddenChar(object):
     # The character that can't be in filenames
-    forbiddenChars = ['*', '/', '\\', ':', ';', '?', '<', '>', '\"', '|', '\'']
-    fsForbiddenChars = ['*', '/', '\\', ':', '?', '<', '>', '\"', '|', '\n', '\t']
+    forbiddenChars = frozenset(['*', '/', '\\', ':', ';', '?', '<', '>', '\"', '|', '\''])
+    fsForbiddenChars = frozenset(['*', '/', '\\', ':', '?', '<', '>', '\"', '|', '\n', '\t'])
@@ -0,0 +1,129 @@
+# Python imports
+import os
+import math
+import random
+# Project imports
+from src.scan.checkRegistry import checkRegistry, checkCategories, allChecks
+from src.utils.libraryWalker import LibraryWalker
+from src.utils.tools import computePurity
+
+
+# The normal distribution quantile of the 95 % confidence intervals
+confidenceQuantile = 1.96
+
+
+# AlbumSampler picks a stratified random subset of the library albums (--sample or --sample-albums), each stratum being
+# the albums of the artists starting with the same letter. Only the artists folders are listed to find the albums, and
+# only the sampled albums are read, so a sampled scan takes a time proportional to the sample. The sampled albums
+# results then give an estimation of the library purity, and of each errors category one, with a confidence interval
+class AlbumSampler(object):
+    def __init__(self, folder, percentage=None, albumsCount=None, seed=None, checks=allChecks):
+        self.folder = folder
+        self.checks = checks
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.strata = {}  # { letter: [album path] } for the whole library
+        self.sampledAlbums = {}  # { album path: letter } for the selected albums
+        self.results = {}  # { letter: [[tracks, errors, { category: errors }]] } for each tested album
+        self.totalAlbums = 0
+        self._listAlbums()
+        self._selectAlbums(percentage, albumsCount)
+
+
+    # Yield the sampled albums listings in the alphabetical order
+    def albums(self):
+        sampledPaths = sorted(self.sampledAlbums)
+        for index, albumPath in enumerate(sampledPaths):
+            folderListing, subFolders, subFoldersCounter = LibraryWalker.listFolder(albumPath)
+            if folderListing is None:
+                continue
+            folderListing.progress = index * 100 / len(sampledPaths)
+            yield folderListing
+
+
+    # Store a tested album errors, in its letter stratum and per category
+    def addAlbum(self, albumTester, tracksErrors):
+        categoriesErrors = {}
+        for error in albumTester.errors + [error for trackResult in albumTester.tracks for error in trackResult.errors]:
+            category = checkRegistry[error]['category']
+            categoriesErrors[category] = categoriesErrors.get(category, 0) + 1
+        letter = self.sampledAlbums[albumTester.folderListing.path]
+        self.results.setdefault(letter, []).append([albumTester.album.totalTrack, tracksErrors + albumTester.errorCounter,
+                                                    categoriesErrors])
+
+
+    # Returns the estimated library purity, and each selected category one, with the margin of their confidence interval
+    def estimate(self):
+        estimation = self._estimatePurity(lambda result: result[1], len(self.checks.errors))
+        estimation['categories'] = {}
+        for category in checkCategories:
+            checksCounter = len([error for error in self.checks.errors if checkRegistry[error]['category'] == category])
+            if checksCounter > 0:
+                estimation['categories'][category] = self._estimatePurity(lambda result: result[2].get(category, 0), checksCounter)
+        return estimation
+
+
+    # List the artists folders, then their albums folders, in the same order and with the same rules as the LibraryWalker
+    def _listAlbums(self):
+        artistsListing, artists, artistsCounter = LibraryWalker.listFolder(self.folder)
+        if artistsListing is None:
+            return
+        artists.sort(key=lambda name: name + os.sep)
+        for artist in artists:
+            artistPath = os.path.join(self.folder, artist)
+            albumsListing, albums, albumsCounter = LibraryWalker.listFolder(artistPath)
+            if albumsListing is None:
+                continue
+            stratum = self.strata.setdefault(artist[0].upper(), [])
+            for album in sorted(albums):
+                stratum.append(os.path.join(artistPath, album))
+        self.totalAlbums = sum(len(albums) for albums in self.strata.values())
+
+
+    # Select the sampled albums in each stratum, proportionally to its size. Each stratum has at least one sampled album
+    def _selectAlbums(self, percentage, albumsCount):
+        if percentage is None:
+            percentage = albumsCount * 100 / self.totalAlbums if self.totalAlbums > 0 else 0
+        sampler = random.Random(self.seed)
+        for letter in sorted(self.strata):
+            albums = self.strata[letter]
+            sampleSize = min(len(albums), max(1, round(len(albums) * percentage / 100)))
+            for albumPath in sampler.sample(albums, sampleSize):
+                self.sampledAlbums[albumPath] = letter
+
+
+    # Stratified ratio estimation of the purity, for the errors value of each album result. Each stratum is weighted by
+    # its albums count over its sampled albums count, and the variance is approximated by linearization. A stratum with
+    # a single sampled album takes the variance of the whole sample, and a fully sampled one has no variance (finite
+    # population correction)
+    def _estimatePurity(self, errorsValue, checksCounter):
+        estimatedTracks = 0
+        estimatedErrors = 0
+        for letter, results in self.results.items():
+            weight = len(self.strata[letter]) / len(results)
+            estimatedTracks += weight * sum(result[0] for result in results)
+            estimatedErrors += weight * sum(errorsValue(result) for result in results)
+        if estimatedTracks == 0:
+            return {'purity': None, 'margin': None}
+        ratio = estimatedErrors / estimatedTracks
+        residuals = {letter: [errorsValue(result) - ratio * result[0] for result in results] for letter, results in self.results.items()}
+        pooledVariance = self._computeVariance([residual for values in residuals.values() for residual in values])
+        variance = 0
+        for letter, values in residuals.items():
+            albumsCounter = len(self.strata[letter])
+            sampleSize = len(values)
+            residualsVariance = self._computeVariance(values) if sampleSize > 1 else pooledVariance
+            variance += albumsCounter ** 2 * (1 - sampleSize / albumsCounter) * residualsVariance / sampleSize
+        margin = confidenceQuantile * math.sqrt(variance) / estimatedTracks * 100 / checksCounter
+        return {
+            'purity': computePurity(estimatedErrors, estimatedTracks, checksCounter),
+            'margin': round(margin, 2)
+        }
+
+
+    # Returns the sample variance of the given values (0 with less than two values)
+    @staticmethod
+    def _computeVariance(values):
+        if len(values) < 2:
+            return 0
+        mean = sum(values) / len(values)
+        return sum((value - mean) ** 2 for value in values) / (len(values) - 1)
@@ -1,19 +1,21 @@
-# Python imports
-import os
-import fnmatch
 # Project imports
 from src.models.album import Album
 from src.models.track import Track
+from src.scan.checkRegistry import allChecks
+from src.scan.trackResult import TrackResult
 from src.scan.trackTester import TrackTester
 from src.utils.errorEnum import ErrorEnum
+from src.utils.profiler import profiler
 
 
-# AlbumTester aim to test all tracks in a folder and group all their errors
+# AlbumTester aim to test all tracks in a folder and group all their errors, for the given checks selection
 class AlbumTester:
-    def __init__(self, files, preservedPath):
-        self.preservedPath = preservedPath
-        self.files = files
-        self.album = Album(files)
+    def __init__(self, folderListing, checks=allChecks):
+        self.folderListing = folderListing
+        self.checks = checks
+        self.preservedPath = folderListing.preservedPath
+        self.files = folderListing.files
+        self.album = Album(self.files)
         self.tracks = []
         self.errors = []
         self.errorCounter = 0
@@ -22,7 +24,10 @@ class AlbumTester:
         self.missingTagsCounter = 0
         self.missorderedTag = []
         self.missorderedTagsCounter = 0
-        self._analyseAlbumInternals()
+        self.fromCache = False  # Set when restored from the scan cache
+        self.timings = None  # The album phases, with --profile
+        with profiler.phase('checks'):
+            self._analyseAlbumInternals()
         self._analyseTracks()
 
 
@@ -35,7 +40,7 @@ class AlbumTester:
             self.errorCounter += 1
             self.errors.append(ErrorEnum.EMPTY_ALBUM_FOLDER)
         # Check that album folder does contains files
-        if len(self.album.filesIterable) == 1 and len(fnmatch.filter(os.listdir('\\'.join(self.preservedPath)),'*.jpg')) == 1:
+        if len(self.album.filesIterable) == 1 and self.folderListing.jpgCounter == 1:
             self.errorCounter += 1
             self.errors.append(ErrorEnum.ALBUM_ONLY_HAS_COVER)
         # Filling internals
@@ -63,7 +68,7 @@ class AlbumTester:
                     self.errorCounter += 1
                     self.errors.append(ErrorEnum.FILES_ALBUM_YEAR_NOT_EQUAL)
                     self.album.year = -1
-        if len(fnmatch.filter(os.listdir('\\'.join(self.preservedPath)),'*.jpg')) != 1:
+        if self.folderListing.jpgCounter != 1:
             self.errorCounter += 1
             self.errors.append(ErrorEnum.COVER_NOT_UNIQUE)
 
@@ -71,7 +76,7 @@ class AlbumTester:
     # Analyse the album tracks (by creating a TrackTester for each)
     def _analyseTracks(self):
         for fileName in self.files:
-            trackTester = self._testFile(fileName, self.preservedPath, self.album)
+            trackTester = self._testFile(fileName, self.preservedPath, self.album, self.checks)
             if trackTester is not None:
                 if self.album.label == '':
                     self.album.label = trackTester.track.label
@@ -83,7 +88,9 @@ class AlbumTester:
                 self.album.compilation = trackTester.track.compilation
                 self.album.lang = trackTester.track.lang
                 self.album.genres = self.album.genres + list(set(trackTester.track.genres) - set(self.album.genres))
-                self.tracks.append(trackTester)
+                self.tracks.append(TrackResult(trackTester))  # The track tags and cover are released with the TrackTester
+                if trackTester.track.readTags is False:
+                    continue
                 y = str(trackTester.track.year)
                 y2 = str(trackTester.track.date)
                 if len(y) != 4:
@@ -98,19 +105,22 @@ class AlbumTester:
 
     @staticmethod
     # Manages the MP3/FLAC files to test in the pipeline
-    def _testFile(fileName, pathList, album):
+    def _testFile(fileName, pathList, album, checks):
         audioTagPath = ''
         for folder in pathList:  # Build the file path by concatenating folder in the file path
             audioTagPath += '{}/'.format(folder)
         audioTagPath += fileName  # Append the filename at the end of the newly created path
         # Send the file path to the mutagen ID3 to get its tags and create the associated Track object
         if fileName[-3:] == 'mp3' or fileName[-3:] == 'MP3':
-            track = Track('MP3', pathList, fileName, audioTagPath)
+            with profiler.phase('tags'):
+                track = Track('MP3', pathList, fileName, audioTagPath, lightMode=True, readTags=checks.readTags)
         elif fileName[-4:] == 'flac' or fileName[-4:] == 'FLAC':
-            track = Track('FLAC', pathList, fileName, audioTagPath)
+            with profiler.phase('tags'):
+                track = Track('FLAC', pathList, fileName, audioTagPath, lightMode=True, readTags=checks.readTags)
         else:
             return None
-        return TrackTester(track, album)
+        with profiler.phase('checks'):
+            return TrackTester(track, album, checks)
 
 
     # Compute error counter for the album
@@ -120,25 +130,50 @@ class AlbumTester:
             labelLockErrors = False
             languageLockErrors = False
             dateLockErrors = False
-            albumLabel = self.tracks[0].track.label
-            albumLanguage = self.tracks[0].track.lang
-            albumDate = self.tracks[0].track.date
-            for trackTester in self.tracks:
-                errorCounter += trackTester.errorCounter
+            albumLabel = self.tracks[0].label
+            albumLanguage = self.tracks[0].lang
+            albumDate = self.tracks[0].date
+            for trackResult in self.tracks:
+                errorCounter += trackResult.errorCounter
                 # ErrorCode 30 : Label tag is not consistent over album tracks
-                if trackTester.track.label != albumLabel and labelLockErrors is False:
+                if trackResult.label != albumLabel and labelLockErrors is False:
                     labelLockErrors = True
                     self.errorCounter += 1
                     self.errors.append(ErrorEnum.INCONSISTENT_LABELS)
                 # ErrorCode 31 : Language tag is not consistent over album tracks
-                if trackTester.track.lang != albumLanguage and languageLockErrors is False:
+                if trackResult.lang != albumLanguage and languageLockErrors is False:
                     languageLockErrors = True
                     self.errorCounter += 1
                     self.errors.append(ErrorEnum.INCONSISTENT_LANGUAGES)
                 # ErrorCode 38 : Release date is not consistent accross album
-                if trackTester.track.date != albumDate and dateLockErrors is False:
+                if trackResult.date != albumDate and dateLockErrors is False:
                     dateLockErrors = True
                     self.errorCounter += 1
                     self.errors.append(ErrorEnum.INCONSISTENT_RELEASE_DATE)
+            self._keepSelectedErrors()
             return errorCounter
+        self._keepSelectedErrors()
         return 0
+
+
+    # Remove the album errors that are not in the checks selection
+    def _keepSelectedErrors(self):
+        if self.checks.isPartial is True:
+            self.errors = [error for error in self.errors if error in self.checks.errors]
+            self.errorCounter = len(self.errors)
+
+
+# Pool worker : fully test an album. Its tracks are compact results, so it is cheap to send back. When profiling, the
+# album phases are sent back with it, the ones previously measured by the process being left aside meanwhile
+def testAlbum(folderListing, profile=False, checks=allChecks):
+    if profile is False:
+        albumTester = AlbumTester(folderListing, checks)
+        return albumTester, albumTester.tracksErrorCounter()
+    profiler.enabled = True
+    processPhases = profiler.pop()
+    albumTester = AlbumTester(folderListing, checks)
+    with profiler.phase('checks'):
+        tracksErrors = albumTester.tracksErrorCounter()
+    albumTester.timings = profiler.pop()
+    profiler.phases = processPhases
+    return albumTester, tracksErrors
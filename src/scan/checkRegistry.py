@@ -0,0 +1,139 @@
+# Project imports
+from src.utils.errorEnum import ErrorEnum
+
+
+# Inputs a check is made on, from the cheapest to the most expensive to load
+FILENAME_INPUT = 'filename'  # The album folder listing, audio files are not opened
+TAGS_INPUT = 'tags'  # The audio file tags, including the cover type and description
+COVER_INPUT = 'cover'  # The embedded cover data, read from the file and decoded
+inputsOrder = [FILENAME_INPUT, TAGS_INPUT, COVER_INPUT]
+
+
+# The TrackTester tests, each one raising one or several errors. The album errors are raised by the AlbumTester while
+# computing the album metrics, and the inconsistent filename error prevents any track test, so they have no test here
+FILESYSTEM_NAMING_TEST = '_testFileSystemNaming'
+FILESYSTEM_NAMING_AGAINST_TAGS_TEST = '_testFileSystemNamingAgainstTags'
+MISSING_TAGS_TEST = '_testForMissingTags'
+PERFORMER_COMPOSITION_TEST = '_testPerformerComposition'
+MISSORDERED_TAGS_TEST = '_testMissorderedTags'
+COVER_SIZE_TEST = '_testCoverSize'
+COVER_METADATA_TEST = '_testCoverMetadata'
+FIELDS_VALIDITY_TEST = '_testFieldsValidity'
+LANGUAGE_TAG_TEST = '_testLanguageTag'
+GENRE_COMPOSITION_TEST = '_testGenreComposition'
+TAGS_UNICITY_TEST = '_testTagsUnicity'
+RELEASE_YEAR_TEST = '_testReleaseYear'
+ALBUM_VALUES_COHERENCE_TEST = '_testAlbumValuesCoherence'
+# The order the tests are run in, that is the order of the errors in the reports
+testsOrder = [FILESYSTEM_NAMING_TEST, FILESYSTEM_NAMING_AGAINST_TAGS_TEST, MISSING_TAGS_TEST, PERFORMER_COMPOSITION_TEST,
+              MISSORDERED_TAGS_TEST, COVER_SIZE_TEST, COVER_METADATA_TEST, FIELDS_VALIDITY_TEST, LANGUAGE_TAG_TEST,
+              GENRE_COMPOSITION_TEST, TAGS_UNICITY_TEST, RELEASE_YEAR_TEST, ALBUM_VALUES_COHERENCE_TEST]
+
+
+# The errors categories, as detailed in the wiki
+checkCategories = {
+    1: 'Filesystem naming inconsistencies',
+    2: 'Filesystem naming vs ID3 tags inconsistencies',
+    3: 'ID3 tags inconsistencies',
+    4: 'Track tags coherence with album metrics',
+    5: 'Miscellaneous errors'
+}
+
+
+# Each ErrorEnum check, with the input it needs, the TrackTester tests raising it, its relative cost once this input is loaded (1 being a string
+# comparison, while collation and image decoding are the most expensive ones) and its category
+checkRegistry = {
+    # Category 1 : Filesystem naming inconsistencies
+    ErrorEnum.FILENAME_RELEASE_ARTIST_VS_ARTIST_FOLDER_NAME: {'input': FILENAME_INPUT, 'tests': (FILESYSTEM_NAMING_TEST,), 'cost': 1, 'category': 1},
+    ErrorEnum.FILENAME_YEAR_VS_ALBUM_FOLDER_NAME_YEAR: {'input': FILENAME_INPUT, 'tests': (FILESYSTEM_NAMING_TEST,), 'cost': 1, 'category': 1},
+    ErrorEnum.FILENAME_ALBUM_VS_ALBUM_FOLDER_NAME: {'input': FILENAME_INPUT, 'tests': (FILESYSTEM_NAMING_TEST,), 'cost': 1, 'category': 1},
+    ErrorEnum.FILES_ALBUM_YEAR_NOT_EQUAL: {'input': FILENAME_INPUT, 'tests': (), 'cost': 1, 'category': 1},
+    ErrorEnum.INCONSISTENT_FILENAME: {'input': FILENAME_INPUT, 'tests': (), 'cost': 1, 'category': 1},
+    # Category 2 : Filesystem naming vs ID3 tags inconsistencies
+    ErrorEnum.FILENAME_YEAR_VS_YEAR_TAG: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 1, 'category': 2},
+    ErrorEnum.FOLDER_NAME_YEAR_VS_YEAR_TAG: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 1, 'category': 2},
+    ErrorEnum.FILENAME_ALBUM_VS_ALBUM_TAG: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 1, 'category': 2},
+    ErrorEnum.FOLDER_NAME_ALBUM_VS_ALBUM_TAG: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 1, 'category': 2},
+    ErrorEnum.FILENAME_DISC_TRACK_NO_VS_DISC_TRACK_NO_TAG: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 1, 'category': 2},
+    ErrorEnum.FILENAME_ARTIST_VS_ARTIST_TAG: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 2, 'category': 2},
+    ErrorEnum.FILENAME_ARTIST_VS_REMIX_ARTIST: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 2, 'category': 2},
+    ErrorEnum.FILENAME_TITLE_VS_TITLE_TAG: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 1, 'category': 2},
+    ErrorEnum.FOLDER_NAME_RELEASE_ARTISTS_VS_ALBUM_ARTIST_TAG: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 1, 'category': 2},
+    ErrorEnum.FOLDER_NAME_DATE_VS_RELEASE_DATE_TAG: {'input': TAGS_INPUT, 'tests': (FILESYSTEM_NAMING_AGAINST_TAGS_TEST,), 'cost': 1, 'category': 2},
+    # Category 3 : ID3 tags inconsistencies
+    ErrorEnum.MISSING_TAGS: {'input': TAGS_INPUT, 'tests': (MISSING_TAGS_TEST, FIELDS_VALIDITY_TEST), 'cost': 2, 'category': 3},
+    ErrorEnum.INCONSISTENT_PERFORMER: {'input': TAGS_INPUT, 'tests': (PERFORMER_COMPOSITION_TEST,), 'cost': 5, 'category': 3},
+    ErrorEnum.MISS_ORDERED_TAGS: {'input': TAGS_INPUT, 'tests': (MISSORDERED_TAGS_TEST,), 'cost': 5, 'category': 3},
+    ErrorEnum.INVALID_COVER: {'input': COVER_INPUT, 'tests': (COVER_SIZE_TEST,), 'cost': 10, 'category': 3},
+    ErrorEnum.MISSING_COVER: {'input': TAGS_INPUT, 'tests': (COVER_METADATA_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.NOT_OPTIMAL_COVER: {'input': TAGS_INPUT, 'tests': (COVER_METADATA_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.FLOATING_BPM: {'input': TAGS_INPUT, 'tests': (), 'cost': 1, 'category': 3},
+    ErrorEnum.UNLOGIC_YEAR: {'input': TAGS_INPUT, 'tests': (FIELDS_VALIDITY_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.INVALID_LANG: {'input': TAGS_INPUT, 'tests': (LANGUAGE_TAG_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.NONEXISTENT_LANG: {'input': TAGS_INPUT, 'tests': (LANGUAGE_TAG_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.INCONSISTENT_GENRE: {'input': TAGS_INPUT, 'tests': (GENRE_COMPOSITION_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.UNEXISTING_GENRE: {'input': TAGS_INPUT, 'tests': (GENRE_COMPOSITION_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.INVALID_COMPILATION: {'input': TAGS_INPUT, 'tests': (FIELDS_VALIDITY_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.TAG_NOT_UNIQUE: {'input': TAGS_INPUT, 'tests': (TAGS_UNICITY_TEST,), 'cost': 2, 'category': 3},
+    ErrorEnum.YEAR_VS_RELEASE_YEAR: {'input': TAGS_INPUT, 'tests': (RELEASE_YEAR_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.NO_COVER_DESCRIPTION: {'input': TAGS_INPUT, 'tests': (COVER_METADATA_TEST,), 'cost': 1, 'category': 3},
+    ErrorEnum.COVER_DESCRIPTION_NOT_MATCHING: {'input': TAGS_INPUT, 'tests': (COVER_METADATA_TEST,), 'cost': 2, 'category': 3},
+    ErrorEnum.WRONG_DATE_FORMAT: {'input': TAGS_INPUT, 'tests': (FIELDS_VALIDITY_TEST,), 'cost': 1, 'category': 3},
+    # Category 4 : Track tags coherence with album metrics
+    ErrorEnum.ALBUM_TOTAL_TRACK_VS_TRACK_TOTAL_TRACK: {'input': TAGS_INPUT, 'tests': (ALBUM_VALUES_COHERENCE_TEST,), 'cost': 1, 'category': 4},
+    ErrorEnum.ALBUM_DISC_TRACK_VS_TRACK_DISC_TRACK: {'input': TAGS_INPUT, 'tests': (ALBUM_VALUES_COHERENCE_TEST,), 'cost': 1, 'category': 4},
+    ErrorEnum.ALBUM_YEAR_VS_TRACK_YEAR: {'input': TAGS_INPUT, 'tests': (ALBUM_VALUES_COHERENCE_TEST,), 'cost': 1, 'category': 4},
+    ErrorEnum.INCONSISTENT_LABELS: {'input': TAGS_INPUT, 'tests': (), 'cost': 1, 'category': 4},
+    ErrorEnum.INCONSISTENT_LANGUAGES: {'input': TAGS_INPUT, 'tests': (), 'cost': 1, 'category': 4},
+    ErrorEnum.COVER_NOT_UNIQUE: {'input': FILENAME_INPUT, 'tests': (), 'cost': 1, 'category': 4},
+    ErrorEnum.INCONSISTENT_RELEASE_DATE: {'input': TAGS_INPUT, 'tests': (), 'cost': 1, 'category': 4},
+    # Category 5 : Miscellaneous errors
+    ErrorEnum.EMPTY_ALBUM_FOLDER: {'input': FILENAME_INPUT, 'tests': (), 'cost': 1, 'category': 5},
+    ErrorEnum.ALBUM_ONLY_HAS_COVER: {'input': FILENAME_INPUT, 'tests': (), 'cost': 1, 'category': 5}
+}
+
+
+# CheckSelection holds the checks to run (--only and --skip error codes), the inputs they need to be loaded and the track
+# tests raising them, all taken from the registry
+class CheckSelection(object):
+    def __init__(self, only=None, skip=None):
+        errorsByCode = {error.value['errorCode']: error for error in ErrorEnum}
+        self.invalidCodes = sorted(code for code in (only or []) + (skip or []) if code not in errorsByCode)
+        selectedCodes = set(errorsByCode.keys()) if only is None else set(only)
+        selectedCodes -= set(skip or [])
+        self.errors = frozenset(errorsByCode[code] for code in selectedCodes if code in errorsByCode)
+        self.isPartial = len(self.errors) != len(ErrorEnum)
+        self.inputs = set(checkRegistry[error]['input'] for error in self.errors)
+        self.readTags = TAGS_INPUT in self.inputs or COVER_INPUT in self.inputs
+        self.readCover = COVER_INPUT in self.inputs
+        selectedTests = set(test for error in self.errors for test in checkRegistry[error]['tests'])
+        self.tests = [test for test in testsOrder if test in selectedTests]
+
+
+    # Returns the sorted error codes of the selected checks, to identify the selection
+    def codes(self):
+        return sorted(error.value['errorCode'] for error in self.errors)
+
+
+    # Returns the most expensive input to load for the selected checks
+    def heaviestInput(self):
+        return max(self.inputs, key=inputsOrder.index) if len(self.inputs) > 0 else FILENAME_INPUT
+
+
+    # Returns the selected checks cost, as a percentage of the cost of all checks
+    def relativeCost(self):
+        totalCost = sum(check['cost'] for check in checkRegistry.values())
+        return round(sum(checkRegistry[error]['cost'] for error in self.errors) * 100 / totalCost, 2)
+
+
+# Parse a comma separated error codes list from the command line (argparse type, invalid integers raise a ValueError)
+def parseErrorCodes(string):
+    codes = []
+    for code in string.split(','):
+        if code.strip() != '':
+            codes.append(int(code))
+    return codes
+
+
+# The selection of all checks, used when none is given
+allChecks = CheckSelection()
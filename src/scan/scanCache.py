@@ -0,0 +1,155 @@
+# Python imports
+import os
+import json
+import hashlib
+import time
+import sqlite3
+# Project imports
+from src.models.album import Album
+from src.scan.albumTester import AlbumTester
+from src.scan.checkRegistry import allChecks
+from src.scan.trackResult import TrackResult
+from src.utils.errorEnum import ErrorEnum
+from src.utils.profiler import profiler
+from src.utils.tools import createDirectory, computeSourcesHash
+# Globals
+cacheFormat = 2  # To increment when the stored results layout changes
+errorsByCode = {error.value['errorCode']: error for error in ErrorEnum}
+# The sources the checks results depend on (relative to the src folder), any change in them invalidates the cache
+rulesSources = ['scan', 'models', 'references', 'utils/errorEnum.py', 'utils/tools.py', 'utils/collation.py']
+
+
+# ScanCache stores on disk the AlbumTester and TrackResult records of each scanned album. An album is only reused if
+# its files (name, size and modification time), the script and rules version and the checks selection are the same
+# than when it was tested. Results are committed every few seconds, so an interrupted scan keeps the albums it tested
+class ScanCache(object):
+    def __init__(self, path, scriptVersion, checks=allChecks, commitInterval=2):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.commitInterval = commitInterval
+        self._lastCommit = time.time()
+        # Adding, removing or renumbering a tested error invalidates the whole cache, as well as a new script version or
+        # any change in the checks sources
+        rules = json.dumps(sorted(errorsByCode.keys())) + computeSourcesHash(rulesSources)
+        if checks.isPartial is True:  # Results of a partial selection are never reused for another selection
+            rules += json.dumps(checks.codes())
+        self.version = '{}-{}-{}'.format(scriptVersion, cacheFormat, hashlib.sha1(rules.encode('utf-8')).hexdigest()[:8])
+        if os.path.dirname(path) != '':
+            createDirectory(os.path.dirname(path))
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS albums (path TEXT PRIMARY KEY, signature TEXT, '
+                                'tracks INTEGER, results TEXT)')
+
+
+    # Return the cached (albumTester, tracksErrors) for this album folder listing, or None if it changed since
+    def get(self, folderListing):
+        with profiler.phase('cache'):
+            return self._get(folderListing)
+
+
+    # Save the results of a freshly tested album
+    def put(self, albumTester, tracksErrors):
+        with profiler.phase('cache'):
+            self._put(albumTester, tracksErrors)
+
+
+    # Lookup the album results, and check that the album files are the same
+    def _get(self, folderListing):
+        row = self.connection.execute('SELECT signature, results FROM albums WHERE path = ?',
+                                      (os.path.abspath(folderListing.path),)).fetchone()
+        if row is None or row[0] != self._computeSignature(folderListing):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return loadAlbumResults(folderListing, json.loads(row[1]))
+
+
+    # Store the album results, replacing the previous ones
+    def _put(self, albumTester, tracksErrors):
+        folderListing = albumTester.folderListing
+        self.connection.execute('INSERT OR REPLACE INTO albums VALUES (?, ?, ?, ?)',
+                                (os.path.abspath(folderListing.path), self._computeSignature(folderListing),
+                                 albumTester.album.totalTrack, json.dumps(dumpAlbumResults(albumTester, tracksErrors))))
+        if time.time() - self._lastCommit >= self.commitInterval:
+            self.connection.commit()
+            self._lastCommit = time.time()
+
+
+    # Sum the tracks of the cached albums in folder, to estimate the scan length before crawling the library
+    def estimateTracks(self, folder):
+        row = self.connection.execute('SELECT SUM(tracks) FROM albums WHERE path >= ? AND path < ?',
+                                      self._pathRange(folder)).fetchone()
+        return row[0] or 0
+
+
+    # Remove all cached albums in folder, return the number of removed albums
+    def clear(self, folder):
+        cursor = self.connection.execute('DELETE FROM albums WHERE path >= ? AND path < ?', self._pathRange(folder))
+        self.connection.commit()
+        return cursor.rowcount
+
+
+    # Commit pending results and release the database
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+    # The album signature depends on each file name, size and modification time, and on the cache version
+    def _computeSignature(self, folderListing):
+        files = [[fileName, folderListing.sizes[fileName], folderListing.mtimes[fileName]] for fileName in folderListing.files]
+        return hashlib.sha1(json.dumps([self.version, files]).encode('utf-8')).hexdigest()
+
+
+    # Absolute path bounds of all the albums stored under folder
+    @staticmethod
+    def _pathRange(folder):
+        prefix = os.path.join(os.path.abspath(folder), '')
+        return prefix, prefix + '\uffff'
+
+
+# Serialize the album and its tracks results (for the scan cache and the run journal), errors are stored with their
+# error code
+def dumpAlbumResults(albumTester, tracksErrors):
+    tracks = []
+    for trackResult in albumTester.tracks:
+        track = {name: getattr(trackResult, name) for name in TrackResult.__slots__}
+        track['errors'] = [error.value['errorCode'] for error in trackResult.errors]
+        tracks.append(track)
+    album = {key: value for key, value in vars(albumTester.album).items() if key not in ('filesIterable', 'coverDescriptions')}
+    return {
+        'album': album,
+        'tracks': tracks,
+        'tracksErrors': tracksErrors,
+        'errors': [error.value['errorCode'] for error in albumTester.errors],
+        'errorCounter': albumTester.errorCounter
+    }
+
+
+# Rebuild the AlbumTester and its TrackResults from their serialized results, without reading any audio file
+def loadAlbumResults(folderListing, results):
+    album = Album(folderListing.files)
+    album.__dict__.update(results['album'])
+    albumTester = AlbumTester.__new__(AlbumTester)
+    albumTester.folderListing = folderListing
+    albumTester.preservedPath = folderListing.preservedPath
+    albumTester.files = folderListing.files
+    albumTester.album = album
+    albumTester.tracks = []
+    albumTester.errors = [errorsByCode[code] for code in results['errors']]
+    albumTester.errorCounter = results['errorCounter']
+    albumTester.trackErrors = []
+    albumTester.missingTags = []
+    albumTester.missingTagsCounter = 0
+    albumTester.missorderedTag = []
+    albumTester.missorderedTagsCounter = 0
+    albumTester.fromCache = True
+    albumTester.timings = None
+    for track in results['tracks']:
+        trackResult = TrackResult.__new__(TrackResult)
+        for name in TrackResult.__slots__:
+            setattr(trackResult, name, track[name])
+        trackResult.errors = [errorsByCode[code] for code in track['errors']]
+        albumTester.tracks.append(trackResult)
+    return albumTester, results['tracksErrors']
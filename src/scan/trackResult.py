@@ -0,0 +1,33 @@
+# Python imports
+import sys
+
+
+# Tags kept from the Track, with the same name, for the reports (verbose report, JSON dump and JSON generation)
+trackResultTags = ('fileName', 'fileNameList', 'pathList', 'folderNameList', 'title', 'artists', 'albumTitle',
+                   'albumArtist', 'year', 'date', 'performers', 'composedPerformer', 'composers', 'genres', 'producers',
+                   'label', 'trackNumber', 'totalTrack', 'discNumber', 'totalDisc', 'bpm', 'lang', 'compilation',
+                   'remix', 'coverType', 'coverDesc')
+
+
+# TrackResult is the compact outcome of a TrackTester : the tags needed by the reports and the track errors. The Track,
+# its mutagen tags and its cover are not referenced anymore once the result is built, so they are released right away
+class TrackResult(object):
+    __slots__ = trackResultTags + ('errors', 'errorCounter', 'missingTags', 'missorderedTag')
+
+    def __init__(self, trackTester):
+        track = trackTester.track
+        for tag in trackResultTags:
+            setattr(self, tag, _internValue(getattr(track, tag)))
+        self.errors = trackTester.errors  # ErrorEnum members, shared by all results
+        self.errorCounter = trackTester.errorCounter
+        self.missingTags = trackTester.missingTags
+        self.missorderedTag = trackTester.missorderedTag
+
+
+# Artists, album, year or genre values are repeated over many tracks, so only one copy of each string is kept
+def _internValue(value):
+    if type(value) is str:
+        return sys.intern(value)
+    if type(value) is list:
+        return [sys.intern(item) if type(item) is str else item for item in value]
+    return value
@@ -1,6 +1,5 @@
 # Python imports
-import os
-import icu
+import hashlib
 import datetime
 # References imports
 from src.references.refCountry import RefCountry
@@ -8,16 +7,21 @@ from src.references.refForbiddenChar import RefForbiddenChar
 from src.references.refGenre import RefGenre
 # Enum imports
 from src.utils.errorEnum import ErrorEnum
+# Scan imports
+from src.scan.checkRegistry import allChecks
 # Utils imports
-from src.utils.tools import prefixDot, prefixThreeDots, suffixDot, suffixThreeDots, removeSpecialCharFromArray, validateDateFormat
-from PIL import Image
+from src.utils.collation import sortStrings
+from src.utils.profiler import profiler
+from src.utils.tools import prefixDot, prefixThreeDots, suffixDot, suffixThreeDots, removeSpecialCharFromArray, validateDateFormat, probeImageSize
 
 
-# TrackTester aim to test a track and group all its errors
+# TrackTester aim to test a track and group all its errors. Only the tests of the given selection checks are run, as
+# listed in the check registry
 class TrackTester:
-    def __init__(self, track, album):
+    def __init__(self, track, album, checks=allChecks):
         self.track = track
         self.album = album
+        self.checks = checks
         self.errors = []
         self.errorCounter = 0
         self.missingTags = []
@@ -25,6 +29,10 @@ class TrackTester:
         self.missorderedTag = []
         self.missorderedTagsCounter = 0
         self._testTrackObject()
+        # Some checks raise several errors, only the selected ones are kept
+        if self.checks.isPartial is True:
+            self.errors = [error for error in self.errors if error in self.checks.errors]
+            self.errorCounter = len(self.errors)
 
 
     # Tests a Track object to check if it is matching the naming convention
@@ -39,14 +47,9 @@ class TrackTester:
             self.errorCounter += 1
             self.errors.append(ErrorEnum.INCONSISTENT_FILENAME)
             return
-        # Category 1 : Filesystem naming inconsistencies
-        self._testFileSystemNaming()
-        # Category 2 : Filesystem naming vs ID3 tags inconsistencies
-        self._testFileSystemNamingAgainstTags()
-        # Category 3 : ID3 tags inconsistencies
-        self._testTagsInconsistencies()
-        # Category 4 : Track tags coherence with album metrics
-        self._testAlbumValuesCoherence()
+        # The track tags and cover are only read when a selected check needs them, so are the tests using them
+        for test in self.checks.tests:
+            getattr(self, test)()
 
 
     # Testing Category 1 : Filesystem naming inconsistencies (see ErrorEnum.py)
@@ -92,39 +95,6 @@ class TrackTester:
                                     self.track.date)
 
 
-    # Testing Category 3 : ID3 tags inconsistencies
-    def _testTagsInconsistencies(self):
-        # ErrorCode 11 : Some tag requested by the naming convention aren't filled in track
-        self._testForMissingTags()
-        # ErrorCode 12 : Performer does not contains both the artist and the featuring artist
-        self._testPerformerComposition()
-        # ErrorCode 13 : Performer does not contains both the artist and the featuring artist
-        self._testMissorderedTags()
-        # ErrorCode 19 : Cover is not a 1000x1000 jpg image
-        # ErrorCode 20 : Track has no cover
-        # ErrorCode 22 : Cover format is not optimized (not jpg)
-        self._testCoverValidity()
-        # ErrorCode 23 : BPM is not an integer
-        # ErrorCode 24 : Release year is not realistic (< 1900 or > today)
-        # ErrorCode 29 : Invalid compilation tag
-        self._testFieldsValidity()
-        # ErrorCode 25 : Invalid country value. Use NATO country notation with 3 capital letters
-        # ErrorCode 26 : Unexisting country trigram. Check existing NATO values
-        self._testLanguageTag()
-        # ErrorCode 27 : Unconsistent genre tag
-        # ErrorCode 28 : Genre missing from convention list
-        self._testGenreComposition()
-        # ErrorCode 32 : A tag in file doesn't have a unique field
-        if not self.track.testTagsUnicity():
-            self.errorCounter += 1
-            self.errors.append(ErrorEnum.TAG_NOT_UNIQUE)
-        # ErrorCode 33 : The year tag doesn't match the year in released date tag
-        if self.track.date != '':
-            if self.track.year != self.track.date[0:4]:
-                self.errorCounter += 1
-                self.errors.append(ErrorEnum.YEAR_VS_RELEASE_YEAR)
-
-
     # Testing Category 4 : Track tags coherence with album metrics
     def _testAlbumValuesCoherence(self):
         # ErrorCode 14 : Computed album total track is not equal to the track total track tag
@@ -219,13 +189,11 @@ class TrackTester:
 
     # Test if the performer field is accurate regarding the track title (via composedPerformer)
     def _testPerformerComposition(self):
-        # For accented char sorting
-        collator = icu.Collator.createInstance(icu.Locale('fr_FR.UTF-8'))
         # If track has featured artists, we append them to the performer tmp string
         # Sorted comparison to only test value equality. The artists alphabetic order is tested elsewhere
         if len(self.track.performers) != len(self.track.composedPerformer) or \
-            sorted(removeSpecialCharFromArray(self.track.performers), key=collator.getSortKey) != \
-            sorted(removeSpecialCharFromArray(self.track.composedPerformer), key=collator.getSortKey):
+            sortStrings(removeSpecialCharFromArray(self.track.performers)) != \
+            sortStrings(removeSpecialCharFromArray(self.track.composedPerformer)):
             self.errorCounter += 1
             self.errors.append(ErrorEnum.INCONSISTENT_PERFORMER)
 
@@ -243,27 +211,26 @@ class TrackTester:
 
     # Test ID3 tags order (names must be alphabetically sorted, while considering accent properly)
     def _testMissorderedTags(self):
-        # For accented char sorting
-        collator = icu.Collator.createInstance(icu.Locale('fr_FR.UTF-8'))
-        if sorted(removeSpecialCharFromArray(self.track.artists),
-                  key=collator.getSortKey) != removeSpecialCharFromArray(self.track.artists):
+        # Each list is sanitized once, then compared to its sorted copy (accented char are properly considered)
+        artists = removeSpecialCharFromArray(self.track.artists)
+        sortedArtists = sortStrings(artists)
+        if sortedArtists != artists:
             self.missorderedTag.append('Artists')
             self.missorderedTagsCounter += 1
         if self.track.remix == '':
-            if sorted(removeSpecialCharFromArray(self.track.artists),
-                      key=collator.getSortKey) != removeSpecialCharFromArray(self.track.fileNameList[4].split(', ')):
+            if sortedArtists != removeSpecialCharFromArray(self.track.fileNameList[4].split(', ')):
                 self.missorderedTag.append('Artists')
                 self.missorderedTagsCounter += 1
-        if sorted(removeSpecialCharFromArray(self.track.performers),
-                  key=collator.getSortKey) != removeSpecialCharFromArray(self.track.performers):
+        performers = removeSpecialCharFromArray(self.track.performers)
+        if sortStrings(performers) != performers:
             self.missorderedTag.append('Performers')
             self.missorderedTagsCounter += 1
-        if sorted(removeSpecialCharFromArray(self.track.feat), key=collator.getSortKey) != removeSpecialCharFromArray(
-                self.track.feat):
+        feat = removeSpecialCharFromArray(self.track.feat)
+        if sortStrings(feat) != feat:
             self.missorderedTag.append('Featuring')
             self.missorderedTagsCounter += 1
-        if sorted(removeSpecialCharFromArray(self.track.remix), key=collator.getSortKey) != removeSpecialCharFromArray(
-                self.track.remix):
+        remix = removeSpecialCharFromArray(self.track.remix)
+        if sortStrings(remix) != remix:
             self.missorderedTag.append('Remixer')
             self.missorderedTagsCounter += 1
         if self.missorderedTagsCounter > 0:
@@ -271,8 +238,28 @@ class TrackTester:
             self.errors.append(ErrorEnum.MISS_ORDERED_TAGS)
 
 
-    # Test the track cover validity (1000x1000 jpg file)
-    def _testCoverValidity(self):
+    # Test the track cover size (1000x1000 jpg file), the only test reading the cover data
+    def _testCoverSize(self):
+        if not self.track.hasCover:
+            return
+        with profiler.phase('covers'):
+            cover = self.track.loadCover()  # Tracks are loaded in light mode, without their cover
+            coverHash = hashlib.sha1(cover).hexdigest()
+            if coverHash not in self.album.covers:
+                self.album.covers[coverHash] = None
+            if self.track.coverType == 'image/png':
+                return
+            # The album tracks usually embed the same cover, that is only probed once
+            if self.album.covers[coverHash] is None:
+                self.album.covers[coverHash] = probeImageSize(cover)
+            width, height = self.album.covers[coverHash]
+            if width != 1000 and height != 1000:
+                self.errorCounter += 1
+                self.errors.append(ErrorEnum.INVALID_COVER)
+
+
+    # Test the track cover metadata : its presence, its type and its description
+    def _testCoverMetadata(self):
         if not self.track.hasCover:
             self.errorCounter += 1
             self.errors.append(ErrorEnum.MISSING_COVER)
@@ -281,21 +268,16 @@ class TrackTester:
                 self.errorCounter += 1
                 self.errors.append(ErrorEnum.NOT_OPTIMAL_COVER)
             else:
-                with open('tmp.jpg', 'wb') as img:  # Tmp extraction
-                    img.write(self.track.cover)
-                    img.close()
-                with Image.open('tmp.jpg') as img:
-                    if img.size[0] != 1000 and img.size[1] != 1000:
-                        self.errorCounter += 1
-                        self.errors.append(ErrorEnum.INVALID_COVER)
-                img.close()
-                os.remove('tmp.jpg')  # GC
                 if self.track.coverDesc == '':
                     self.errorCounter += 1
                     self.errors.append(ErrorEnum.NO_COVER_DESCRIPTION)
                 else:
-                    description = self.track.albumArtist + ' - ' + self.track.year + ' - ' + self.track.albumTitle + ' - Front.jpg'
-                    if self.track.coverDesc != description and self._areStringsMatchingWithFoldernameRestrictions(self.track.coverDesc, description) is False:
+                    descriptionKey = (self.track.coverDesc, self.track.albumArtist, self.track.year, self.track.albumTitle)
+                    if descriptionKey not in self.album.coverDescriptions:
+                        description = self.track.albumArtist + ' - ' + self.track.year + ' - ' + self.track.albumTitle + ' - Front.jpg'
+                        self.album.coverDescriptions[descriptionKey] = self.track.coverDesc == description or \
+                            self._areStringsMatchingWithFoldernameRestrictions(self.track.coverDesc, description) is not False
+                    if self.album.coverDescriptions[descriptionKey] is False:
                         self.errorCounter += 1
                         self.errors.append(ErrorEnum.COVER_DESCRIPTION_NOT_MATCHING)
 
@@ -336,8 +318,25 @@ class TrackTester:
                 self.errors.append(ErrorEnum.NONEXISTENT_LANG)
 
 
+    # Test that each tag in file has a unique field
+    def _testTagsUnicity(self):
+        if not self.track.testTagsUnicity():
+            self.errorCounter += 1
+            self.errors.append(ErrorEnum.TAG_NOT_UNIQUE)
+
+
+    # Test that the year tag matches the year in the release date tag
+    def _testReleaseYear(self):
+        if self.track.date != '':
+            if self.track.year != self.track.date[0:4]:
+                self.errorCounter += 1
+                self.errors.append(ErrorEnum.YEAR_VS_RELEASE_YEAR)
+
+
     # Tests a Track on a given topic using an error code as documented in this function
     def _testErrorForErrorCode(self, errorCode, string1, string2):
+        if errorCode not in self.checks.errors:
+            return
         if string1 != string2:
             if self._areStringsMatchingWithFoldernameRestrictions(string1, string2) is False:
                 self.errorCounter += 1
@@ -346,6 +345,8 @@ class TrackTester:
 
     # Tests a Track on a given topic using an error code as documented in this function
     def _testArrayErrorForErrorCode(self, errorCode, array1, array2):
+        if errorCode not in self.checks.errors:
+            return
         # Raise error if lengths are not matching
         if len(array1) != len(array2):
             self.errorCounter += 1
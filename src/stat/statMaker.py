@@ -3,16 +3,40 @@ from src.models.album import Album
 from src.models.track import Track
 
 
+# StatAggregate holds the artists, genres and labels found in a part of the library. Aggregates are keyed by name, and
+# merging another one only appends its new keys, so the first appearance order of the library is kept
+class StatAggregate(object):
+    def __init__(self):
+        self.artists = {}  # { artist: [info] }, info being the album, album artist and role of an appearance
+        self.genres = {}  # Used as an ordered set, values are None
+        self.labels = {}  # Used as an ordered set, values are None
+        self.tracksCounter = 0
+
+
+    # Add the other aggregate artists appearances, genres and labels to this one
+    def merge(self, other):
+        for artist, info in other.artists.items():
+            if artist in self.artists:
+                self.artists[artist].extend(info)
+            else:
+                self.artists[artist] = info
+        self.genres.update(other.genres)
+        self.labels.update(other.labels)
+        self.tracksCounter += other.tracksCounter
+
+
+    # Returns the artists details, as listed in the stat report
+    def artistsDetails(self):
+        return [{'artist': artist, 'info': info} for artist, info in self.artists.items()]
+
+
 class StatMaker:
-    def __init__(self, files, preservedPath):
-        self.preservedPath = preservedPath
-        self.files = files
-        self.album = Album(files)
+    def __init__(self, folderListing):
+        self.preservedPath = folderListing.preservedPath
+        self.files = folderListing.files
+        self.album = Album(self.files)
         self.tracks = []
-        self.artists = []
-        self.genres = []
-        self.labels = []
-        self.artistsDetails = []
+        self.aggregate = StatAggregate()
         self._createTracks()
         self._analyzeTracks()
 
@@ -29,66 +53,37 @@ class StatMaker:
         for folder in pathList:  # Build the file path by concatenating folder in the file path
             audioTagPath += '{}/'.format(folder)
         audioTagPath += fileName  # Append the filename at the end of the newly created path
-        # Send the file path to the mutagen ID3 to get its tags and create the associated Track object
+        # Send the file path to the mutagen ID3 to get its tags and create the associated Track object (covers are not needed)
         if fileName[-3:] == 'mp3' or fileName[-3:] == 'MP3':
-            return Track('MP3', pathList, fileName, audioTagPath)
+            return Track('MP3', pathList, fileName, audioTagPath, lightMode=True)
         elif fileName[-4:] == 'flac' or fileName[-4:] == 'FLAC':
-            return Track('FLAC', pathList, fileName, audioTagPath)
+            return Track('FLAC', pathList, fileName, audioTagPath, lightMode=True)
         else:
             return None
 
 
+    # Only the first appearance of an artist in the album is kept, with the role it has on this track
     def _analyzeTracks(self):
+        artists = self.aggregate.artists
         for track in self.tracks:
             # Analyzing artists
-            for artist in track.artists:
-                if artist not in self.artists:
-                    self.artistsDetails.append({
-                        'artist': artist,
-                        'info': [{
-                            'album': track.albumTitle,
-                            'albumArtist': track.albumArtist,
-                            'as': 'artist'
-                        }]
-                    })
-                    self.artists.append(artist)
-            for performer in track.performers:
-                if performer not in self.artists:
-                    self.artistsDetails.append({
-                        'artist': performer,
-                        'info': [{
+            for role, names in (('artist', track.artists), ('performer', track.performers),
+                                ('composer', track.composers), ('producer', track.producers)):
+                for name in names:
+                    if name not in artists:
+                        artists[name] = [{
                             'album': track.albumTitle,
                             'albumArtist': track.albumArtist,
-                            'as': 'performer'
+                            'as': role
                         }]
-                    })
-                    self.artists.append(performer)
-            for composer in track.composers:
-                if composer not in self.artists:
-                    self.artistsDetails.append({
-                        'artist': composer,
-                        'info': [{
-                            'album': track.albumTitle,
-                            'albumArtist': track.albumArtist,
-                            'as': 'composer'
-                        }]
-                    })
-                    self.artists.append(composer)
-            for producer in track.producers:
-                if producer not in self.artists:
-                    self.artistsDetails.append({
-                        'artist': producer,
-                        'info': [{
-                            'album': track.albumTitle,
-                            'albumArtist': track.albumArtist,
-                            'as': 'producer'
-                        }]
-                    })
-                    self.artists.append(producer)
             # Analyzing genres
             for genre in track.genres:
-                if genre not in self.genres:
-                    self.genres.append(genre)
+                self.aggregate.genres[genre] = None
             # Analyzing label
-            if track.label not in self.labels:
-                self.labels.append(track.label)
+            self.aggregate.labels[track.label] = None
+        self.aggregate.tracksCounter = len(self.tracks)
+
+
+# Pool worker : compute the stats of an album, only its aggregate is sent back with the album crawl progress
+def makeAlbumStats(folderListing):
+    return folderListing.progress, StatMaker(folderListing).aggregate
@@ -0,0 +1,69 @@
+# Python imports
+import os
+import json
+import hashlib
+import sqlite3
+# Project imports
+from src.utils.libraryWalker import LibraryWalker
+from src.utils.tools import createDirectory, computeSourcesHash
+# Globals
+# The sources each mode results depend on (relative to the src folder), any change in them processes all albums again
+modesSources = {
+    'fill': ['fill', 'models', 'utils/tagChanges.py', 'utils/tools.py'],
+    'clean': ['clean', 'utils/tagChanges.py']
+}
+
+
+# AlbumManifest remembers the albums processed by the fill and clean modes, with the signature of their files once
+# written (name, size and modification time). A later run of the same mode skips the albums whose files did not change
+# since, unless it is forced. A new script version, or a change in the mode sources, processes all the albums again
+class AlbumManifest(object):
+    def __init__(self, path, mode, scriptVersion, force=False):
+        self.path = path
+        self.mode = mode
+        self.version = '{}-{}'.format(scriptVersion, computeSourcesHash(modesSources[mode]))
+        self.force = force
+        self.processedAlbums = 0
+        self.skippedAlbums = 0
+        self.skippedTracks = 0
+        if os.path.dirname(path) != '':
+            createDirectory(os.path.dirname(path))
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS albums (mode TEXT, path TEXT, signature TEXT, '
+                                'PRIMARY KEY (mode, path))')
+
+
+    # Yield the crawled albums to process, the ones unchanged since they were last processed are skipped
+    def filter(self, albums):
+        for folderListing in albums:
+            if self.force is False:
+                row = self.connection.execute('SELECT signature FROM albums WHERE mode = ? AND path = ?',
+                                              (self.mode, os.path.abspath(folderListing.path))).fetchone()
+                if row is not None and row[0] == self._computeSignature(folderListing):
+                    self.skippedAlbums += 1
+                    self.skippedTracks += folderListing.tracksCounter
+                    continue
+            yield folderListing
+
+
+    # Record a processed album, its folder is listed again to get the size and modification time of the written files
+    def record(self, albumPath):
+        self.processedAlbums += 1
+        folderListing = LibraryWalker.listFolder(albumPath)[0]
+        if folderListing is not None:
+            self.connection.execute('INSERT OR REPLACE INTO albums VALUES (?, ?, ?)',
+                                    (self.mode, os.path.abspath(albumPath), self._computeSignature(folderListing)))
+
+
+    # Commit the recorded albums and release the database. The albums of an interrupted run are not committed, as its
+    # run journal is the one to resume it
+    def close(self, completed=True):
+        if completed is True:
+            self.connection.commit()
+        self.connection.close()
+
+
+    # The album signature depends on each file name, size and modification time, and on the script and sources version
+    def _computeSignature(self, folderListing):
+        files = [[fileName, folderListing.sizes[fileName], folderListing.mtimes[fileName]] for fileName in folderListing.files]
+        return hashlib.sha1(json.dumps([self.version, files]).encode('utf-8')).hexdigest()
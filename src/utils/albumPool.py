@@ -0,0 +1,58 @@
+# Python imports
+import signal
+import collections
+import concurrent.futures
+
+
+# AlbumPool runs an album worker either serially or on a process pool, and always yields results in input order
+class AlbumPool(object):
+    def __init__(self, jobs):
+        self.jobs = jobs if jobs is not None and jobs > 1 else 1
+        self.executor = None
+        # Albums in flight are bounded so results are consumed (and reported) while the crawl goes on
+        self.window = self.jobs * 4
+        if self.jobs > 1:
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs, initializer=_ignoreInterrupt)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+    # Apply worker on each item of iterable, results are yielded in the same order as iterable. The optional lookup
+    # is called first in the main process, and the worker is skipped for items it returns a result for
+    def map(self, worker, iterable, lookup=None):
+        if self.executor is None:
+            for item in iterable:
+                result = lookup(item) if lookup is not None else None
+                yield result if result is not None else worker(item)
+            return
+        pending = collections.deque()
+        for item in iterable:
+            result = lookup(item) if lookup is not None else None
+            if result is not None:
+                future = concurrent.futures.Future()
+                future.set_result(result)
+                pending.append(future)
+            else:
+                pending.append(self.executor.submit(worker, item))
+            if len(pending) >= self.window:
+                yield pending.popleft().result()
+        while len(pending) > 0:
+            yield pending.popleft().result()
+
+
+    # Release the worker processes, pending albums are cancelled if the caller stopped consuming results
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+
+# Workers ignore Ctrl-C, the main process decides how the run is stopped and waits for the albums being processed
+def _ignoreInterrupt():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
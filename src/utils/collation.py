@@ -0,0 +1,27 @@
+# Python imports
+import functools
+import icu
+
+
+# The process collator, built on first use. Each pool worker process then builds its own instance
+_collator = None
+
+
+# Returns the process collator, for accented char sorting
+def getCollator():
+    global _collator
+    if _collator is None:
+        _collator = icu.Collator.createInstance(icu.Locale('fr_FR.UTF-8'))
+    return _collator
+
+
+# Returns the collation sort key of a string. The same artist names are sorted many times across a library,
+# so keys are memoized instead of being computed again for each track
+@functools.lru_cache(maxsize=65536)
+def sortKey(string):
+    return getCollator().getSortKey(string)
+
+
+# Returns a new list with the strings sorted with accents properly considered
+def sortStrings(strings):
+    return sorted(strings, key=sortKey)
@@ -0,0 +1,70 @@
+# Python imports
+import os
+# Project imports
+from src.models.folderInfo import FolderInfo
+from src.models.folderListing import FolderListing
+from src.utils.profiler import profiler
+
+
+# LibraryWalker lazily crawls the library with os.scandir : each album folder listing is yielded as soon as it is read,
+# while the FolderInfo is being filled. Only the folders on the current path are held in memory.
+class LibraryWalker(object):
+    def __init__(self, folder):
+        self.folder = folder
+        self.folderInfo = FolderInfo(folder)
+
+
+    # Yield album folders listing in the alphabetical order, the FolderInfo totals are computed once the crawl is over
+    def albums(self):
+        yield from self._walk(self.folder, 0, 0, 100)
+        self.folderInfo.computeTotals()
+
+
+    # Depth first crawl, each level being sorted before descending. The progress is the crawled percentage of the
+    # library when reaching this folder, and the span is the percentage share of this folder in the library
+    def _walk(self, path, depth, progress, progressSpan):
+        with profiler.phase('walk'):
+            folderListing, subFolders, subFoldersCounter = self.listFolder(path)
+            if folderListing is None:
+                return
+            self.folderInfo.addFolder(folderListing, depth, subFoldersCounter)
+        if depth == 2:
+            folderListing.progress = progress
+            yield folderListing
+        # Artists are sorted with a trailing separator and albums on their name only, so the album order
+        # is the same than the one from a sorted(os.walk()) on the whole library
+        if depth == 0:
+            subFolders.sort(key=lambda name: name + os.sep)
+        else:
+            subFolders.sort()
+        for index, name in enumerate(subFolders):
+            subFolderSpan = progressSpan / len(subFolders)
+            yield from self._walk(os.path.join(path, name), depth + 1, progress + index * subFolderSpan, subFolderSpan)
+
+
+    # List a folder once, relying on the DirEntry cached stat results to get file sizes and modification times
+    @staticmethod
+    def listFolder(path):
+        subFolders = []
+        subFoldersCounter = 0
+        files = []
+        sizes = {}
+        mtimes = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name[0] == '.':  # Ignore hidden files and directories, before descending into them
+                        continue
+                    if entry.is_dir():
+                        subFoldersCounter += 1
+                        if not entry.is_symlink():  # Do not follow symbolic links, as os.walk()
+                            subFolders.append(entry.name)
+                    else:
+                        stat = entry.stat()
+                        files.append(entry.name)
+                        sizes[entry.name] = stat.st_size
+                        mtimes[entry.name] = stat.st_mtime_ns
+        except OSError:  # Unreadable folder, skipped as os.walk() does
+            return None, [], 0
+        files.sort()
+        return FolderListing(path, files, sizes, mtimes), subFolders, subFoldersCounter
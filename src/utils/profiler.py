@@ -0,0 +1,136 @@
+# Python imports
+import os
+import time
+
+
+# The scan phases, in their processing order, as displayed in the console summary and in the JSON dump
+profiledPhases = ('walk', 'cache', 'tags', 'checks', 'covers', 'report')
+
+
+# Profiler accumulates the wall time, the call count and the bytes read of each scan phase. Phases can be nested : the
+# enclosing phase is paused meanwhile, so each phase only holds its own time and the phases totals can be summed up
+class Profiler(object):
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}
+        self._stack = []
+        self._ioFile = None
+        self._ioPid = None
+        self._ioOffset = 0
+        self._ioSupported = True
+
+
+    # Returns the context manager measuring the given phase, that does nothing when the profiler is disabled
+    def phase(self, name):
+        if self.enabled is False:
+            return _disabledPhase
+        return _Phase(self, name)
+
+
+    # Returns the phases measured so far, and restart from scratch. Used by workers to send their phases with the album
+    def pop(self):
+        phases = self.phases
+        self.phases = {}
+        return phases
+
+
+    # Add the phases measured by another profiler (a pool worker one)
+    def merge(self, phases):
+        for name, measure in phases.items():
+            total = self.phases.setdefault(name, {'seconds': 0.0, 'calls': 0, 'bytesRead': 0})
+            total['seconds'] += measure['seconds']
+            total['calls'] += measure['calls']
+            total['bytesRead'] += measure['bytesRead']
+
+
+    # Returns the phases in their processing order, with rounded durations (for the reports)
+    def summary(self):
+        summary = {}
+        for name in sorted(self.phases, key=lambda phase: profiledPhases.index(phase) if phase in profiledPhases else len(profiledPhases)):
+            measure = self.phases[name]
+            summary[name] = {
+                'seconds': round(measure['seconds'], 3),
+                'calls': measure['calls'],
+                'bytesRead': max(measure['bytesRead'], 0)
+            }
+        return summary
+
+
+    # Pause the enclosing phase, if any, and start measuring a new one
+    def _enter(self, name):
+        now = time.perf_counter()
+        bytesRead = self._readBytes()
+        if len(self._stack) > 0:
+            self._accumulate(self._stack[-1], now, bytesRead)
+        self._stack.append([name, now, bytesRead])
+        self.phases.setdefault(name, {'seconds': 0.0, 'calls': 0, 'bytesRead': 0})['calls'] += 1
+
+
+    # Stop measuring the current phase, and resume the enclosing one
+    def _exit(self):
+        now = time.perf_counter()
+        bytesRead = self._readBytes()
+        self._accumulate(self._stack.pop(), now, bytesRead)
+        if len(self._stack) > 0:
+            self._stack[-1][1] = now
+            self._stack[-1][2] = bytesRead
+
+
+    # Add the time and bytes spent since the phase was started or resumed
+    def _accumulate(self, running, now, bytesRead):
+        measure = self.phases[running[0]]
+        measure['seconds'] += now - running[1]
+        measure['bytesRead'] += bytesRead - running[2]
+
+
+    # Returns the bytes read by this process so far (rchar from /proc/self/io, only available on Linux, 0 otherwise).
+    # The procfs reads are counted by the kernel too, so their length is removed from the value. The file is opened
+    # again in forked pool workers, as the inherited descriptor still refers to the parent process
+    def _readBytes(self):
+        if self._ioSupported is False:
+            return 0
+        try:
+            if self._ioPid != os.getpid():
+                self._ioFile = os.open('/proc/self/io', os.O_RDONLY)
+                self._ioPid = os.getpid()
+                self._ioOffset = 0
+            data = os.pread(self._ioFile, 512, 0)
+            self._ioOffset += len(data)
+            return int(data.split(b'\n', 1)[0].split(b':')[1]) - self._ioOffset
+        except (OSError, IndexError, ValueError):
+            self._ioSupported = False
+            return 0
+
+
+# A measured phase, as a context manager
+class _Phase(object):
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+
+    def __enter__(self):
+        self.profiler._enter(self.name)
+
+
+    def __exit__(self, excType, excValue, traceback):
+        self.profiler._exit()
+
+
+# The context manager used when the profiler is disabled
+class _DisabledPhase(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+
+    def __exit__(self, excType, excValue, traceback):
+        pass
+
+
+_disabledPhase = _DisabledPhase()
+# The process profiler, disabled unless --profile is given. Each pool worker process has its own instance
+profiler = Profiler()
@@ -0,0 +1,114 @@
+# Python imports
+import sys
+import json
+import time
+import datetime
+import threading
+import collections
+# Project imports
+from src.utils.tools import computePurity
+
+
+# ProgressReporter writes the progress of a run as NDJSON events on stderr (--progress=ndjson), to be parsed by a job
+# scheduler. Events are written every interval seconds from a background thread, so a run that spends a long time on a
+# single album still reports on time. The main loop registers each processed album, the crawled albums sizes being
+# taken from the albums it watches. Only the albums actually read count in the read throughput, the ones reused from the
+# scan cache or the run journal are counted apart. When disabled, the reporter does nothing
+class ProgressReporter(object):
+    def __init__(self, mode, enabled=False, interval=2, checksCounter=None, stream=None):
+        self.mode = mode
+        self.enabled = enabled
+        self.interval = interval
+        self.checksCounter = checksCounter  # Only given in scan mode, where the errors and the purity are reported
+        self.stream = stream if stream is not None else sys.stderr
+        self.albums = 0
+        self.tracks = 0
+        self.bytes = 0
+        self.reusedAlbums = 0
+        self.errors = 0
+        self.progress = 0
+        self._sizes = collections.deque()  # Sizes of the watched albums, in the order their results come back
+        self._startTime = time.time()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        if self.enabled is True:
+            self._emit('start')
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+
+    # Yield the crawled albums unchanged, their sizes are kept to compute the read throughput
+    def watch(self, albums):
+        if self.enabled is False:
+            yield from albums
+            return
+        for folderListing in albums:
+            self._sizes.append(folderListing.size)
+            yield folderListing
+
+
+    # Register a processed album (progress being the processed percentage of the library), and its errors in scan mode.
+    # An album reused from the scan cache or the run journal was not read
+    def addAlbum(self, tracks, progress, errors=0, reused=False):
+        if self.enabled is False:
+            return
+        with self._lock:
+            self.albums += 1
+            self.tracks += tracks
+            size = self._sizes.popleft() if len(self._sizes) > 0 else 0
+            if reused is True:
+                self.reusedAlbums += 1
+            else:
+                self.bytes += size
+            self.errors += errors
+            self.progress = progress
+
+
+    # Stop the periodic events, and write the last one
+    def close(self, interrupted=False):
+        if self.enabled is False:
+            return
+        self._stopped.set()
+        self._thread.join()
+        if interrupted is False:
+            self.progress = 100
+        self._emit('interrupted' if interrupted is True else 'end')
+
+
+    # Write an event every interval seconds, until the reporter is closed
+    def _run(self):
+        while self._stopped.wait(self.interval) is False:
+            self._emit('progress')
+
+
+    # Write an event with the run counters, its throughput and its estimated completion time
+    def _emit(self, event):
+        with self._lock:
+            now = time.time()
+            elapsed = now - self._startTime
+            values = {
+                'event': event,
+                'mode': self.mode,
+                'time': datetime.datetime.fromtimestamp(now).isoformat(timespec='seconds'),
+                'elapsed': round(elapsed, 3),
+                'albums': self.albums,
+                'reusedAlbums': self.reusedAlbums,
+                'tracks': self.tracks,
+                'tracksPerSecond': round(self.tracks / elapsed, 1) if elapsed > 0 else 0,
+                'megaBytesPerSecond': round(self.bytes / 1048576 / elapsed, 2) if elapsed > 0 else 0,
+                'progress': round(min(self.progress, 100), 2)
+            }
+            if self.checksCounter is not None:
+                values['errors'] = self.errors
+                values['purity'] = computePurity(self.errors, self.tracks, self.checksCounter) if self.tracks > 0 else None
+            # The remaining time is extrapolated from the processed share of the library
+            remaining = None
+            if event == 'progress' and 0 < self.progress < 100:
+                remaining = elapsed * (100 - self.progress) / self.progress
+            elif event == 'end':
+                remaining = 0
+            values['remainingSeconds'] = round(remaining, 1) if remaining is not None else None
+            values['eta'] = datetime.datetime.fromtimestamp(now + remaining).isoformat(timespec='seconds') if remaining is not None else None
+            self.stream.write(json.dumps(values, separators=(',', ':')) + '\n')
+            self.stream.flush()
@@ -2,53 +2,151 @@
 import os
 import datetime
 import json
-import icu
+import shutil
+import collections
+import concurrent.futures
 # Project imports
+from src.utils.collation import sortKey
 from src.utils.errorEnum import ErrorEnum
 from src.utils.tools import createDirectory, removeSpecialCharFromString
 
 
-# Generate an JSON file from the albumTesters array
-def computeFillReport(version, duration, folderInfo, albumTesters, errorCounter, purity):
-    # Creating output dict object
-    now = datetime.datetime.now()
-    output = {
-        'date': "{}-{}-{}".format(now.year, now.month, now.day),
-        'version': version,
-        'elapsedSeconds': duration,
-        'folderInfo': _computeFolderInfo(folderInfo, errorCounter, purity),
-        'artists': []
-    }
-    currentArtistName = ''
-    currentArtist = {}
-    for albumTester in albumTesters:
+# ReportWriter streams the scan report into its JSON file : each artist is written as soon as its albums are tested,
+# so only the current artist is held in memory. The folder info and the elapsed time are written last. The albums
+# distinct covers are only reported when the embedded covers are read
+class ReportWriter(object):
+    def __init__(self, version, type, minify, path, readCover=True):
+        self.minify = minify
+        self.readCover = readCover
+        self.currentArtistName = ''
+        self.currentArtist = {}
+        self.artistsCounter = 0
+        now = datetime.datetime.now()
+        self.file = open(_computeReportFilePath(type, path), 'w')
+        self.file.write('{')
+        self._writeKey('date', "{}-{}-{}".format(now.year, now.month, now.day))
+        self._writeSeparator()
+        self._writeKey('version', version)
+        self._writeSeparator()
+        self.file.write('\n  "artists": [' if minify is False else '"artists":[')
+
+
+    # Append a tested album to the current artist, the previous artist is written if the album artist has changed
+    def addAlbum(self, albumTester):
         albumPathList = albumTester.preservedPath
-        if currentArtistName != albumPathList[len(albumPathList) - 2]:  # Current Artist has changed
-            if currentArtist != {}:  # Avoid to add the first empty artist when loop starts
-                output['artists'].append(currentArtist)
-                currentArtist = {}
-            currentArtistName = albumPathList[len(albumPathList) - 2]
-            currentArtist['name'] = currentArtistName
-            currentArtist['albums'] = []
-        album = {
-            'title': albumPathList[len(albumPathList) - 1],
-            'errors': [],
-            'tracks': []
-        }
-        for error in albumTester.errors:
-            album['errors'].append(error.value)
-        for trackTester in albumTester.tracks:
-            if trackTester.errorCounter > 0:
-                track = {
-                    'title': trackTester.track.fileName,
-                    'errors': []
-                }
-                for error in trackTester.errors:
-                    track['errors'].append(error.value)
-                album['tracks'].append(track)
-        currentArtist['albums'].append(album)
-    output['artists'].append(currentArtist)
-    return output
+        if self.currentArtistName != albumPathList[len(albumPathList) - 2]:  # Current Artist has changed
+            if self.currentArtist != {}:  # Avoid to add the first empty artist when loop starts
+                self._writeArtist()
+            self.currentArtistName = albumPathList[len(albumPathList) - 2]
+            self.currentArtist['name'] = self.currentArtistName
+            self.currentArtist['albums'] = []
+        self.currentArtist['albums'].append(computeAlbumReport(albumTester, self.readCover))
+
+
+    # Write the last artist and the report header values, that are only known once the scan is over. The scan phases
+    # timings are only written when profiling, the tested error codes when only some checks were selected, and the
+    # incomplete flag when the scan was interrupted (the report then only holds the scanned albums)
+    def close(self, duration, folderInfo, errorCounter, purity, timings=None, checks=None, incomplete=False):
+        if self.currentArtist != {}:  # An interrupted scan may not have reported any album
+            self._writeArtist()
+        self.file.write('\n  ]' if self.minify is False else ']')
+        self._writeSeparator()
+        if timings is not None:
+            self._writeKey('timings', timings)
+            self._writeSeparator()
+        checksCounter = None
+        if checks is not None and checks.isPartial is True:
+            self._writeKey('checks', checks.codes())
+            self._writeSeparator()
+            checksCounter = len(checks.errors)
+        if incomplete is True:
+            self._writeKey('incomplete', True)
+            self._writeSeparator()
+        self._writeKey('elapsedSeconds', duration)
+        self._writeSeparator()
+        self._writeKey('folderInfo', _computeFolderInfo(folderInfo, errorCounter, purity, checksCounter))
+        self.file.write('\n}' if self.minify is False else '}')
+        self.file.close()
+
+
+    # Write the current artist as an item of the artists array
+    def _writeArtist(self):
+        if self.artistsCounter > 0:
+            self._writeSeparator()
+        if self.minify is True:
+            self.file.write(json.dumps(self.currentArtist, separators=(',', ':')))
+        else:
+            self.file.write('\n    ' + json.dumps(self.currentArtist, indent=2).replace('\n', '\n    '))
+        self.artistsCounter += 1
+        self.currentArtist = {}
+
+
+    # Write a key and its value at the report root level
+    def _writeKey(self, key, value):
+        if self.minify is True:
+            self.file.write('{}:{}'.format(json.dumps(key), json.dumps(value, separators=(',', ':'))))
+        else:
+            self.file.write('\n  {}: {}'.format(json.dumps(key), json.dumps(value, indent=2).replace('\n', '\n  ')))
+
+
+    # Write the separator between two items
+    def _writeSeparator(self):
+        self.file.write(',')
+
+
+# TagPlanWriter streams the tags a fill or clean dry run would write into a NDJSON plan : a header line holding the plan
+# mode and library folder, then a line per file to write. Paths are relative to the library folder
+class TagPlanWriter(object):
+    def __init__(self, version, mode, folder, path):
+        self.folder = folder
+        self.filesCounter = 0
+        now = datetime.datetime.now()
+        self.path = _computeReportFilePath('{}-Plan'.format(mode.capitalize()), path, 'ndjson')
+        self.file = open(self.path, 'w', encoding='utf-8', errors='surrogateescape')
+        self._writeLine({'plan': mode, 'version': version, 'folder': folder, 'date': "{}-{}-{}".format(now.year, now.month, now.day)})
+
+
+    # Append the planned changes of an album files
+    def addEntries(self, entries):
+        for entry in entries:
+            entry['file'] = os.path.relpath(entry['file'], self.folder)
+            if entry.get('cover') is not None:
+                entry['cover']['file'] = os.path.relpath(entry['cover']['file'], self.folder)
+            self._writeLine(entry)
+            self.filesCounter += 1
+
+
+    def close(self):
+        self.file.close()
+
+
+    # Write a compact JSON line
+    def _writeLine(self, value):
+        self.file.write(json.dumps(value, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+# Generate the JSON report of a tested album, the distinct embedded covers are only known if they were read
+def computeAlbumReport(albumTester, readCover=True):
+    albumPathList = albumTester.preservedPath
+    album = {
+        'title': albumPathList[len(albumPathList) - 1]
+    }
+    if readCover is True:
+        album['covers'] = len(albumTester.album.covers)  # Distinct embedded covers
+    album['errors'] = []
+    album['tracks'] = []
+    for error in albumTester.errors:
+        album['errors'].append(error.value)
+    for trackResult in albumTester.tracks:
+        if trackResult.errorCounter > 0:
+            track = {
+                'title': trackResult.fileName,
+                'errors': []
+            }
+            for error in trackResult.errors:
+                track['errors'].append(error.value)
+            album['tracks'].append(track)
+    return album
 
 
 # Generate an JSON file from the metaAnalyzer class
@@ -68,7 +166,6 @@ def computeMetaAnalyzeReport(version, duration, metaAnalyzer):
 # Generate an JSON file from the stats class
 def computeStatReport(version, duration, artists, genres, labels, path):
     # Creating output dict object
-    collator = icu.Collator.createInstance(icu.Locale('fr_FR.UTF-8'))
     now = datetime.datetime.now()
     output = {
         'date': "{}-{}-{}".format(now.year, now.month, now.day),
@@ -80,16 +177,18 @@ def computeStatReport(version, duration, artists, genres, labels, path):
             'labels': len(labels)
         },
         'folderPath': path,
-        'artists': sorted(artists, key=lambda x: collator.getSortKey(x['artist'])),
-        'genres': sorted(genres, key=collator.getSortKey),
-        'labels': sorted(labels, key=collator.getSortKey)
+        'artists': sorted(artists, key=lambda x: sortKey(x['artist'])),
+        'genres': sorted(genres, key=sortKey),
+        'labels': sorted(labels, key=sortKey)
     }
     return output
 
 
 
 # Convert the folderInfo object into a returned dict
-def _computeFolderInfo(folderInfo, errorCounter, purity):
+def _computeFolderInfo(folderInfo, errorCounter, purity, checksCounter=None):
+    if checksCounter is None:  # All errors are tested by default
+        checksCounter = len(ErrorEnum)
     output = {
         'name': folderInfo.folder,
         'files': folderInfo.filesCounter,
@@ -108,7 +207,7 @@ def _computeFolderInfo(folderInfo, errorCounter, purity):
         'tracksCount': folderInfo.tracksCounter,
         'coversCount': folderInfo.coversCounter,
         'errorsCount': errorCounter,
-        'possibleErrors': folderInfo.tracksCounter * len(ErrorEnum),
+        'possibleErrors': folderInfo.tracksCounter * checksCounter,
         'purity': purity
     }
     return output
@@ -116,59 +215,96 @@ def _computeFolderInfo(folderInfo, errorCounter, purity):
 
 # Save the output json file
 def saveReportFile(report, type, minify, path):
+    # Then name and dump report as JSON file
+    with open(_computeReportFilePath(type, path), 'w') as file:
+        if minify == True:
+            json.dump(report, file, separators=(',', ':'))
+        else:
+            json.dump(report, file, indent=2)
+
+
+# Compute the dated report file path, and create its folder
+def _computeReportFilePath(type, path, extension='json'):
     # Set default path to dump folder if not provided
     if path is None:
         path = 'dump'
     # Ensure folder is created if not existing
     createDirectory(path)
-    # Then name and dump report as JSON file
     fileName = "OstrichRemover-{}-{}".format(type, datetime.datetime.now().strftime('%Y-%m-%d-%H-%M-%S'))
-    with open('{}/{}.json'.format(path, fileName), 'w') as file:
-        if minify == True:
-            json.dump(report, file, separators=(',', ':'))
-        else:
-            json.dump(report, file, indent=2)
+    return '{}/{}.{}'.format(path, fileName, extension)
 
 
-# Save the output json file
-def saveGeneratedJSONFile(elements, contributions, type, path):
+# Save the generated JSON files of a type (artists, genres or labels) in its txt folder. Existing files are listed once,
+# each document is then created, updated or left unchanged on a bounded thread pool, and stale files are deleted.
+# Returns the number of created, updated, unchanged and deleted files
+def saveGeneratedJSONFiles(elements, contributions, type, path, threads=8):
     # Set default path to dump folder if not provided
     if path is None:
         path = 'dump'
     # Ensure folder is created if not existing
-    path = '{}/{}/txt'.format(path, type);
+    path = '{}/{}/txt'.format(path, type)
     createDirectory(path)
-    for element in elements:
-        # Then name and dump report as JSON file
-        filePath = "{}".format('{}/{}.json'.format(path, element))
-        jsonContent = generateOutputJSON(type, element, contributions[element])
-        # Only create JSON if not alreay exists
-        if not os.path.exists(filePath):
-            with open(filePath, 'w', encoding='utf-8') as file:
-                json.dump(jsonContent, file, indent=2, ensure_ascii=False)
-        # Otherwise, mudt only update useful values and not erase anything
-        else:
-            with open(filePath, 'r', encoding='utf-8') as file:
-                fData = json.loads(file.read())
-                if type == 'artists':
-                    if fData['realName'] != jsonContent['realName'] or fData['originCountry'] != jsonContent['originCountry'] or fData['yearsActive'] != jsonContent['yearsActive']:
-                        fData['realName'] = jsonContent['realName']
-                        fData['originCountry'] = jsonContent['originCountry']
-                        fData['yearsActive'] = jsonContent['yearsActive']
-                        with open(filePath, 'w', encoding='utf-8') as file:
-                            json.dump(fData, file, indent=2, ensure_ascii=False)
-                elif type == 'genres':
-                    if fData['yearsActive'] != jsonContent['yearsActive'] or sorted(fData['places']) != sorted(jsonContent['places']):
-                        fData['yearsActive'] = jsonContent['yearsActive']
-                        fData['places'] = jsonContent['places']
-                        with open(filePath, 'w', encoding='utf-8') as file:
-                            json.dump(fData, file, indent=2, ensure_ascii=False)
-                elif type == 'labels':
-                    if fData['yearsActive'] != jsonContent['yearsActive']:
-                        fData['yearsActive'] = jsonContent['yearsActive']
-                        with open(filePath, 'w', encoding='utf-8') as file:
-                            json.dump(fData, file, indent=2, ensure_ascii=False)
+    existingFiles = os.listdir(path)
+    existingElements = set(fileName[:-5] for fileName in existingFiles if fileName.endswith('.json'))
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = collections.deque()
+        for element in elements:
+            futures.append(executor.submit(_saveGeneratedJSONFile, type, path, element, contributions[element],
+                                           element in existingElements))
+            if len(futures) >= threads * 4:  # Documents in flight are bounded, as elements can be numerous
+                counts[futures.popleft().result()] += 1
+        while len(futures) > 0:
+            counts[futures.popleft().result()] += 1
+    # Files that do not match any element anymore are removed (including unfinished temporary files)
+    for fileName in existingFiles:
+        if fileName[:-5] not in contributions:
+            os.remove('{}/{}'.format(path, fileName))
+            counts['deleted'] += 1
+    return counts
+
+
+# Create the element JSON file, or only update its generated values if it already exists (other values are
+# hand-written and must not be erased). Returns 'created', 'updated' or 'unchanged'
+def _saveGeneratedJSONFile(type, path, element, contributions, exists):
+    filePath = '{}/{}.json'.format(path, element)
+    jsonContent = generateOutputJSON(type, element, contributions)
+    if exists is False:
+        _writeGeneratedJSONFile(filePath, jsonContent)
+        return 'created'
+    with open(filePath, 'r', encoding='utf-8') as file:
+        fData = json.loads(file.read())
+    if type == 'artists':
+        if fData['realName'] != jsonContent['realName'] or fData['originCountry'] != jsonContent['originCountry'] or fData['yearsActive'] != jsonContent['yearsActive']:
+            fData['realName'] = jsonContent['realName']
+            fData['originCountry'] = jsonContent['originCountry']
+            fData['yearsActive'] = jsonContent['yearsActive']
+            _writeGeneratedJSONFile(filePath, fData)
+            return 'updated'
+    elif type == 'genres':
+        if fData['yearsActive'] != jsonContent['yearsActive'] or sorted(fData['places']) != sorted(jsonContent['places']):
+            fData['yearsActive'] = jsonContent['yearsActive']
+            fData['places'] = jsonContent['places']
+            _writeGeneratedJSONFile(filePath, fData)
+            return 'updated'
+    elif type == 'labels':
+        if fData['yearsActive'] != jsonContent['yearsActive']:
+            fData['yearsActive'] = jsonContent['yearsActive']
+            _writeGeneratedJSONFile(filePath, fData)
+            return 'updated'
+    return 'unchanged'
+
 
+# Write a JSON file through a temporary file that replaces it once complete, so an interrupted run never leaves a
+# truncated file behind. New files get the default permissions, and updated files keep their own
+def _writeGeneratedJSONFile(filePath, jsonContent):
+    folder, fileName = os.path.split(filePath)
+    temporaryPath = os.path.join(folder, '.{}.tmp'.format(fileName))
+    with open(temporaryPath, 'w', encoding='utf-8') as file:
+        json.dump(jsonContent, file, indent=2, ensure_ascii=False)
+    if os.path.exists(filePath):
+        shutil.copymode(filePath, temporaryPath)
+    os.replace(temporaryPath, filePath)
 
 
 def generateOutputJSON(type, element, contributions):
@@ -0,0 +1,116 @@
+# Python imports
+import os
+import json
+import time
+import signal
+import hashlib
+# Project imports
+from src.utils.tools import createDirectory
+
+
+# RunJournal records the albums completed by a long run (scan, fill or gen), so an interrupted run can be resumed with
+# --resume. Each album result is appended to a NDJSON file, flushed to disk every few seconds, after a header line that
+# identifies the run : a journal is only resumed by a run with the same mode, folder, script version and options. The
+# journal is removed once the run completes
+class RunJournal(object):
+    def __init__(self, mode, folder, scriptVersion, options=None, resume=False, path='cache', flushInterval=2):
+        folder = os.path.abspath(folder)
+        self.header = {'journal': mode, 'folder': folder, 'version': scriptVersion, 'options': options}
+        self.path = os.path.join(path, 'journal-{}-{}.ndjson'.format(mode, hashlib.sha1(folder.encode('utf-8')).hexdigest()[:8]))
+        self.flushInterval = flushInterval
+        self.albums = {}  # { album path: result } of the resumed run
+        self.resumedAlbums = 0
+        self._resumedPaths = set()  # Already in the journal file
+        self._lastFlush = time.time()
+        createDirectory(path)
+        validLength = self._load() if resume is True else 0
+        if validLength > 0:
+            self.file = open(self.path, 'r+', encoding='utf-8', errors='surrogateescape')
+            self.file.seek(validLength)
+            self.file.truncate()  # Drop the line that was being written when the run was interrupted, if any
+        else:
+            self.file = open(self.path, 'w', encoding='utf-8', errors='surrogateescape')
+            self.file.write(json.dumps(self.header, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+    # Returns the result of an album completed by the resumed run, or None if it is still to process
+    def get(self, albumPath):
+        result = self.albums.pop(albumPath, None)
+        if result is not None:
+            self.resumedAlbums += 1
+            self._resumedPaths.add(albumPath)
+        return result
+
+
+    # Returns True if the album result was taken from the resumed run
+    def isResumed(self, albumPath):
+        return albumPath in self._resumedPaths
+
+
+    # Record a completed album result, the journal is flushed to disk if the last flush is old enough
+    def add(self, albumPath, result):
+        if albumPath in self._resumedPaths:
+            return
+        self.file.write(json.dumps([albumPath, result], ensure_ascii=False, separators=(',', ':')) + '\n')
+        if time.time() - self._lastFlush >= self.flushInterval:
+            self._flush()
+
+
+    # Remove the journal of a completed run, or flush it so an interrupted run can be resumed
+    def close(self, completed):
+        if completed is True:
+            self.file.close()
+            os.remove(self.path)
+        else:
+            self._flush()
+            self.file.close()
+
+
+    # Read the journal of the same run, returns the length of its valid part (0 if there is no journal to resume)
+    def _load(self):
+        validLength = 0
+        try:
+            with open(self.path, 'rb') as journalFile:
+                for line in journalFile:
+                    if line[-1:] != b'\n':  # Incomplete last line
+                        break
+                    value = json.loads(line.decode('utf-8', 'surrogateescape'))
+                    if validLength == 0 and value != self.header:
+                        return 0
+                    elif validLength > 0:
+                        self.albums[value[0]] = value[1]
+                    validLength += len(line)
+        except OSError:  # No journal
+            return 0
+        except ValueError:  # Corrupted line, the albums read so far are kept
+            pass
+        return validLength
+
+
+    def _flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._lastFlush = time.time()
+
+
+# InterruptGuard defers Ctrl-C (SIGINT) while a run loop is active : the loop checks the interrupted flag after each
+# album, so it stops once the results it holds are consistent. A second Ctrl-C stops the run right away
+class InterruptGuard(object):
+    def __init__(self):
+        self.interrupted = False
+        self._previousHandler = None
+
+
+    def __enter__(self):
+        self._previousHandler = signal.signal(signal.SIGINT, self._interrupt)
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        signal.signal(signal.SIGINT, self._previousHandler)
+
+
+    def _interrupt(self, signum, frame):
+        if self.interrupted is True:
+            raise KeyboardInterrupt
+        self.interrupted = True
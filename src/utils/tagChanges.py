@@ -0,0 +1,61 @@
+# MP3 files are saved in ID3v2.4 by mutagen
+savedID3Version = (2, 4, 0)
+
+
+# Returns a comparable copy of a file tags. Vorbis comments are compared regardless of their order and key case, and
+# ID3 frames regardless of their order
+def snapshotTags(fileType, audioTag):
+    if fileType == 'FLAC':
+        comments = sorted((key.upper(), value) for key, value in (audioTag.tags or []))
+        pictures = [(picture.type, picture.mime, picture.desc, picture.width, picture.height, picture.depth,
+                     picture.data) for picture in audioTag.pictures]
+        return comments, pictures
+    return {key: dict(vars(frame)) for key, frame in audioTag.items()}
+
+
+# Returns True if the file is to be saved : its tags differ from the given snapshot, or it is a MP3 file that is not
+# in ID3v2.4 yet (the in-memory tag version is left unchanged until the file is saved)
+def tagsChanged(fileType, audioTag, previousTags):
+    if fileType == 'MP3' and audioTag.version != savedID3Version:
+        return True
+    return snapshotTags(fileType, audioTag) != previousTags
+
+
+# Returns the tags set or changed since the given snapshot (as text values lists), the removed ones and, if the covers
+# changed, the cover now held by the file (None when they were removed). This cover is referenced by the path of the
+# album cover file it was read from, as its data is read again when the changes are applied
+def computeTagsChanges(fileType, audioTag, previousTags, coverPath):
+    changes = {'set': {}, 'remove': []}
+    if fileType == 'FLAC':
+        previousComments, previousPictures = previousTags
+        comments, pictures = snapshotTags(fileType, audioTag)
+        previousValues = {}
+        for key, value in previousComments:
+            previousValues.setdefault(key, []).append(value)
+        values = {}
+        for key, value in (audioTag.tags or []):  # In the file order, as the values of a key are kept ordered
+            values.setdefault(key.upper(), []).append(value)
+        for key, value in values.items():
+            if key not in previousValues or sorted(previousValues[key]) != sorted(value):
+                changes['set'][key] = value
+        changes['remove'] = [key for key in previousValues if key not in values]
+        if pictures != previousPictures:
+            changes['cover'] = None
+            if len(audioTag.pictures) > 0:
+                picture = audioTag.pictures[0]
+                changes['cover'] = {'file': coverPath, 'mime': picture.mime, 'desc': picture.desc, 'width': picture.width,
+                                    'height': picture.height, 'depth': picture.depth}
+    else:
+        previousFrames = previousTags
+        frames = snapshotTags(fileType, audioTag)
+        for key, frame in frames.items():
+            if key[:4] != 'APIC' and (key not in previousFrames or previousFrames[key] != frame):
+                changes['set'][key] = [str(text) for text in audioTag[key].text]
+        changes['remove'] = [key for key in previousFrames if key[:4] != 'APIC' and key not in frames]
+        previousCovers = {key: frame for key, frame in previousFrames.items() if key[:4] == 'APIC'}
+        if {key: frame for key, frame in frames.items() if key[:4] == 'APIC'} != previousCovers:
+            changes['cover'] = None
+            if len(audioTag.getall('APIC')) > 0:
+                picture = audioTag.getall('APIC')[0]
+                changes['cover'] = {'file': coverPath, 'mime': picture.mime, 'desc': picture.desc}
+    return changes
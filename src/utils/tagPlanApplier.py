@@ -0,0 +1,100 @@
+# Python imports
+import os
+import json
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import ID3, Frames, APIC
+
+
+# TagPlanApplier writes the tags of a plan made by a fill or clean dry run, without parsing the file names again. Files
+# that were modified since the plan was made are skipped, as their planned tags may be outdated
+class TagPlanApplier(object):
+    def __init__(self, planPath, folder):
+        self.planPath = planPath
+        self.folder = folder
+        self.header = None
+        self.appliedFiles = 0
+        self.staleFiles = 0
+        self.missingFiles = 0
+        self._coverPath = None  # Album files follow each other in a plan, so only the last read cover is kept
+        self._coverData = None
+        try:
+            with open(planPath, encoding='utf-8', errors='surrogateescape') as planFile:
+                header = json.loads(planFile.readline())
+            if isinstance(header, dict) and header.get('plan') in ('fill', 'clean'):
+                self.header = header
+        except (OSError, ValueError):  # Unreadable file, or not a JSON plan
+            pass
+
+
+    # Apply each planned file changes, in the plan order
+    def apply(self):
+        with open(self.planPath, encoding='utf-8', errors='surrogateescape') as planFile:
+            planFile.readline()  # Skip the header line
+            for line in planFile:
+                if line.strip() != '':
+                    self._applyEntry(json.loads(line))
+
+
+    # Write a file planned tags, if the file is still the one the plan was made on
+    def _applyEntry(self, entry):
+        path = os.path.join(self.folder, entry['file'])
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.missingFiles += 1
+            return
+        if stat.st_size != entry['size'] or stat.st_mtime_ns != entry['mtime']:
+            self.staleFiles += 1
+            return
+        if entry['format'] == 'FLAC':
+            self._applyFLACEntry(path, entry)
+        else:
+            self._applyMP3Entry(path, entry)
+        self.appliedFiles += 1
+
+
+    # Set the FLAC Vorbis comments and picture of a plan entry
+    def _applyFLACEntry(self, path, entry):
+        audioTag = FLAC(path)
+        for key in entry['remove']:
+            if key in audioTag:
+                del audioTag[key]
+        for key, values in entry['set'].items():
+            audioTag[key] = values
+        if 'cover' in entry:
+            audioTag.clear_pictures()
+            if entry['cover'] is not None:
+                picture = Picture()
+                picture.data = self._loadCover(entry['cover']['file'])
+                picture.type = 3 # COVER_FRONT
+                picture.desc = entry['cover']['desc']
+                picture.mime = entry['cover']['mime']
+                picture.width = entry['cover']['width']
+                picture.height = entry['cover']['height']
+                picture.depth = entry['cover']['depth']
+                audioTag.add_picture(picture)
+        audioTag.save()
+
+
+    # Set the MP3 ID3 frames and cover of a plan entry, the file being saved in ID3v2.4 as in the fill and clean modes
+    def _applyMP3Entry(self, path, entry):
+        audioTag = ID3(path)
+        for key in entry['remove']:
+            audioTag.delall(key)
+        for key, values in entry['set'].items():
+            audioTag.add(Frames[key](text=values))
+        if 'cover' in entry:
+            audioTag.delall('APIC')
+            if entry['cover'] is not None:
+                audioTag.add(APIC(3, entry['cover']['mime'], 3, entry['cover']['desc'], self._loadCover(entry['cover']['file'])))
+        audioTag.save(path)
+
+
+    # Returns a cover file data, read once for all the album files
+    def _loadCover(self, coverFile):
+        coverPath = os.path.join(self.folder, coverFile)
+        if coverPath != self._coverPath:
+            with open(coverPath, 'rb') as file:
+                self._coverData = file.read()
+            self._coverPath = coverPath
+        return self._coverData
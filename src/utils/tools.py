@@ -1,10 +1,16 @@
 # Python imports
+import io
 import os
 import sys
+import hashlib
 import datetime
+from PIL import Image
 # Project imports
 from src.utils.errorEnum import ErrorEnum
 from src.references.refForbiddenChar import RefForbiddenChar
+# Translation tables replacing the forbidden char with a `-`, built once for the sanitizers
+fsForbiddenCharTable = str.maketrans({char: '-' for char in RefForbiddenChar.fsForbiddenChars})
+forbiddenCharTable = str.maketrans({char: '-' for char in RefForbiddenChar.forbiddenChars})
 
 
 # Creates a directory if and only if it doesn't exists yet
@@ -24,6 +30,23 @@ def convertBytes(num):
         num /= 1024.0
 
 
+# Returns the hash of the given sources content (files or modules folders, relative to the src folder) in a stable
+# order, so the results computed by a previous version of this code can be told apart
+def computeSourcesHash(sources):
+    sourcesPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sourcesHash = hashlib.sha1()
+    for source in sources:
+        sourcePath = os.path.join(sourcesPath, source)
+        fileNames = [sourcePath]
+        if os.path.isdir(sourcePath):
+            fileNames = sorted(os.path.join(sourcePath, name) for name in os.listdir(sourcePath) if name.endswith('.py'))
+        for fileName in fileNames:
+            with open(fileName, 'rb') as sourceFile:
+                sourcesHash.update(os.path.relpath(fileName, sourcesPath).encode('utf-8'))
+                sourcesHash.update(sourceFile.read())
+    return sourcesHash.hexdigest()
+
+
 # Check if string begins with a dot
 def prefixDot(charList):
     if charList[0] == '.':
@@ -57,35 +80,21 @@ def suffixThreeDots(charList):
 
 
 # Compute the purity percentage according to the error enum length and the errors counter
-def computePurity(errorCounter, tracksSample):
-    totalPossibleError = tracksSample * len(ErrorEnum)
+def computePurity(errorCounter, tracksSample, checksCounter=None):
+    if checksCounter is None:  # All errors are tested by default
+        checksCounter = len(ErrorEnum)
+    totalPossibleError = tracksSample * checksCounter
     return round(100 - round((errorCounter * 100) / totalPossibleError, 2), 2)
 
 
 # Sanitize a given string and replace all forbidden char with a `-`
-def removeSpecialCharFromString(str):
-    # Checking first that the differents char are bc of an illegal symbol
-    string = ''
-    for x in range(0, len(str)):
-        if str[x] in RefForbiddenChar.fsForbiddenChars:
-            string += '-'
-        else:
-            string += str[x]
-    return string
+def removeSpecialCharFromString(string):
+    return string.translate(fsForbiddenCharTable)
 
 
 # Sanitize items in a given array and replace all forbidden char with a `-`
 def removeSpecialCharFromArray(array):
-    output = []
-    for item in array:
-        string = ''
-        for x in range(0, len(item)):
-            if item[x] in RefForbiddenChar.forbiddenChars:
-                string += '-'
-            else:
-                string += item[x]
-        output.append(string)
-    return output
+    return [item.translate(forbiddenCharTable) for item in array]
 
 
 # Prompt user to yes an action
@@ -119,24 +128,27 @@ def validateDateFormat(string):
     except ValueError:
         return False
 
-def insertInListIfNotExisting(inputList, insertionList):
-    for item in insertionList:
-        if item not in inputList:
-            inputList.append(item)
-    return inputList
 
-
-def insertArtistInListIfNotExisting(inputList, insertionList):
-    for item in insertionList:
-        if len(inputList) == 0:
-            inputList.append(item)
-        else:
-            found = False
-            for artists in inputList:
-                if artists['artist'] == item['artist']:
-                    found = True
-                    artists['info'].append(item['info'][0])
-                    break
-            if found == False:
-                inputList.append(item)
-    return inputList
+# Returns the (width, height) of an in-memory image, read from the JPEG SOF or PNG IHDR headers when possible
+def probeImageSize(data):
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR':
+        return int.from_bytes(data[16:20], 'big'), int.from_bytes(data[20:24], 'big')
+    if data[:2] == b'\xff\xd8':
+        index = 2
+        while index + 9 < len(data):
+            if data[index] != 0xFF:
+                break  # Not a marker, the stream is not what we expected
+            marker = data[index + 1]
+            if marker == 0xFF:  # Fill byte before a marker
+                index += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD9:  # Standalone markers have no length
+                index += 2
+                continue
+            # Start Of Frame markers (except DHT, JPG and DAC) hold the image height then width
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                return int.from_bytes(data[index + 7:index + 9], 'big'), int.from_bytes(data[index + 5:index + 7], 'big')
+            index += 2 + int.from_bytes(data[index + 2:index + 4], 'big')
+    # Unusual or truncated headers are left to Pillow, that only reads what it needs to get the size
+    with Image.open(io.BytesIO(data)) as img:
+        return img.size
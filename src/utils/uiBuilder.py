@@ -1,6 +1,5 @@
-# Python imports
-import icu
 # Project imports
+from src.utils.collation import sortStrings
 from src.utils.tools import convertBytes
 
 
@@ -19,6 +18,12 @@ def printMissingArguments():
     print('> Exiting OstrichRemover.py')
 
 
+# Displays an error message when a plan to apply is given along with a mode
+def printInvalidApplyPlan():
+    print('  The --apply-plan argument can not be used along with the -s, -f, -a, -t, -g or -c modes')
+    print('> Exiting OstrichRemover.py')
+
+
 # Displays an error message when the user path is invalid
 def printInvalidPath(path):
     print('  The path \'{}\' is invalid...'.format(path))
@@ -40,11 +45,6 @@ def printHelp():
     print('> python OstrichRemover.py -h                   : Displays the script help menu')
 
 
-# Prints the first message before scanning folder information
-def printRetrieveFolderInfo():
-    print('  Retrieving folder information...\n')
-
-
 # Prints the studied folder and its information
 def printRootFolderInfo(folderInfo):
     print('  Files and folders information')
@@ -86,11 +86,67 @@ def printDetailledTrack(track):
 
 
 # Prints the scan begin message
-def printScanStart(targetFolder, totalTracks, possibleErrors):
-    print('  Folder scan : {} track(s) to test ({} errors tested per track)'.format(totalTracks, possibleErrors))
+def printScanStart(targetFolder, possibleErrors, estimatedTracks):
+    if estimatedTracks > 0:
+        print('  Folder scan : about {} track(s) to test, from the scan cache ({} errors tested per track)'.format(estimatedTracks, possibleErrors))
+    else:
+        print('  Folder scan : {} errors tested per track'.format(possibleErrors))
     print('> Scanning files in folder \'{}\' and all its sub-directories...\n'.format(targetFolder))
 
 
+# Prints the selected checks when --only or --skip are used, and the input they require to be loaded
+def printScanChecks(errorCodes, heaviestInput, relativeCost):
+    inputs = {
+        'filename': 'file and folder names only, audio files are not opened',
+        'tags': 'file names and tags, embedded covers are not read',
+        'cover': 'file names, tags and embedded covers'
+    }
+    print('  Checks selection : error code(s) {}'.format(', '.join(str(code) for code in errorCodes)))
+    print('> Reading {} ({} % of the complete checks cost)\n'.format(inputs[heaviestInput], relativeCost))
+
+
+# Displays an error message when the --sample percentage or the --sample-albums count is out of range
+def printInvalidSample():
+    print('  The sample must be a percentage in ]0, 100] or a positive albums count')
+    print('> Exiting OstrichRemover.py')
+
+
+# Displays an error message when --only or --skip error codes are invalid, or leave no check to run
+def printInvalidErrorCodes(invalidCodes):
+    if len(invalidCodes) > 0:
+        print('  Unknown error code(s) : {}'.format(', '.join(str(code) for code in invalidCodes)))
+    else:
+        print('  No error code left to test, check the --only and --skip arguments')
+    print('> Exiting OstrichRemover.py')
+
+
+# Displays an error message when options a sampled scan does not support are given along with it
+def printInvalidSampleOptions(options):
+    print('  A sampled scan can not be used along with {}, as it reports an estimation only'.format(', '.join(options)))
+    print('> Exiting OstrichRemover.py')
+
+
+# Prints the sampled scan begin message, with the sample size and its seed (to run the same sample again)
+def printSampleStart(targetFolder, sampledAlbums, totalAlbums, strataCounter, seed, possibleErrors):
+    share = round(sampledAlbums * 100 / totalAlbums, 2) if totalAlbums > 0 else 0
+    print('  Sampled scan : {} album(s) out of {} ({} %), from {} artist letter(s), with seed {} ({} errors tested per track)'.format(
+        sampledAlbums, totalAlbums, share, strataCounter, seed, possibleErrors))
+    print('> Scanning sampled albums in folder \'{}\'...\n'.format(targetFolder))
+
+
+# Prints the sampled scan results, and the estimated library purity with its 95 % confidence interval
+def printSampleEnd(duration, errorCounter, sampledTracks, estimation, categories):
+    print('  Sampled scan done! It took {} seconds to perform the scan'.format(duration))
+    print('> {} errors on {} sampled tracks'.format(errorCounter, sampledTracks))
+    if estimation['purity'] is None:
+        print('> No track sampled, the library purity can not be estimated')
+        return
+    print('> Estimated library purity : {} % (+/- {} %, 95 % confidence)'.format(estimation['purity'], estimation['margin']))
+    for category, categoryEstimation in estimation['categories'].items():
+        print('> Category {} – {} : {} % (+/- {} %)'.format(category, categories[category], categoryEstimation['purity'],
+                                                          categoryEstimation['margin']))
+
+
 # Prints the scan progression
 def printScanProgress(percentage, previousLetter, currentLetter, errorCounter, scannedTracks, purity):
     print('> {:02d}% -- from {} to {} -- {:6d} tracks (purity of {} %) with {} errors'.format(percentage, previousLetter,
@@ -103,26 +159,90 @@ def printScanEnd(duration, errorCounter, totalTracks, purity):
     print('> {} errors on {} tracks (purity : {} %)'.format(errorCounter, totalTracks, purity))
 
 
+# Prints the embedded covers summary at the end of a scan
+def printScanCovers(distinctCovers, albumsCounter, mixedCoversAlbums):
+    print('> {} distinct embedded cover(s) in {} album(s), {} album(s) with more than one cover'.format(distinctCovers, albumsCounter, mixedCoversAlbums))
+
+
+# Prints the scan cache usage at the end of a scan
+def printScanCacheStatus(hits, misses):
+    hitRate = round((hits * 100) / (hits + misses), 2) if hits + misses > 0 else 0
+    print('> Scan cache : {} album(s) reused, {} album(s) tested (hit rate : {} %)'.format(hits, misses, hitRate))
+
+
+# Prints the time spent, the calls and the bytes read in each scan phase (--profile)
+def printScanTimings(timings, duration, jobs):
+    measuredSeconds = sum(phase['seconds'] for phase in timings.values())
+    if jobs is not None and jobs > 1:
+        print('  Scan phases (cumulated over the {} worker processes, {} seconds measured)'.format(jobs, round(measuredSeconds, 2)))
+    else:
+        print('  Scan phases ({} seconds measured over {} seconds)'.format(round(measuredSeconds, 2), duration))
+    for name, phase in timings.items():
+        share = round((phase['seconds'] * 100) / measuredSeconds, 2) if measuredSeconds > 0 else 0
+        print('> {:6s} : {:9.3f} s ({:6.2f} %) -- {:7d} call(s) -- {} read'.format(name, phase['seconds'], share, phase['calls'],
+                                                                               convertBytes(phase['bytesRead'])))
+
+
+# Prints the scan cache invalidation message
+def printScanCacheCleared(cachePath, removedAlbums):
+    print('  Scan cache \'{}\' cleared : {} album(s) will be tested again on the next scan\n'.format(cachePath, removedAlbums))
+
+
+# Prints the albums taken from the journal of an interrupted run
+def printRunResumed(resumedAlbums):
+    print('  Run resumed : {} album(s) processed by the interrupted run were not processed again\n'.format(resumedAlbums))
+
+
+# Prints how to resume an interrupted run
+def printRunInterrupted(processedAlbums, journalPath):
+    print('\n  Run interrupted after {} album(s), they are journaled in \'{}\''.format(processedAlbums, journalPath))
+    print('> Run the same command with --resume to process the remaining albums')
+
+
+# Prints the interrupted clean message, the cleaned albums being skipped by the next clean (unless in dry run)
+def printCleanInterrupted(cleanedAlbums, dryRun):
+    print('\n  Clean interrupted after {} album(s)'.format(cleanedAlbums))
+    if dryRun is True:
+        print('> The saved plan only holds these albums, run the same command to plan the whole folder')
+    else:
+        print('> Run the same command to clean the remaining albums, the cleaned ones are skipped')
+
+
+# Prints the albums processed and the ones skipped as unchanged since the last fill or clean
+def printManifestStatus(processedAlbums, skippedAlbums, skippedTracks, verb):
+    if skippedAlbums > 0:
+        print('> {} album(s) {}, {} unchanged album(s) ({} tracks) skipped since the last run (use --force to process them)'.format(
+            processedAlbums, verb, skippedAlbums, skippedTracks))
+
+
 # Prints the scan begin message
-def printFillStart(targetFolder, totalTracks):
-    print('  Folder scan : {} track(s) to fill'.format(totalTracks))
+def printFillStart(targetFolder):
+    print('  Folder fill : tags are filled from file and folder names')
     print('> Tagging files in folder \'{}\' and all its sub-directories...\n'.format(targetFolder))
 
 
 # Prints the scan progression
-def printFillProgress(percentage, filledTracks):
-    print('> {:02d}% -- {:6d} tracks had their tags filled'.format(percentage, filledTracks))
+def printFillProgress(percentage, filledTracks, dryRun=False):
+    print('> {:02d}% -- {:6d} tracks {} their tags filled'.format(percentage, filledTracks, 'would have' if dryRun else 'had'))
 
 
 # Print the scand end message
-def printFillEnd(duration, filledTracks):
+def printFillEnd(duration, filledTracks, unchangedTracks=0, dryRun=False):
+    if dryRun is True:
+        print('  Tag filling dry run is done! It took {} seconds to plan the fill'.format(duration))
+        print('> {} tracks would have their tags filled'.format(filledTracks))
+        if unchangedTracks > 0:
+            print('> {} tracks already hold their tags and would not be written'.format(unchangedTracks))
+        return
     print('  Tag filling is done! It took {} seconds to perform the fill'.format(duration))
     print('> {} tracks had their tags filled'.format(filledTracks))
+    if unchangedTracks > 0:
+        print('> {} tracks already held their tags and were not written'.format(unchangedTracks))
 
 
 # Prints the stat scan begin message
-def printStatStart(targetFolder, totalTracks):
-    print('  Folder stat analysis : {} track(s) to analyze'.format(totalTracks))
+def printStatStart(targetFolder):
+    print('  Folder stat analysis : artists, genres and labels are collected from tags')
     print('> Extracting unique artists, genres and labels from \'{}\' and all its sub-directories...\n'.format(targetFolder))
 
 
@@ -163,6 +283,13 @@ def printAnalyzeStatus(metaAnalyzer):
     print('> {} mp3 file(s) were added ({} -> {} mp3(s))'.format(ma['mp3Delta'], fd['mp3Count'], ld['mp3Count']))
     print('> {} jpg file(s) were added ({} -> {} jpg(s))'.format(ma['jpgDelta'], fd['jpgCount'], ld['jpgCount']))
     print('> {} png file(s) were added ({} -> {} png(s))\n'.format(ma['pngDelta'], fd['pngCount'], ld['pngCount']))
+    # Scan phases evolution, only when at least two dumps were made with --profile
+    if len(ma['timingsDelta']) > 0:
+        print('  Scan phases detail (from {} to {})'.format(ma['timingsFrom'], ma['timingsTo']))
+        for name, phase in ma['timingsDelta'].items():
+            print('> {:6s} : {:+.3f} second(s), {:+d} call(s), {} read'.format(name, phase['secondsDelta'], phase['callsDelta'],
+                                                                              ('+' if phase['bytesReadDelta'] >= 0 else '-') + convertBytes(abs(phase['bytesReadDelta']))))
+        print('')
 
 
 # Print the scand end message
@@ -171,8 +298,8 @@ def printAnalyzeEnd(duration, analyzedFiles):
     print('> {} json(s) have been analyzed'.format(analyzedFiles))
 
 
-def printGenerationStart(totalTracks, targetFolder):
-    print('  Generate JSON files for artists and genres from : {} track(s) to parse'.format(totalTracks))
+def printGenerationStart(targetFolder):
+    print('  Generate JSON files for artists, genres and labels')
     print('> Dumping JSON files in folder \'{}\'...\n'.format(targetFolder))
 
 
@@ -185,21 +312,60 @@ def printGenerationEnd(duration, artists, genres, labels):
     print('> {} artists, {} genres and {} labels now have an associated JSON file'.format(artists, genres, labels))
 
 
+# Prints the files operations made for a generated type (artists, genres or labels)
+def printGenerationFiles(type, counts):
+    print('> {:7s} : {} created, {} updated, {} unchanged and {} deleted file(s)'.format(type, counts['created'], counts['updated'],
+                                                                                     counts['unchanged'], counts['deleted']))
+
+
 # Prints the scan begin message
-def printCleanStart(targetFolder, totalTracks):
-    print('  Folder scan : {} track(s) to clean'.format(totalTracks))
+def printCleanStart(targetFolder):
+    print('  Folder clean : convention tags and covers are removed')
     print('> Removing tags in folder \'{}\' and all its sub-directories...\n'.format(targetFolder))
 
 
 # Prints the scan progression
-def printCleanProgress(percentage, cleanedTracks):
-    print('> {:02d}% -- {:6d} tracks had their tags removed'.format(percentage, cleanedTracks))
+def printCleanProgress(percentage, cleanedTracks, dryRun=False):
+    print('> {:02d}% -- {:6d} tracks {} their tags removed'.format(percentage, cleanedTracks, 'would have' if dryRun else 'had'))
 
 
 # Print the scand end message
-def printCleanEnd(duration, cleanedTracks):
+def printCleanEnd(duration, cleanedTracks, unchangedTracks=0, dryRun=False):
+    if dryRun is True:
+        print('  Tag cleaning dry run is done! It took {} seconds to plan the clean'.format(duration))
+        print('> {} tracks would have their tags cleaned'.format(cleanedTracks))
+        if unchangedTracks > 0:
+            print('> {} tracks are already cleaned and would not be written'.format(unchangedTracks))
+        return
     print('  Tag cleaning is done! It took {} seconds to perform the clean'.format(duration))
     print('> {} tracks had their tags cleaned'.format(cleanedTracks))
+    if unchangedTracks > 0:
+        print('> {} tracks were already cleaned and were not written'.format(unchangedTracks))
+
+
+# Prints where the dry run plan was saved
+def printTagPlanSaved(planPath, plannedFiles):
+    print('> Dry run : no file was written, the {} file(s) to write are planned in \'{}\''.format(plannedFiles, planPath))
+
+
+# Prints the plan application begin message
+def printTagPlanStart(planPath, mode, targetFolder):
+    print('  Plan application : the tags of a {} dry run are written'.format(mode))
+    print('> Applying plan \'{}\' to folder \'{}\'...\n'.format(planPath, targetFolder))
+
+
+# Prints the plan application end message
+def printTagPlanEnd(duration, appliedFiles, staleFiles, missingFiles):
+    print('  Plan application is done! It took {} seconds to write the planned tags'.format(duration))
+    print('> {} file(s) written'.format(appliedFiles))
+    if staleFiles > 0 or missingFiles > 0:
+        print('> {} file(s) modified and {} file(s) missing since the plan was made were skipped'.format(staleFiles, missingFiles))
+
+
+# Displays an error message when the plan file can not be read
+def printInvalidTagPlan(planPath):
+    print('  The plan \'{}\' is not a fill or clean dry run plan'.format(planPath))
+    print('> Exiting OstrichRemover.py')
 
 
 # Print a line break in console
@@ -225,22 +391,19 @@ def printErroredTracksReport(albumTesters):
             for error in albumTester.errors:
                 _printErroredAlbumsReport_aux(error.value['errorCode'])
         trackErrorWarning = False
-        for trackTester in albumTester.tracks:
-            if trackTester.errorCounter > 0:
+        for trackResult in albumTester.tracks:
+            if trackResult.errorCounter > 0:
                 if trackErrorWarning is False:
                     trackErrorWarning = True
                     print('| | + Errors that are track wide:')
                     print('| | |----------------------------')
-                print('| | + {}'.format(trackTester.track.fileName))
-                for error in trackTester.errors:
-                    _printErroredTracksReport_aux(error.value['errorCode'], trackTester)
+                print('| | + {}'.format(trackResult.fileName))
+                for error in trackResult.errors:
+                    _printErroredTracksReport_aux(error.value['errorCode'], trackResult, albumTester.album)
 
 
 # Auxilliary, print an error about a given track
-def _printErroredTracksReport_aux(errorCode, trackTester):
-    # For accented char sorting
-    collator = icu.Collator.createInstance(icu.Locale('fr_FR.UTF-8'))
-    t = trackTester.track
+def _printErroredTracksReport_aux(errorCode, t, album):
     # ErrorCode 00 : Filename release artists doesn't match the artist foldername
     if errorCode == 0:
         printTrackErrorInfo(errorCode, t.fileNameList[0], t.pathList[len(t.pathList) - 2])
@@ -277,22 +440,22 @@ def _printErroredTracksReport_aux(errorCode, trackTester):
         printTrackErrorInfo(errorCode, t.fileNameList[5].rsplit('.', 1)[0], t.title)
     # ErrorCode 11 : Some tag requested by the naming convention aren't filled in track
     elif errorCode == 11:
-        printTrackErrorInfo(errorCode, 'Here is the list of missing tags:', trackTester.missingTags)
+        printTrackErrorInfo(errorCode, 'Here is the list of missing tags:', t.missingTags)
     # ErrorCode 12 : Performer does not contains both the artist and the featuring artist
     elif errorCode == 12:
-        printTrackErrorInfo(errorCode, sorted(t.performers, key=collator.getSortKey), sorted(t.composedPerformer, key=collator.getSortKey))
+        printTrackErrorInfo(errorCode, sortStrings(t.performers), sortStrings(t.composedPerformer))
     # ErrorCode 13 : Performer does not contains both the artist and the featuring artist
     elif errorCode == 13:
-        printTrackErrorInfo(errorCode, 'Here is the list of misordered tags:', trackTester.missorderedTag)
+        printTrackErrorInfo(errorCode, 'Here is the list of misordered tags:', t.missorderedTag)
     # ErrorCode 14 : Computed album total track is not equal to the track total track tag
     elif errorCode == 14:
-        printTrackErrorInfo(errorCode, t.totalTrack, trackTester.album.totalTrack)
+        printTrackErrorInfo(errorCode, t.totalTrack, album.totalTrack)
     # ErrorCode 15 : Computed album disc track is not equal to the track disc track tag
     elif errorCode == 15:
-        printTrackErrorInfo(errorCode, t.totalDisc, trackTester.album.totalDisc)
+        printTrackErrorInfo(errorCode, t.totalDisc, album.totalDisc)
     # ErrorCode 16 : Computed album year is not equal to the track year tag
     elif errorCode == 16:
-        printTrackErrorInfo(errorCode, t.year, trackTester.album.year)
+        printTrackErrorInfo(errorCode, t.year, album.year)
     # ErrorCode 18 : The Filename doesn't follow the naming pattern properly
     elif errorCode == 18:
         printTrackErrorInfo(errorCode, computeNamingConventionString(), 'AC-DC - 1978 - Powerage - 105 - AC-DC - Sin City')
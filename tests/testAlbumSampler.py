@@ -0,0 +1,141 @@
+# Python imports
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+# Project imports
+from src.scan.albumSampler import AlbumSampler
+from src.scan.checkRegistry import checkRegistry, checkCategories, CheckSelection
+from src.utils.errorEnum import ErrorEnum
+from src.utils.tools import computePurity
+
+
+# The albums of each artist of the test library, artists starting with A and C making two strata of 6 and 3 albums, and
+# the B one a single album stratum
+libraryAlbums = {'Air': 4, 'Aphex Twin': 2, 'Björk': 1, 'Cassius': 3}
+
+
+# AlbumSampler tests : stratified selection of the albums, and estimation of the library purity
+class AlbumSamplerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.library = self.directory.name
+        for artist, albumsCounter in libraryAlbums.items():
+            for index in range(albumsCounter):
+                os.makedirs(os.path.join(self.library, artist, '200{} - Album {}'.format(index, index)))
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    # Returns the sampled albums count of each stratum
+    @staticmethod
+    def _countSampledAlbums(albumSampler):
+        counters = {}
+        for letter in albumSampler.sampledAlbums.values():
+            counters[letter] = counters.get(letter, 0) + 1
+        return counters
+
+
+    # Register a result for each sampled album, the album errors being given by the errors function of its path
+    @staticmethod
+    def _addResults(albumSampler, tracks, errors):
+        for albumPath in albumSampler.sampledAlbums:
+            albumErrors = errors(albumPath)
+            albumTester = SimpleNamespace(folderListing=SimpleNamespace(path=albumPath),
+                                          album=SimpleNamespace(totalTrack=tracks), errors=[], errorCounter=0,
+                                          tracks=[SimpleNamespace(errors=[ErrorEnum.MISSING_TAGS] * albumErrors)])
+            albumSampler.addAlbum(albumTester, albumErrors)
+
+
+    def testStrataAreArtistsFirstLetters(self):
+        albumSampler = AlbumSampler(self.library, percentage=100, seed=1)
+        self.assertEqual(albumSampler.totalAlbums, 10)
+        self.assertEqual({letter: len(albums) for letter, albums in albumSampler.strata.items()}, {'A': 6, 'B': 1, 'C': 3})
+        self.assertEqual(len(albumSampler.sampledAlbums), 10)
+
+
+    def testProportionalAllocation(self):
+        albumSampler = AlbumSampler(self.library, percentage=50, seed=1)
+        self.assertEqual(self._countSampledAlbums(albumSampler), {'A': 3, 'B': 1, 'C': 2})
+        for albumPath, letter in albumSampler.sampledAlbums.items():
+            self.assertIn(albumPath, albumSampler.strata[letter])
+
+
+    def testEachStratumIsSampled(self):
+        albumSampler = AlbumSampler(self.library, percentage=1, seed=1)
+        self.assertEqual(self._countSampledAlbums(albumSampler), {'A': 1, 'B': 1, 'C': 1})
+
+
+    def testAlbumsCountIsConvertedToPercentage(self):
+        albumSampler = AlbumSampler(self.library, albumsCount=5, seed=1)
+        self.assertEqual(self._countSampledAlbums(albumSampler), {'A': 3, 'B': 1, 'C': 2})
+
+
+    def testSeedMakesSampleReproducible(self):
+        albumSampler = AlbumSampler(self.library, percentage=50, seed=42)
+        self.assertEqual(AlbumSampler(self.library, percentage=50, seed=42).sampledAlbums, albumSampler.sampledAlbums)
+        samples = set(tuple(sorted(AlbumSampler(self.library, percentage=50, seed=seed).sampledAlbums)) for seed in range(10))
+        self.assertGreater(len(samples), 1)
+        self.assertIsNotNone(AlbumSampler(self.library, percentage=50).seed)
+
+
+    def testSampledAlbumsAreListedInOrder(self):
+        albumSampler = AlbumSampler(self.library, percentage=50, seed=1)
+        folderListings = list(albumSampler.albums())
+        self.assertEqual([folderListing.path for folderListing in folderListings], sorted(albumSampler.sampledAlbums))
+        self.assertEqual([folderListing.progress for folderListing in folderListings],
+                         [index * 100 / len(folderListings) for index in range(len(folderListings))])
+
+
+    def testEmptySampleHasNoEstimation(self):
+        albumSampler = AlbumSampler(self.library, percentage=50, seed=1)
+        estimation = albumSampler.estimate()
+        self.assertIsNone(estimation['purity'])
+        self.assertIsNone(estimation['margin'])
+
+
+    def testFullSampleIsExact(self):
+        albumSampler = AlbumSampler(self.library, percentage=100, seed=1)
+        self._addResults(albumSampler, 4, lambda albumPath: len(albumPath) % 5)
+        errorsCounter = sum(len(albumPath) % 5 for albumPath in albumSampler.sampledAlbums)
+        estimation = albumSampler.estimate()
+        self.assertEqual(estimation['purity'], computePurity(errorsCounter, 40))
+        self.assertEqual(estimation['margin'], 0)
+        self.assertEqual(set(estimation['categories']), set(checkCategories))
+        # All errors are missing tags ones, from the third category
+        categoryChecks = len([check for check in checkRegistry.values() if check['category'] == 3])
+        self.assertEqual(estimation['categories'][3], {'purity': computePurity(errorsCounter, 40, categoryChecks), 'margin': 0})
+        self.assertEqual(estimation['categories'][1], {'purity': 100, 'margin': 0})
+
+
+    def testStratumWeights(self):
+        albumSampler = AlbumSampler(self.library, percentage=1, seed=1)
+        # The single album of each stratum stands for the stratum : A albums have 1 error, B ones 4 and C ones 7
+        errorsByLetter = {'A': 1, 'B': 4, 'C': 7}
+        self._addResults(albumSampler, 10, lambda albumPath: errorsByLetter[albumSampler.sampledAlbums[albumPath]])
+        estimation = albumSampler.estimate()
+        self.assertEqual(estimation['purity'], computePurity(6 * 1 + 1 * 4 + 3 * 7, 10 * 10))
+        self.assertGreater(estimation['margin'], 0)  # Single album strata take the variance of the whole sample
+
+
+    def testConstantRatioHasNoMargin(self):
+        albumSampler = AlbumSampler(self.library, percentage=50, seed=1)
+        self._addResults(albumSampler, 4, lambda albumPath: 2)
+        estimation = albumSampler.estimate()
+        self.assertEqual(estimation['purity'], computePurity(2, 4))
+        self.assertEqual(estimation['margin'], 0)
+
+
+    def testPartialSelectionEstimation(self):
+        checks = CheckSelection(only=[ErrorEnum.MISSING_TAGS.value['errorCode']])
+        albumSampler = AlbumSampler(self.library, percentage=100, seed=1, checks=checks)
+        self._addResults(albumSampler, 2, lambda albumPath: 1)
+        estimation = albumSampler.estimate()
+        self.assertEqual(estimation['purity'], computePurity(10, 20, 1))
+        self.assertEqual(estimation['categories'], {3: {'purity': computePurity(10, 20, 1), 'margin': 0}})
+
+
+if __name__ == '__main__':
+    unittest.main()
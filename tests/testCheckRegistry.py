@@ -0,0 +1,122 @@
+# Python imports
+import unittest
+# Project imports
+from src.scan.checkRegistry import checkRegistry, checkCategories, inputsOrder, testsOrder, CheckSelection, \
+    parseErrorCodes, FILENAME_INPUT, TAGS_INPUT, COVER_INPUT, FILESYSTEM_NAMING_TEST, MISSING_TAGS_TEST, \
+    FIELDS_VALIDITY_TEST, COVER_SIZE_TEST, COVER_METADATA_TEST
+from src.scan.trackTester import TrackTester
+from src.utils.errorEnum import ErrorEnum
+
+
+# Check registry tests : each error is declared once with its input and its tests, and the checks selection derives
+# the inputs to load and the tests to run from it
+class CheckRegistryTest(unittest.TestCase):
+    def testEachErrorIsRegistered(self):
+        self.assertEqual(set(checkRegistry), set(ErrorEnum))
+        for error, check in checkRegistry.items():
+            self.assertIn(check['input'], inputsOrder, error)
+            self.assertIn(check['category'], checkCategories, error)
+            self.assertGreater(check['cost'], 0, error)
+
+
+    def testEachTestIsATrackTesterMethod(self):
+        registeredTests = set(test for check in checkRegistry.values() for test in check['tests'])
+        self.assertEqual(registeredTests, set(testsOrder))
+        for test in testsOrder:
+            self.assertTrue(callable(getattr(TrackTester, test, None)), test)
+
+
+    def testFilenameTestsOnlyRaiseFilenameErrors(self):
+        for error, check in checkRegistry.items():
+            if FILESYSTEM_NAMING_TEST in check['tests']:
+                self.assertEqual(check['input'], FILENAME_INPUT, error)
+
+
+# CheckSelection tests, for the --only and --skip options
+class CheckSelectionTest(unittest.TestCase):
+    def testDefaultSelectionHasAllChecks(self):
+        checks = CheckSelection()
+        self.assertEqual(checks.errors, frozenset(ErrorEnum))
+        self.assertFalse(checks.isPartial)
+        self.assertEqual(checks.invalidCodes, [])
+        self.assertTrue(checks.readTags)
+        self.assertTrue(checks.readCover)
+        self.assertEqual(checks.tests, testsOrder)
+        self.assertEqual(checks.heaviestInput(), COVER_INPUT)
+        self.assertEqual(checks.relativeCost(), 100)
+
+
+    def testFilenameSelectionReadsNoTags(self):
+        checks = CheckSelection(only=[0, 1, 2])
+        self.assertTrue(checks.isPartial)
+        self.assertEqual(checks.codes(), [0, 1, 2])
+        self.assertEqual(checks.inputs, {FILENAME_INPUT})
+        self.assertFalse(checks.readTags)
+        self.assertFalse(checks.readCover)
+        self.assertEqual(checks.tests, [FILESYSTEM_NAMING_TEST])
+        self.assertEqual(checks.heaviestInput(), FILENAME_INPUT)
+
+
+    def testCoverSizeSelectionReadsCover(self):
+        checks = CheckSelection(only=[ErrorEnum.INVALID_COVER.value['errorCode']])
+        self.assertTrue(checks.readTags)
+        self.assertTrue(checks.readCover)
+        self.assertEqual(checks.tests, [COVER_SIZE_TEST])
+
+
+    def testSkippedCoverSizeDoesNotReadCover(self):
+        checks = CheckSelection(skip=[ErrorEnum.INVALID_COVER.value['errorCode']])
+        self.assertNotIn(ErrorEnum.INVALID_COVER, checks.errors)
+        self.assertEqual(len(checks.errors), len(ErrorEnum) - 1)
+        self.assertTrue(checks.readTags)
+        self.assertFalse(checks.readCover)
+        self.assertNotIn(COVER_SIZE_TEST, checks.tests)
+        self.assertIn(COVER_METADATA_TEST, checks.tests)
+        self.assertEqual(checks.heaviestInput(), TAGS_INPUT)
+
+
+    def testErrorRaisedBySeveralTests(self):
+        checks = CheckSelection(only=[ErrorEnum.MISSING_TAGS.value['errorCode']])
+        self.assertEqual(checks.tests, [MISSING_TAGS_TEST, FIELDS_VALIDITY_TEST])
+
+
+    def testTestsKeepTheirRunOrder(self):
+        checks = CheckSelection(only=[ErrorEnum.WRONG_DATE_FORMAT.value['errorCode'], ErrorEnum.INVALID_COVER.value['errorCode'],
+                                      0])
+        self.assertEqual(checks.tests, [FILESYSTEM_NAMING_TEST, COVER_SIZE_TEST, FIELDS_VALIDITY_TEST])
+
+
+    def testSkipAppliesAfterOnly(self):
+        checks = CheckSelection(only=[0, 1, 2], skip=[1])
+        self.assertEqual(checks.codes(), [0, 2])
+        self.assertEqual(CheckSelection(only=[0], skip=[0]).tests, [])
+
+
+    def testInvalidCodesAreReported(self):
+        checks = CheckSelection(only=[0, 99], skip=[-1])
+        self.assertEqual(checks.invalidCodes, [-1, 99])
+        self.assertEqual(checks.codes(), [0])
+
+
+    def testRelativeCostIsProportional(self):
+        cheapChecks = CheckSelection(only=[0])
+        expensiveChecks = CheckSelection(only=[ErrorEnum.INVALID_COVER.value['errorCode']])
+        self.assertGreater(cheapChecks.relativeCost(), 0)
+        self.assertGreater(expensiveChecks.relativeCost(), cheapChecks.relativeCost())
+
+
+# parseErrorCodes tests, the argparse type of the --only and --skip options
+class ParseErrorCodesTest(unittest.TestCase):
+    def testCommaSeparatedCodes(self):
+        self.assertEqual(parseErrorCodes('0,1,2'), [0, 1, 2])
+        self.assertEqual(parseErrorCodes(' 19, 22 ,'), [19, 22])
+        self.assertEqual(parseErrorCodes(''), [])
+
+
+    def testInvalidIntegerIsRejected(self):
+        self.assertRaises(ValueError, parseErrorCodes, '1,a')
+        self.assertRaises(ValueError, parseErrorCodes, '1.5')
+
+
+if __name__ == '__main__':
+    unittest.main()
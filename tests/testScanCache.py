@@ -0,0 +1,111 @@
+# Python imports
+import os
+import tempfile
+import unittest
+from unittest import mock
+# Project imports
+from benchmark.libraryGenerator import LibraryGenerator
+from src.scan.albumTester import testAlbum
+from src.scan.checkRegistry import CheckSelection
+from src.scan.scanCache import ScanCache
+from src.utils.libraryWalker import LibraryWalker
+
+
+# ScanCache tests : an album is only reused while its files, the script version, the checks sources and the checks
+# selection are the ones it was tested with
+class ScanCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.library = os.path.join(self.directory.name, 'library')
+        self.cachePath = os.path.join(self.directory.name, 'cache', 'scan-cache.db')
+        LibraryGenerator(self.library, 2, seed=3, errorRate=0.3, albums=(1, 1), tracks=(3, 3)).generate()
+        self.folderListing = next(LibraryWalker(self.library).albums())
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    # Store the first album results in a new cache, and close it
+    def _fillCache(self, scriptVersion='1.0.0', checks=None):
+        checks = checks or CheckSelection()
+        scanCache = ScanCache(self.cachePath, scriptVersion, checks)
+        scanCache.put(*testAlbum(self.folderListing, checks=checks))
+        scanCache.close()
+
+
+    # Returns the cached results of the album, as listed again from the disk
+    def _getCached(self, scriptVersion='1.0.0', checks=None):
+        scanCache = ScanCache(self.cachePath, scriptVersion, checks or CheckSelection())
+        folderListing, subFolders, subFoldersCounter = LibraryWalker.listFolder(self.folderListing.path)
+        cached = scanCache.get(folderListing)
+        scanCache.close()
+        return cached
+
+
+    def testUnchangedAlbumIsReused(self):
+        albumTester, tracksErrors = testAlbum(self.folderListing)
+        self._fillCache()
+        cached = self._getCached()
+        self.assertIsNotNone(cached)
+        cachedTester, cachedTracksErrors = cached
+        self.assertTrue(cachedTester.fromCache)
+        self.assertEqual(cachedTracksErrors, tracksErrors)
+        self.assertEqual(cachedTester.errors, albumTester.errors)
+        self.assertEqual([trackResult.errors for trackResult in cachedTester.tracks],
+                         [trackResult.errors for trackResult in albumTester.tracks])
+
+
+    def testModifiedFileInvalidatesAlbum(self):
+        self._fillCache()
+        trackPath = os.path.join(self.folderListing.path, self.folderListing.files[0])
+        stat = os.stat(trackPath)
+        os.utime(trackPath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        self.assertIsNone(self._getCached())
+
+
+    def testResizedFileInvalidatesAlbum(self):
+        self._fillCache()
+        with open(os.path.join(self.folderListing.path, self.folderListing.files[0]), 'ab') as trackFile:
+            trackFile.write(b'\x00')
+        self.assertIsNone(self._getCached())
+
+
+    def testAddedFileInvalidatesAlbum(self):
+        self._fillCache()
+        with open(os.path.join(self.folderListing.path, 'Notes.txt'), 'w') as notesFile:
+            notesFile.write('notes')
+        self.assertIsNone(self._getCached())
+
+
+    def testScriptVersionInvalidatesCache(self):
+        self._fillCache('1.0.0')
+        self.assertIsNone(self._getCached('1.0.1'))
+
+
+    def testSourcesChangeInvalidatesCache(self):
+        self._fillCache()
+        with mock.patch('src.scan.scanCache.computeSourcesHash', return_value='changed'):
+            self.assertIsNone(self._getCached())
+
+
+    def testChecksSelectionInvalidatesCache(self):
+        self._fillCache(checks=CheckSelection(only=[0, 1, 2]))
+        self.assertIsNone(self._getCached())
+        self.assertIsNone(self._getCached(checks=CheckSelection(only=[0, 1])))
+        self.assertIsNotNone(self._getCached(checks=CheckSelection(only=[2, 1, 0])))
+
+
+    def testClearRemovesFolderAlbums(self):
+        self._fillCache()
+        scanCache = ScanCache(self.cachePath, '1.0.0')
+        self.assertEqual(scanCache.clear(os.path.join(self.library, 'Unknown')), 0)
+        self.assertEqual(scanCache.estimateTracks(self.library), 3)
+        self.assertEqual(scanCache.clear(self.library), 1)
+        self.assertEqual(scanCache.estimateTracks(self.library), 0)
+        scanCache.close()
+        self.assertIsNone(self._getCached())
+
+
+if __name__ == '__main__':
+    unittest.main()
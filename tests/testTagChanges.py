@@ -0,0 +1,137 @@
+# Python imports
+import os
+import tempfile
+import unittest
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import ID3, TIT2, TXXX, APIC
+# Project imports
+from benchmark.libraryGenerator import LibraryGenerator
+from src.utils.tagChanges import snapshotTags, tagsChanged, computeTagsChanges, savedID3Version
+
+
+# Returns the path of the first audio file of a generated library
+def generateTrack(folder, mp3Ratio):
+    LibraryGenerator(folder, 1, seed=7, mp3Ratio=mp3Ratio, albums=(1, 1), tracks=(1, 1)).generate()
+    for root, folders, files in os.walk(folder):
+        for fileName in files:
+            if fileName.endswith(('.flac', '.mp3')):
+                return os.path.join(root, fileName)
+
+
+# computeTagsChanges tests on a FLAC file, Vorbis comments being compared regardless of their order and key case
+class FLACTagsChangesTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.audioTag = FLAC(generateTrack(self.directory.name, 0))
+        self.previousTags = snapshotTags('FLAC', self.audioTag)
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def _computeChanges(self):
+        return computeTagsChanges('FLAC', self.audioTag, self.previousTags, 'Cover.jpg')
+
+
+    def testUnchangedTags(self):
+        self.assertFalse(tagsChanged('FLAC', self.audioTag, self.previousTags))
+        self.assertEqual(self._computeChanges(), {'set': {}, 'remove': []})
+
+
+    def testSetChangedAndRemovedTags(self):
+        self.audioTag['TITLE'] = 'New Title'
+        self.audioTag['mood'] = ['Calm', 'Dark']
+        del self.audioTag['BPM']
+        self.assertTrue(tagsChanged('FLAC', self.audioTag, self.previousTags))
+        changes = self._computeChanges()
+        self.assertEqual(changes['set'], {'TITLE': ['New Title'], 'MOOD': ['Calm', 'Dark']})
+        self.assertEqual(changes['remove'], ['BPM'])
+        self.assertNotIn('cover', changes)
+
+
+    def testValuesOrderIsIgnored(self):
+        self.audioTag['PERFORMER'] = ['B', 'A']
+        self.previousTags = snapshotTags('FLAC', self.audioTag)
+        self.audioTag['PERFORMER'] = ['A', 'B']
+        self.assertFalse(tagsChanged('FLAC', self.audioTag, self.previousTags))
+        self.assertEqual(self._computeChanges()['set'], {})
+
+
+    def testReplacedCover(self):
+        self.audioTag.clear_pictures()
+        picture = Picture()
+        picture.type = 3
+        picture.mime = 'image/png'
+        picture.desc = 'Front'
+        picture.width = 500
+        picture.height = 500
+        picture.depth = 24
+        picture.data = b'cover'
+        self.audioTag.add_picture(picture)
+        changes = self._computeChanges()
+        self.assertEqual(changes['cover'], {'file': 'Cover.jpg', 'mime': 'image/png', 'desc': 'Front', 'width': 500,
+                                            'height': 500, 'depth': 24})
+
+
+    def testRemovedCover(self):
+        self.audioTag.clear_pictures()
+        changes = self._computeChanges()
+        self.assertIsNone(changes['cover'])
+        self.assertEqual(changes['set'], {})
+
+
+# computeTagsChanges tests on a MP3 file, the covers being planned apart from the other frames
+class MP3TagsChangesTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = generateTrack(self.directory.name, 1)
+        self.audioTag = ID3(self.path)
+        self.previousTags = snapshotTags('MP3', self.audioTag)
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def _computeChanges(self):
+        return computeTagsChanges('MP3', self.audioTag, self.previousTags, 'Cover.jpg')
+
+
+    def testOlderID3VersionIsSaved(self):
+        self.assertNotEqual(self.audioTag.version, savedID3Version)  # The generator saves ID3v2.3 files
+        self.assertTrue(tagsChanged('MP3', self.audioTag, self.previousTags))
+        self.assertEqual(self._computeChanges(), {'set': {}, 'remove': []})
+        self.audioTag.save(self.path)
+        audioTag = ID3(self.path)
+        self.assertFalse(tagsChanged('MP3', audioTag, snapshotTags('MP3', audioTag)))
+
+
+    def testSetChangedAndRemovedFrames(self):
+        self.audioTag.add(TIT2(encoding=3, text='New Title'))
+        self.audioTag.add(TXXX(encoding=3, desc='MOOD', text=['Calm', 'Dark']))
+        self.audioTag.delall('TBPM')
+        changes = self._computeChanges()
+        self.assertEqual(changes['set'], {'TIT2': ['New Title'], 'TXXX:MOOD': ['Calm', 'Dark']})
+        self.assertEqual(changes['remove'], ['TBPM'])
+        self.assertNotIn('cover', changes)
+
+
+    def testReplacedCover(self):
+        self.audioTag.delall('APIC')
+        self.audioTag.add(APIC(3, 'image/png', 3, 'Front', b'cover'))
+        changes = self._computeChanges()
+        self.assertEqual(changes['cover'], {'file': 'Cover.jpg', 'mime': 'image/png', 'desc': 'Front'})
+        self.assertEqual(changes['set'], {})
+        self.assertEqual(changes['remove'], [])
+
+
+    def testRemovedCover(self):
+        self.audioTag.delall('APIC')
+        changes = self._computeChanges()
+        self.assertIsNone(changes['cover'])
+        self.assertEqual(changes['remove'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
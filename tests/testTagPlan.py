@@ -0,0 +1,114 @@
+# Python imports
+import os
+import shutil
+import tempfile
+import unittest
+from mutagen.flac import FLAC
+from mutagen.id3 import ID3
+# Project imports
+from benchmark.libraryGenerator import LibraryGenerator
+from src.clean.albumCleaner import cleanAlbum
+from src.fill.albumFiller import fillAlbum
+from src.utils.libraryWalker import LibraryWalker
+from src.utils.reportBuilder import TagPlanWriter
+from src.utils.tagChanges import snapshotTags
+from src.utils.tagPlanApplier import TagPlanApplier
+
+
+# TagPlanWriter and TagPlanApplier tests : applying the plan of a dry run gives the files a real run would write
+class TagPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.library = os.path.join(self.directory.name, 'library')
+        self.plannedLibrary = os.path.join(self.directory.name, 'planned')
+        self.planFolder = os.path.join(self.directory.name, 'dump')
+        LibraryGenerator(self.library, 3, seed=5, errorRate=0.5, mp3Ratio=0.5, albums=(1, 2), tracks=(2, 4)).generate()
+        shutil.copytree(self.library, self.plannedLibrary)  # File modification times are kept
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    # Write the dry run plan of the planned library, and returns its path
+    def _writePlan(self, mode):
+        albumWorker = fillAlbum if mode == 'fill' else cleanAlbum
+        tagPlanWriter = TagPlanWriter('1.0.0', mode, self.plannedLibrary, self.planFolder)
+        for folderListing in LibraryWalker(self.plannedLibrary).albums():
+            tagPlanWriter.addEntries(albumWorker(folderListing, dryRun=True)[-1])
+        tagPlanWriter.close()
+        return tagPlanWriter.path
+
+
+    # Run the mode for real on the library
+    def _run(self, mode):
+        albumWorker = fillAlbum if mode == 'fill' else cleanAlbum
+        for folderListing in LibraryWalker(self.library).albums():
+            albumWorker(folderListing)
+
+
+    # Returns each audio file tags, by path relative to the library
+    @staticmethod
+    def _readTags(library):
+        tags = {}
+        for root, folders, files in os.walk(library):
+            for fileName in files:
+                path = os.path.join(root, fileName)
+                if fileName.endswith('.flac'):
+                    tags[os.path.relpath(path, library)] = snapshotTags('FLAC', FLAC(path))
+                elif fileName.endswith('.mp3'):
+                    audioTag = ID3(path)
+                    frames = {key: [str(text) for text in frame.text] if hasattr(frame, 'text') else frame.data
+                              for key, frame in audioTag.items()}
+                    tags[os.path.relpath(path, library)] = (audioTag.version, frames)
+        return tags
+
+
+    # Apply the planned library plan, and check it matches the real run on the library
+    def _assertRoundTrip(self, mode):
+        originalTags = self._readTags(self.library)
+        planPath = self._writePlan(mode)
+        self.assertEqual(self._readTags(self.plannedLibrary), originalTags)  # A dry run writes no file
+        tagPlanApplier = TagPlanApplier(planPath, self.plannedLibrary)
+        self.assertEqual(tagPlanApplier.header['plan'], mode)
+        self.assertEqual(tagPlanApplier.header['folder'], self.plannedLibrary)
+        tagPlanApplier.apply()
+        self._run(mode)
+        self.assertNotEqual(self._readTags(self.library), originalTags)
+        self.assertGreater(tagPlanApplier.appliedFiles, 0)
+        self.assertEqual(tagPlanApplier.staleFiles, 0)
+        self.assertEqual(tagPlanApplier.missingFiles, 0)
+        self.assertEqual(self._readTags(self.plannedLibrary), self._readTags(self.library))
+
+
+    def testFillPlanRoundTrip(self):
+        self._assertRoundTrip('fill')
+
+
+    def testCleanPlanRoundTrip(self):
+        self._assertRoundTrip('clean')
+
+
+    def testModifiedFilesAreSkipped(self):
+        planPath = self._writePlan('fill')
+        listing = next(LibraryWalker(self.plannedLibrary).albums())
+        tracks = [fileName for fileName in listing.files if fileName.endswith(('.flac', '.mp3'))]
+        with open(os.path.join(listing.path, tracks[0]), 'ab') as trackFile:
+            trackFile.write(b'\x00')
+        os.remove(os.path.join(listing.path, tracks[1]))
+        tagPlanApplier = TagPlanApplier(planPath, self.plannedLibrary)
+        tagPlanApplier.apply()
+        self.assertEqual(tagPlanApplier.staleFiles, 1)
+        self.assertEqual(tagPlanApplier.missingFiles, 1)
+
+
+    def testInvalidPlanHasNoHeader(self):
+        notAPlan = os.path.join(self.directory.name, 'notes.txt')
+        with open(notAPlan, 'w') as notesFile:
+            notesFile.write('notes\n')
+        self.assertIsNone(TagPlanApplier(notAPlan, self.plannedLibrary).header)
+        self.assertIsNone(TagPlanApplier(os.path.join(self.directory.name, 'missing.ndjson'), self.plannedLibrary).header)
+
+
+if __name__ == '__main__':
+    unittest.main()